@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
+import contextvars
 import gc
 import json
 import os
+import queue
 import re
 import subprocess
+import threading
 import time
 from pathlib import Path
 import base64
@@ -11,21 +14,17 @@ from datetime import datetime
 import shutil
 import sys
 
-# Marker-pdf imports
-MARKER_AVAILABLE = False
-try:
-    from marker.converters.pdf import PdfConverter
-    from marker.models import create_model_dict
-    from marker.output import text_from_rendered
-    MARKER_AVAILABLE = True
-except ImportError:
-    pass
+# Marker-pdf / MinerU are imported where a PDF is converted, so importing this
+# module for its text helpers (scripts/maint.py workers) does not load them
+import importlib.util
+MARKER_AVAILABLE = importlib.util.find_spec("marker") is not None
+MINERU_AVAILABLE = importlib.util.find_spec("mineru") is not None
 
-# MinerU imports
-MINERU_AVAILABLE = False
+# Optional tokenizer for token-accurate translation budgets
+TIKTOKEN_AVAILABLE = False
 try:
-    from mineru.cli.common import do_parse, read_fn as mineru_read_fn
-    MINERU_AVAILABLE = True
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
 except ImportError:
     pass
 
@@ -73,6 +72,80 @@ def print_progress(current, total, text=""):
     if current == total:
         print()
 
+# Paper whose output the current thread / task produces. Set by the
+# PipelineScheduler, which interleaves several PDFs in one log.
+_LOG_TAG = contextvars.ContextVar("paperflow_log_tag", default=None)
+
+class TeeOutput:
+    """Write stdout to both the console and a log file.
+
+    While a log tag is set, output is collected into whole lines and every
+    line is prefixed with "[tag] ", so lines of concurrently processed PDFs
+    neither split nor lose their paper.
+    """
+    def __init__(self, *files, log_path=None):
+        self.files = files
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._pending = {}     # (thread id, tag) -> unterminated line
+        self._opened = set()   # keys whose unterminated line was flushed with its tag
+
+    def _emit(self, data):
+        for f in self.files:
+            f.write(data)
+            f.flush()
+
+    def _tagged(self, key, line):
+        if not line or key in self._opened:
+            return line
+        return f"[{key[1]}] {line}"
+
+    def write(self, data):
+        tag = _LOG_TAG.get()
+        with self._lock:
+            if not tag:
+                self._emit(data)
+                return len(data)
+            key = (threading.get_ident(), tag)
+            parts = re.split(r'([\r\n])', self._pending.pop(key, "") + data)
+            out = []
+            for i in range(0, len(parts) - 1, 2):
+                out.append(self._tagged(key, parts[i]) + parts[i + 1])
+                self._opened.discard(key)
+            if parts[-1]:
+                self._pending[key] = parts[-1]
+            if out:
+                self._emit("".join(out))
+        return len(data)
+
+    def flush(self):
+        tag = _LOG_TAG.get()
+        with self._lock:
+            key = (threading.get_ident(), tag)
+            if key in self._pending:
+                # Progress bars (print(..., end='', flush=True)) show up now
+                self._emit(self._tagged(key, self._pending.pop(key)))
+                self._opened.add(key)
+            for f in self.files:
+                f.flush()
+
+def _attach_log_file(log_path):
+    """Tee stdout into log_path (append), replacing any previous log file.
+
+    Used by child processes so their output lands in the same run log.
+    """
+    console = sys.stdout.files[0] if isinstance(sys.stdout, TeeOutput) else sys.stdout
+    if isinstance(sys.stdout, TeeOutput):
+        if sys.stdout.log_path == log_path:
+            return
+        for f in sys.stdout.files[1:]:
+            try:
+                f.close()
+            except Exception:
+                pass
+    log_handle = open(log_path, 'a', encoding='utf-8')
+    sys.stdout = TeeOutput(console, log_handle, log_path=str(log_path))
+
 def _count_active_stages(pipeline):
     """Count the number of active pipeline stages for progress tracking."""
     count = 0
@@ -86,8 +159,15 @@ def _count_active_stages(pipeline):
         count += 1
     return max(count, 1)
 
+_STATUS_LOCK = threading.Lock()
+_STATUS_IN_FLIGHT = {}  # filename -> latest status while the scheduler overlaps PDFs
+
 def write_processing_status(filename, stage, stage_num, total_stages, stage_label, error=None, detail=None, sub_progress=None):
-    """Write processing status to shared JSON file for viewer polling."""
+    """Write processing status to shared JSON file for viewer polling.
+
+    The top-level fields describe the latest update; "in_flight" lists every
+    PDF currently inside the pipeline (several when stages overlap).
+    """
     status = {
         "current_file": filename,
         "stage": stage,
@@ -100,13 +180,23 @@ def write_processing_status(filename, stage, stage_num, total_stages, stage_labe
         "sub_progress": sub_progress,
     }
     status_path = os.path.join("logs", "processing_status.json")
-    try:
-        tmp_path = status_path + ".tmp"
-        with open(tmp_path, 'w', encoding='utf-8') as f:
-            json.dump(status, f, ensure_ascii=False)
-        os.replace(tmp_path, status_path)
-    except Exception:
-        pass
+    with _STATUS_LOCK:
+        if filename:
+            if stage in ("complete", "error"):
+                _STATUS_IN_FLIGHT.pop(filename, None)
+            else:
+                _STATUS_IN_FLIGHT[filename] = {k: v for k, v in status.items() if k != "current_file"}
+                _STATUS_IN_FLIGHT[filename]["filename"] = filename
+        elif stage == "idle":
+            _STATUS_IN_FLIGHT.clear()
+        status["in_flight"] = list(_STATUS_IN_FLIGHT.values())
+        try:
+            tmp_path = status_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(status, f, ensure_ascii=False)
+            os.replace(tmp_path, status_path)
+        except Exception:
+            pass
 
 def load_config():
     """Load config.json or return defaults"""
@@ -132,8 +222,80 @@ def load_config():
                 "backend": "pipeline",
                 "parse_method": "auto",
                 "lang": "en",
+            },
+            "worker": {
+                "max_documents": 20,
+                "min_free_vram_gb": 2.0,
+                "job_timeout_seconds": 1800,
+                "idle_release_seconds": 300,
             }
         },
+        "conversion_cache": {
+            "enabled": True,
+            "dir": "~/.cache/paperflow/conversions",
+            "max_size_gb": 20.0,
+        },
+        "llm_concurrency": {
+            "enabled": True,
+            "initial_limit": 3,
+            "min_limit": 1,
+            "max_limit": 16,
+            "window": 50,
+            "latency_tolerance": 2.0,
+            "error_threshold": 0.1,
+            "decrease_factor": 0.5,
+            "decrease_cooldown_seconds": 5.0,
+        },
+        "llm_hedging": {
+            "enabled": False,
+            "percentile": 0.95,
+            "min_samples": 20,
+            "max_hedge_ratio": 0.1,
+            "min_delay_seconds": 5.0,
+            "window": 200,
+        },
+        "llm_client": {
+            "http2": True,
+            "max_connections": 32,
+            "max_keepalive_connections": 16,
+            "keepalive_expiry_seconds": 60,
+        },
+        "llm_cassette": {
+            "record": False,
+            "dir": "logs/cassettes",
+        },
+        "model_routing": {
+            "enabled": False,
+            "tiers": [
+                {"model": "", "max_chars": 3000, "max_math_density": 0.02, "max_table_ratio": 0.1}
+            ],
+        },
+        "glossary": {
+            "enabled": True,
+            "model": "",
+            "max_terms": 40,
+            "max_candidates": 80,
+        },
+        "translation_memory": {
+            "enabled": True,
+            "path": "~/.cache/paperflow/translation_memory.sqlite3",
+            "ttl_days": 180,
+            "max_entries": 200000,
+        },
+        "ingest": {
+            "watch_dir": "newones",
+            "use_inotify": True,
+            "stable_seconds": 2.0,
+            "poll_interval_seconds": 5.0,
+            "rescan_interval_seconds": 30.0,
+        },
+        "scheduler": {
+            "enabled": True,
+            "convert_workers": 1,
+            "metadata_workers": 2,
+            "translate_workers": 2,
+            "queue_size": 2,
+        },
         "translation": {
             "max_retries": 3,
             "retry_delay_seconds": 2,
@@ -142,7 +304,26 @@ def load_config():
             "verify_translation": True,
             "enable_parallel_translation": True,
             "parallel_max_workers": 3,
-            "parallel_min_chunks": 2
+            "parallel_min_chunks": 2,
+            "document_parallel": True,
+            "prompt_layout": "cache_friendly",
+            "stream_usage": True,
+            "pack_small_sections": True,
+            "pack_target_tokens": 1500,
+            "pack_max_sections": 8,
+            "streaming_threshold_mb": 2.0,
+            "streaming_window_sections": 8,
+            "streaming_glossary_sample_chars": 200000,
+            "protect": {
+                "html_anchors": True,
+                "images": True,
+                "urls": True,
+                "numeric_tables": True,
+                "numeric_table_min_rows": 4,
+                "numeric_table_max_text_ratio": 0.35,
+                "reference_lists": True,
+                "reference_list_min_entries": 5
+            }
         }
     }
 
@@ -303,14 +484,29 @@ def fix_author_code_blocks(markdown_text):
     return fixed_text
 
 
-def convert_pdf_to_md(pdf_path, output_dir):
-    """Convert PDF to MD using Marker-pdf library"""
+# Marker converter options shared by one-shot and resident conversion
+_MARKER_CONVERTER_CONFIG = {
+    "use_llm": False,  # Set to True if you want LLM-based table recognition
+    "force_ocr": False,  # Set to True to force OCR on all pages
+}
+
+
+def convert_pdf_to_md(pdf_path, output_dir, converter=None):
+    """Convert PDF to MD using Marker-pdf library
+
+    converter: optional pre-built PdfConverter (resident worker mode). When
+    given, models are neither loaded nor released here; the caller owns them.
+    """
     if not MARKER_AVAILABLE:
         print_error("marker-pdf library not installed!")
         print_info("Install it with: pip install marker-pdf")
         return None
 
     try:
+        from marker.converters.pdf import PdfConverter
+        from marker.models import create_model_dict
+        from marker.output import text_from_rendered
+
         print_info(f"Loading PDF: {pdf_path}")
         print_info(f"PDF file size: {os.path.getsize(pdf_path) / (1024*1024):.2f} MB")
 
@@ -343,23 +539,24 @@ def convert_pdf_to_md(pdf_path, output_dir):
                 print_error("GPU is in corrupted state. Please restart Python process or reboot system.")
                 raise RuntimeError("CUDA context is corrupted and cannot be recovered")
 
-        # Always use GPU
-        device = "cuda"
-        dtype = torch.float16
-        print_success(f"Using GPU mode (forced)")
-
-        # Create model dict (this loads the AI models)
-        print_info(f"Loading Marker-pdf models on GPU... (this may take a minute)")
-        model_dict = create_model_dict(device=device, dtype=dtype)
-
-        # Create converter
-        converter = PdfConverter(
-            artifact_dict=model_dict,
-            config={
-                "use_llm": False,  # Set to True if you want LLM-based table recognition
-                "force_ocr": False,  # Set to True to force OCR on all pages
-            }
-        )
+        owns_models = converter is None
+        if owns_models:
+            # Always use GPU
+            device = "cuda"
+            dtype = torch.float16
+            print_success(f"Using GPU mode (forced)")
+
+            # Create model dict (this loads the AI models)
+            print_info(f"Loading Marker-pdf models on GPU... (this may take a minute)")
+            model_dict = create_model_dict(device=device, dtype=dtype)
+
+            # Create converter
+            converter = PdfConverter(
+                artifact_dict=model_dict,
+                config=dict(_MARKER_CONVERTER_CONFIG)
+            )
+        else:
+            print_info("Using resident Marker-pdf models")
 
         # Convert PDF
         print_info("Converting PDF to Markdown (this may take several minutes)...")
@@ -470,9 +667,10 @@ def convert_pdf_to_md(pdf_path, output_dir):
                 mem_before = torch.cuda.memory_allocated() / (1024**3)  # GB
                 print_info(f"GPU memory allocated before cleanup: {mem_before:.2f} GB")
 
-            # Delete large objects
-            del model_dict
-            del converter
+            # Delete large objects (resident models stay loaded for the next PDF)
+            if owns_models:
+                del model_dict
+                del converter
             del rendered
             if 'full_text' in locals():
                 del full_text
@@ -508,7 +706,7 @@ def convert_pdf_to_md(pdf_path, output_dir):
             import gc
             if 'model_dict' in locals():
                 del model_dict
-            if 'converter' in locals():
+            if 'converter' in locals() and locals().get('owns_models'):
                 del converter
             if 'rendered' in locals():
                 del rendered
@@ -562,9 +760,12 @@ def _parse_mineru_progress(line):
     return None
 
 
-def convert_pdf_to_md_mineru(pdf_path, output_dir, config, status_info=None):
+def convert_pdf_to_md_mineru(pdf_path, output_dir, config, status_info=None, use_python_api=False):
     """Convert PDF to MD using MinerU CLI with real-time progress tracking.
 
+    use_python_api: run MinerU in-process instead of the CLI. Used by the
+    resident worker so MinerU's cached models survive between documents.
+
     Returns: md_path (str) or None on failure.
     Output contract matches convert_pdf_to_md():
       - {output_dir}/{stem}.md    (markdown file)
@@ -609,6 +810,25 @@ def convert_pdf_to_md_mineru(pdf_path, output_dir, config, status_info=None):
 
         _update_detail("Starting MinerU...")
 
+        def _run_python_api():
+            # Python API (no real-time progress)
+            try:
+                from mineru.cli.common import do_parse, read_fn as mineru_read_fn
+                _update_detail("Converting (Python API)...")
+                pdf_bytes = mineru_read_fn(pdf_path)
+                do_parse(
+                    output_dir=output_dir,
+                    pdf_file_names=[pdf_stem],
+                    pdf_bytes_list=[pdf_bytes],
+                    p_lang_list=[lang],
+                    backend=backend,
+                    parse_method=method,
+                )
+                return True
+            except Exception as api_err:
+                print_error(f"MinerU Python API failed: {api_err}")
+                return False
+
         # Use CLI with real-time output parsing for progress tracking
         conversion_success = False
         cmd = [
@@ -616,66 +836,56 @@ def convert_pdf_to_md_mineru(pdf_path, output_dir, config, status_info=None):
             "-b", backend, "-l", lang, "-m", method,
         ]
 
-        try:
-            print_info(f"Running: {' '.join(cmd)}")
-            proc = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-            )
+        if use_python_api and MINERU_AVAILABLE:
+            conversion_success = _run_python_api()
+        else:
+            try:
+                print_info(f"Running: {' '.join(cmd)}")
+                proc = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    bufsize=1,
+                )
 
-            import time
-            last_detail = None
-            last_update_time = 0
-            for line in proc.stdout:
-                line = line.rstrip()
-                if line:
-                    print(f"  [MinerU] {line}")
-                    # Parse for known stage transitions
-                    detail = _parse_mineru_progress(line)
-                    if detail:
-                        now = time.time()
-                        # Throttle: update at most every 2s, or when stage name changes
-                        stage_name = detail.split(" (")[0]  # "OCR recognition" from "OCR recognition (50%)"
-                        last_stage_name = last_detail.split(" (")[0] if last_detail else None
-                        if stage_name != last_stage_name or (now - last_update_time) >= 2:
-                            last_detail = detail
-                            last_update_time = now
-                            _update_detail(detail)
-
-            proc.wait(timeout=600)
-            if proc.returncode == 0:
-                conversion_success = True
-            else:
-                print_error(f"MinerU CLI exited with code {proc.returncode}")
-        except FileNotFoundError:
-            print_warning("MinerU CLI not found, trying Python API...")
-            # Fallback: Python API (no real-time progress)
-            if MINERU_AVAILABLE:
-                try:
-                    _update_detail("Converting (Python API)...")
-                    pdf_bytes = mineru_read_fn(pdf_path)
-                    do_parse(
-                        output_dir=output_dir,
-                        pdf_file_names=[pdf_stem],
-                        pdf_bytes_list=[pdf_bytes],
-                        p_lang_list=[lang],
-                        backend=backend,
-                        parse_method=method,
-                    )
+                import time
+                last_detail = None
+                last_update_time = 0
+                for line in proc.stdout:
+                    line = line.rstrip()
+                    if line:
+                        print(f"  [MinerU] {line}")
+                        # Parse for known stage transitions
+                        detail = _parse_mineru_progress(line)
+                        if detail:
+                            now = time.time()
+                            # Throttle: update at most every 2s, or when stage name changes
+                            stage_name = detail.split(" (")[0]  # "OCR recognition" from "OCR recognition (50%)"
+                            last_stage_name = last_detail.split(" (")[0] if last_detail else None
+                            if stage_name != last_stage_name or (now - last_update_time) >= 2:
+                                last_detail = detail
+                                last_update_time = now
+                                _update_detail(detail)
+
+                proc.wait(timeout=600)
+                if proc.returncode == 0:
                     conversion_success = True
-                except Exception as api_err:
-                    print_error(f"MinerU Python API failed: {api_err}")
-            else:
-                print_error("Neither MinerU CLI nor Python API available!")
-        except subprocess.TimeoutExpired:
-            print_error("MinerU timed out (600s)")
-            try:
-                proc.kill()
-            except Exception:
-                pass
+                else:
+                    print_error(f"MinerU CLI exited with code {proc.returncode}")
+            except FileNotFoundError:
+                print_warning("MinerU CLI not found, trying Python API...")
+                # Fallback: Python API (no real-time progress)
+                if MINERU_AVAILABLE:
+                    conversion_success = _run_python_api()
+                else:
+                    print_error("Neither MinerU CLI nor Python API available!")
+            except subprocess.TimeoutExpired:
+                print_error("MinerU timed out (600s)")
+                try:
+                    proc.kill()
+                except Exception:
+                    pass
 
         if not conversion_success:
             print_error("MinerU conversion failed")
@@ -759,11 +969,13 @@ def convert_pdf_to_md_mineru(pdf_path, output_dir, config, status_info=None):
         return None
 
 
-def convert_pdf_to_md_dispatch(pdf_path, output_dir, config, status_info=None):
+def convert_pdf_to_md_dispatch(pdf_path, output_dir, config, status_info=None, worker=None, pdf_sha256=None):
     """Dispatch PDF conversion to the configured engine (marker or mineru).
 
     Engine is selected via PDF_CONVERTER environment variable.
     status_info: optional dict with keys (pdf_name, stage_num, total_stages) for progress updates.
+    worker: optional ConversionWorker keeping models resident between PDFs.
+    pdf_sha256: optional precomputed PDF hash for the conversion cache.
     Returns: md_path (str) or None on failure.
     """
     engine = os.environ.get("PDF_CONVERTER", "marker").lower()
@@ -773,13 +985,843 @@ def convert_pdf_to_md_dispatch(pdf_path, output_dir, config, status_info=None):
             print_error("PDF_CONVERTER=mineru but MinerU is not installed!")
             print_info("Install it with: pip install 'mineru[all]'")
             return None
-        return convert_pdf_to_md_mineru(pdf_path, output_dir, config, status_info=status_info)
+        if worker is not None:
+            convert = lambda: worker.convert(pdf_path, output_dir, status_info=status_info)
+        else:
+            convert = lambda: convert_pdf_to_md_mineru(pdf_path, output_dir, config, status_info=status_info)
     else:
         if not MARKER_AVAILABLE:
             print_error("PDF_CONVERTER=marker but marker-pdf is not installed!")
             print_info("Install it with: pip install marker-pdf")
             return None
-        return convert_pdf_to_md(pdf_path, output_dir)
+        if worker is not None:
+            convert = lambda: worker.convert(pdf_path, output_dir, status_info=status_info)
+        else:
+            convert = lambda: convert_pdf_to_md(pdf_path, output_dir)
+
+    return _dispatch_with_cache(convert, pdf_path, output_dir, config, engine, pdf_sha256=pdf_sha256)
+
+
+##############################################################################
+# Conversion Cache
+# Content-addressed store of converter output, keyed by PDF hash + engine
+##############################################################################
+
+def _converter_version(engine):
+    """Installed version of the converter package, or None."""
+    from importlib import metadata as _metadata
+    package = "mineru" if engine == "mineru" else "marker-pdf"
+    try:
+        return _metadata.version(package)
+    except Exception:
+        return None
+
+
+class ConversionCache:
+    """Markdown, images and JSON produced by a converter, stored per cache key.
+
+    The key combines the PDF SHA-256, converter engine, engine version and
+    engine settings (converter.mineru for MinerU), so upgrading the engine or
+    changing backend/method/lang never serves stale output. Each entry is a
+    directory holding manifest.json and files/; the manifest's last_used
+    drives size-bounded LRU eviction.
+    """
+
+    def __init__(self, root=None, max_size_gb=20.0):
+        self.root = os.path.expanduser(root or "~/.cache/paperflow/conversions")
+        self.max_bytes = int(float(max_size_gb) * 1024 ** 3)
+
+    @classmethod
+    def from_config(cls, config):
+        cache_cfg = config.get("conversion_cache", {})
+        if not cache_cfg.get("enabled", True):
+            return None
+        return cls(cache_cfg.get("dir"), cache_cfg.get("max_size_gb", 20.0))
+
+    @staticmethod
+    def make_key(pdf_sha256, engine, config):
+        settings = config.get("converter", {}).get("mineru", {}) if engine == "mineru" else _MARKER_CONVERTER_CONFIG
+        return _text_sha256(
+            pdf_sha256, engine, _converter_version(engine) or "",
+            json.dumps(settings, sort_keys=True),
+        )
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _read_manifest(self, entry_dir):
+        with open(os.path.join(entry_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def entries(self):
+        """Yield (entry_dir, manifest) for every readable cache entry."""
+        if not os.path.isdir(self.root):
+            return
+        for prefix in sorted(os.listdir(self.root)):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for key in sorted(os.listdir(prefix_dir)):
+                entry_dir = os.path.join(prefix_dir, key)
+                try:
+                    yield entry_dir, self._read_manifest(entry_dir)
+                except Exception:
+                    continue
+
+    def restore(self, key, output_dir, stem):
+        """Copy a cached conversion into output_dir. Returns md_path or None on miss."""
+        entry_dir = self._entry_dir(key)
+        try:
+            manifest = self._read_manifest(entry_dir)
+        except Exception:
+            return None
+
+        old_stem = manifest["stem"]
+        os.makedirs(output_dir, exist_ok=True)
+        md_path = None
+        for rel in manifest["files"]:
+            dest_rel = stem + rel[len(old_stem):] if rel.startswith(old_stem) else rel
+            dest = os.path.join(output_dir, dest_rel)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copy2(os.path.join(entry_dir, "files", rel), dest)
+            if rel == manifest["md"]:
+                md_path = dest
+
+        manifest["last_used"] = time.time()
+        manifest["hits"] = manifest.get("hits", 0) + 1
+        try:
+            _write_json_atomic(os.path.join(entry_dir, "manifest.json"), manifest)
+        except Exception:
+            pass
+        return md_path
+
+    def store(self, key, output_dir, md_path, files, meta=None):
+        """Copy conversion outputs (paths relative to output_dir) into the cache."""
+        entry_dir = self._entry_dir(key)
+        if os.path.isdir(entry_dir):
+            return
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            size = 0
+            for rel in files:
+                dest = os.path.join(tmp_dir, "files", rel)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                shutil.copy2(os.path.join(output_dir, rel), dest)
+                size += os.path.getsize(dest)
+            manifest = dict(meta or {})
+            manifest.update(
+                key=key,
+                stem=os.path.splitext(os.path.basename(md_path))[0],
+                md=os.path.relpath(md_path, output_dir),
+                files=sorted(files),
+                size_bytes=size,
+                created_at=time.time(),
+                last_used=time.time(),
+                hits=0,
+            )
+            _write_json_atomic(os.path.join(tmp_dir, "manifest.json"), manifest)
+            os.rename(tmp_dir, entry_dir)
+        except Exception as e:
+            print_warning(f"Conversion cache store failed: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.prune()
+
+    def prune(self, max_bytes=None, older_than_seconds=None, dry_run=False):
+        """Evict least recently used entries until the cache fits max_bytes.
+
+        Returns the list of evicted manifests.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries(), key=lambda e: e[1].get("last_used", 0))
+        total = sum(m.get("size_bytes", 0) for _, m in entries)
+        now = time.time()
+        evicted = []
+        for entry_dir, manifest in entries:
+            expired = older_than_seconds is not None and now - manifest.get("last_used", 0) > older_than_seconds
+            if total <= max_bytes and not expired:
+                continue
+            if not dry_run:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= manifest.get("size_bytes", 0)
+            evicted.append(manifest)
+        return evicted
+
+
+def _list_output_files(output_dir):
+    """Relative path -> mtime_ns of every file under output_dir."""
+    found = {}
+    for root, _, files in os.walk(output_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                found[os.path.relpath(path, output_dir)] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+    return found
+
+
+def _dispatch_with_cache(convert, pdf_path, output_dir, config, engine, pdf_sha256=None):
+    """Serve a conversion from ConversionCache, or run convert() and store its output."""
+    cache = ConversionCache.from_config(config)
+    if cache is None:
+        return convert()
+
+    stem = os.path.basename(pdf_path).replace('.pdf', '')
+    try:
+        key = cache.make_key(pdf_sha256 or _file_sha256(pdf_path), engine, config)
+        md_path = cache.restore(key, output_dir, stem)
+    except Exception as e:
+        print_warning(f"Conversion cache lookup failed: {e}")
+        key, md_path = None, None
+    if md_path:
+        print_success(f"Conversion cache hit ({engine}): {key[:12]}")
+        return md_path
+
+    before = _list_output_files(output_dir) if os.path.isdir(output_dir) else {}
+    md_path = convert()
+    if md_path and key and os.path.exists(md_path):
+        after = _list_output_files(output_dir)
+        produced = [rel for rel, mtime in after.items() if before.get(rel) != mtime]
+        cache.store(key, output_dir, md_path, produced, meta={
+            "pdf_name": os.path.basename(pdf_path),
+            "engine": engine,
+            "engine_version": _converter_version(engine),
+        })
+    return md_path
+
+
+##############################################################################
+# Resident Conversion Worker
+# Keep converter models loaded in a child process, recycle it periodically
+##############################################################################
+
+def _gpu_free_gb():
+    """Return free GPU memory in GB, or None if it cannot be queried."""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return torch.cuda.mem_get_info()[0] / (1024**3)
+    except Exception:
+        pass
+    return None
+
+
+def _load_resident_converter(engine):
+    """Load converter models once for the lifetime of a worker process.
+
+    Returns a PdfConverter for marker. MinerU keeps its models in an internal
+    singleton when driven through the Python API, so nothing is returned.
+    """
+    if engine == "mineru":
+        return None
+
+    import torch
+    from marker.converters.pdf import PdfConverter
+    from marker.models import create_model_dict
+    if not torch.cuda.is_available():
+        raise RuntimeError("GPU (CUDA) is required but not available. Please check your PyTorch installation and GPU drivers.")
+
+    print_info("Loading Marker-pdf models on GPU for resident worker... (this may take a minute)")
+    model_dict = create_model_dict(device="cuda", dtype=torch.float16)
+    converter = PdfConverter(artifact_dict=model_dict, config=dict(_MARKER_CONVERTER_CONFIG))
+    print_success("Resident Marker-pdf models loaded")
+    return converter
+
+
+def _conversion_worker_main(engine, config, jobs, results):
+    """Child process entry point: load models once, then convert jobs until told to stop."""
+    os.environ["PDF_CONVERTER"] = engine
+    try:
+        converter = _load_resident_converter(engine)
+    except Exception as e:
+        results.put({"ready": False, "error": str(e)})
+        return
+    results.put({"ready": True, "gpu_free_gb": _gpu_free_gb()})
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        if job.get("log_file"):
+            _attach_log_file(job["log_file"])
+        _LOG_TAG.set(job.get("log_tag"))
+        try:
+            if engine == "mineru":
+                md_path = convert_pdf_to_md_mineru(
+                    job["pdf_path"], job["output_dir"], config,
+                    status_info=job.get("status_info"), use_python_api=True
+                )
+            else:
+                md_path = convert_pdf_to_md(job["pdf_path"], job["output_dir"], converter=converter)
+        except Exception as e:
+            print_error(f"Resident conversion error: {e}")
+            md_path = None
+        results.put({"md_path": md_path, "gpu_free_gb": _gpu_free_gb()})
+
+
+class ConversionWorker:
+    """Long-lived conversion process that keeps PDF converter models resident.
+
+    Models are loaded once in a spawned child process and reused for every PDF.
+    The child is recycled (terminated and re-spawned on the next job) after
+    ``max_documents`` conversions, when free VRAM drops below
+    ``min_free_vram_gb``, or when it crashes or times out. This keeps the CUDA
+    context isolation that the one-process-per-PDF design existed for.
+    """
+
+    def __init__(self, config, engine=None):
+        worker_cfg = config.get("converter", {}).get("worker", {})
+        self.config = config
+        self.engine = (engine or os.environ.get("PDF_CONVERTER", "marker")).lower()
+        self.max_documents = int(worker_cfg.get("max_documents", 20))
+        self.min_free_vram_gb = float(worker_cfg.get("min_free_vram_gb", 2.0))
+        self.job_timeout = float(worker_cfg.get("job_timeout_seconds", 1800))
+        self._proc = None
+        self._jobs = None
+        self._results = None
+        self._docs_done = 0
+        self.recycle_count = 0
+
+    def _start(self):
+        import multiprocessing
+        # spawn: never fork a parent that may hold threads or a CUDA context
+        ctx = multiprocessing.get_context("spawn")
+        self._jobs = ctx.Queue()
+        self._results = ctx.Queue()
+        self._proc = ctx.Process(
+            target=_conversion_worker_main,
+            args=(self.engine, self.config, self._jobs, self._results),
+            name="paperflow-converter",
+            daemon=True,
+        )
+        self._proc.start()
+        self._docs_done = 0
+        print_info(f"Conversion worker started (pid {self._proc.pid}, engine: {self.engine})")
+
+        msg = self._wait_result()
+        if not msg or not msg.get("ready"):
+            error = (msg or {}).get("error", "worker exited during model load")
+            self._stop(force=True)
+            raise RuntimeError(f"Conversion worker failed to start: {error}")
+
+    def _wait_result(self, timeout=None):
+        """Wait for the next child message, bailing out if the child dies."""
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            try:
+                return self._results.get(timeout=5)
+            except queue.Empty:
+                if not self._proc.is_alive():
+                    print_error(f"Conversion worker exited unexpectedly (code {self._proc.exitcode})")
+                    return None
+                if deadline and time.time() > deadline:
+                    print_error(f"Conversion worker timed out ({timeout:.0f}s)")
+                    return None
+
+    def _stop(self, force=False):
+        if self._proc is None:
+            return
+        try:
+            if not force and self._proc.is_alive():
+                self._jobs.put(None)
+                self._proc.join(timeout=30)
+            if self._proc.is_alive():
+                self._proc.terminate()
+                self._proc.join(timeout=10)
+        except Exception as e:
+            print_warning(f"Conversion worker shutdown warning: {e}")
+        self._proc = None
+        self._jobs = None
+        self._results = None
+
+    def _recycle(self, reason):
+        print_info(f"Recycling conversion worker: {reason}")
+        self.recycle_count += 1
+        self._stop(force=False)
+
+    @property
+    def is_running(self):
+        return self._proc is not None and self._proc.is_alive()
+
+    def convert(self, pdf_path, output_dir, status_info=None):
+        """Convert one PDF in the resident worker. Returns md_path or None."""
+        if self._proc is None or not self._proc.is_alive():
+            self._proc = None
+            self._start()
+
+        self._jobs.put({
+            "pdf_path": pdf_path,
+            "output_dir": output_dir,
+            "status_info": status_info,
+            "log_file": getattr(sys.stdout, "log_path", None),
+            "log_tag": _LOG_TAG.get(),
+        })
+        msg = self._wait_result(timeout=self.job_timeout)
+        if msg is None:
+            self.recycle_count += 1
+            self._stop(force=True)
+            return None
+
+        self._docs_done += 1
+        free_gb = msg.get("gpu_free_gb")
+        if self._docs_done >= self.max_documents:
+            self._recycle(f"{self._docs_done} document(s) converted")
+        elif free_gb is not None and free_gb < self.min_free_vram_gb:
+            self._recycle(f"free VRAM {free_gb:.2f} GB < {self.min_free_vram_gb:.2f} GB")
+        return msg.get("md_path")
+
+    def close(self):
+        """Stop the child process and release its GPU memory."""
+        self._stop(force=False)
+
+
+##############################################################################
+# LLM Concurrency
+# AIMD limiter shared by translation and metadata calls to the LLM gateway
+##############################################################################
+
+# The AIMD core is shared with the viewer, whose image only ships viewer/
+from viewer.app.services.aimd import AIMDLimiter
+
+class AdaptiveConcurrencyLimiter(AIMDLimiter):
+    """AIMDLimiter (viewer/app/services/aimd.py) for pipeline threads and event loops.
+
+    Threads block in acquire(); coroutines poll with acquire_async(). Every
+    release publishes a snapshot to status_path (at most every 5 s) for the
+    viewer's status page.
+    """
+
+    def __init__(self, name="llm", initial=3, min_limit=1, max_limit=16, window=50,
+                 latency_tolerance=2.0, error_threshold=0.1, decrease_factor=0.5,
+                 decrease_cooldown_seconds=5.0, status_path=None):
+        super().__init__(name, initial, min_limit, max_limit, window, latency_tolerance,
+                         error_threshold, decrease_factor, decrease_cooldown_seconds)
+        self.status_path = status_path
+        self._last_publish = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while not self._try_acquire_locked():
+                wait = max(self.blocked_until - time.time(), 0) or 1.0
+                self._cond.wait(timeout=min(wait, 1.0))
+
+    def try_acquire(self):
+        """Take a slot only if one is free right now (used for hedged requests)."""
+        with self._cond:
+            return self._try_acquire_locked()
+
+    async def acquire_async(self):
+        import asyncio
+        delay = 0.01
+        while True:
+            with self._cond:
+                if self._try_acquire_locked():
+                    return
+                blocked = self.blocked_until - time.time()
+            await asyncio.sleep(max(blocked, delay) if blocked > 0 else delay)
+            delay = min(delay * 2, 0.2)
+
+    def release(self, latency=None, size=None, error=None, record=True):
+        """Return a slot and record the outcome; record=False only frees the slot."""
+        with self._cond:
+            self._release_locked(latency=latency, size=size, error=error, record=record)
+            self._cond.notify_all()
+        self._publish()
+
+    def snapshot(self):
+        with self._cond:
+            return self._snapshot_locked()
+
+    def _publish(self, min_interval=5.0):
+        if not self.status_path or time.time() - self._last_publish < min_interval:
+            return
+        self._last_publish = time.time()
+        try:
+            _write_json_atomic(self.status_path, self.snapshot())
+        except Exception:
+            pass
+
+
+_LLM_LIMITERS = {}
+_LLM_LIMITERS_LOCK = threading.Lock()
+
+def get_llm_limiter(config, base_url=None):
+    """Shared AdaptiveConcurrencyLimiter per LLM endpoint, or None if disabled."""
+    lim_cfg = config.get("llm_concurrency", {})
+    if not lim_cfg.get("enabled", True):
+        return None
+    key = base_url or os.getenv("OPENAI_BASE_URL") or "default"
+    with _LLM_LIMITERS_LOCK:
+        limiter = _LLM_LIMITERS.get(key)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                name=key,
+                initial=lim_cfg.get("initial_limit", config.get("translation", {}).get("parallel_max_workers", 3)),
+                min_limit=lim_cfg.get("min_limit", 1),
+                max_limit=lim_cfg.get("max_limit", 16),
+                window=lim_cfg.get("window", 50),
+                latency_tolerance=lim_cfg.get("latency_tolerance", 2.0),
+                error_threshold=lim_cfg.get("error_threshold", 0.1),
+                decrease_factor=lim_cfg.get("decrease_factor", 0.5),
+                decrease_cooldown_seconds=lim_cfg.get("decrease_cooldown_seconds", 5.0),
+                status_path=os.path.join("logs", "llm_limiter.json"),
+            )
+            _LLM_LIMITERS[key] = limiter
+        return limiter
+
+
+class HedgePolicy:
+    """When to send a duplicate of a slow streaming LLM request.
+
+    Time to first token and seconds per 1000 source characters are tracked
+    over a window of completed requests. A request that has no first token
+    by the percentile TTFT, or is not finished by the percentile duration
+    for its size, gets one hedge: the first of the two to finish wins and
+    the other is cancelled. Hedges are capped at max_ratio of all requests
+    so the extra spend stays bounded.
+    """
+
+    def __init__(self, percentile=0.95, min_samples=20, max_ratio=0.1, min_delay_seconds=5.0, window=200):
+        from collections import deque
+        self.percentile = float(percentile)
+        self.min_samples = max(1, int(min_samples))
+        self.max_ratio = float(max_ratio)
+        self.min_delay = float(min_delay_seconds)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._ttft = deque(maxlen=window)
+        self._per_kchar = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def _q(self, values):
+        if len(values) < self.min_samples:
+            return None
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+
+    def observe(self, ttft, seconds, size):
+        with self._lock:
+            if ttft is not None:
+                self._ttft.append(ttft)
+            self._per_kchar.append(seconds / max(size, 1) * 1000)
+
+    def deadlines(self, size):
+        """(first_token_deadline, finish_deadline) in seconds for a new request;
+        None until min_samples requests have been observed."""
+        with self._lock:
+            self.requests += 1
+            ttft = self._q(self._ttft)
+            per_kchar = self._q(self._per_kchar)
+        first = max(ttft, self.min_delay) if ttft is not None else None
+        finish = max(per_kchar * max(size, 1) / 1000, self.min_delay) if per_kchar is not None else None
+        return first, finish
+
+    def try_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.max_ratio * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def undo_hedge(self):
+        """The hedge allowed by try_hedge() could not be sent after all."""
+        with self._lock:
+            self.hedges -= 1
+
+    def record_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "ttft_deadline_seconds": self._q(self._ttft),
+                "seconds_per_1000_chars": self._q(self._per_kchar),
+            }
+
+
+_HEDGE_POLICIES = {}
+
+def get_hedge_policy(config, base_url=None):
+    """Shared HedgePolicy per LLM endpoint, or None unless llm_hedging is enabled."""
+    hedge_cfg = config.get("llm_hedging", {})
+    if not hedge_cfg.get("enabled", False):
+        return None
+    key = base_url or os.getenv("OPENAI_BASE_URL") or "default"
+    with _LLM_LIMITERS_LOCK:
+        policy = _HEDGE_POLICIES.get(key)
+        if policy is None:
+            policy = HedgePolicy(
+                percentile=hedge_cfg.get("percentile", 0.95),
+                min_samples=hedge_cfg.get("min_samples", 20),
+                max_ratio=hedge_cfg.get("max_hedge_ratio", 0.1),
+                min_delay_seconds=hedge_cfg.get("min_delay_seconds", 5.0),
+                window=hedge_cfg.get("window", 200),
+            )
+            _HEDGE_POLICIES[key] = policy
+        return policy
+
+
+async def _race_hedged(primary, start_hedge, policy, first_deadline, finish_deadline, progress, start_time):
+    """Await primary; past a deadline, race it against one hedge from start_hedge().
+
+    start_hedge() returns the duplicate task, or None when the hedge budget or
+    the concurrency limit does not allow one.
+    progress["first_token"] is set by the primary once it streams. Returns
+    (result, hedge_won). The losing task is cancelled.
+    """
+    import asyncio
+    slow = False
+    if first_deadline is not None:
+        done, _ = await asyncio.wait({primary}, timeout=first_deadline)
+        if done:
+            return primary.result(), False
+        slow = progress.get("first_token") is None
+    if not slow and finish_deadline is not None:
+        remaining = finish_deadline - (time.time() - start_time)
+        if remaining > 0:
+            done, _ = await asyncio.wait({primary}, timeout=remaining)
+            if done:
+                return primary.result(), False
+        slow = True
+    hedge = start_hedge() if slow else None
+    if hedge is None:
+        return await primary, False
+
+    print_info(f"Request slow ({'no first token' if progress.get('first_token') is None else 'not finished'} "
+               f"after {time.time() - start_time:.1f}s), sent a hedged duplicate")
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        policy.record_win()
+                    return task.result(), task is hedge
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+##############################################################################
+# LLM Runtime
+# One event loop per process and pooled HTTP clients per endpoint
+##############################################################################
+
+class _LLMEventLoop:
+    """Background thread running the process-wide event loop for LLM I/O.
+
+    Every LLM call (metadata, doc_type follow-up, translation in both the
+    sequential and the parallel path) runs here, so pooled clients and their
+    keep-alive connections outlive a single section or paper.
+    """
+
+    def __init__(self):
+        import asyncio
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="paperflow-llm-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import asyncio
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro):
+        import asyncio
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run_on_llm_loop() called from the LLM loop itself; await instead")
+        tag = _LOG_TAG.get()
+        if tag:
+            coro = self._tagged(tag, coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    @staticmethod
+    async def _tagged(tag, coro):
+        # Tasks copy the loop thread's context, not the caller's
+        _LOG_TAG.set(tag)
+        return await coro
+
+
+_LLM_LOOP = None
+_LLM_CLIENTS = {}
+_LLM_RUNTIME_LOCK = threading.Lock()
+
+def run_on_llm_loop(coro):
+    """Run a coroutine on the shared LLM loop and block until it finishes."""
+    global _LLM_LOOP
+    with _LLM_RUNTIME_LOCK:
+        if _LLM_LOOP is None:
+            _LLM_LOOP = _LLMEventLoop()
+    return _LLM_LOOP.run(coro)
+
+
+def get_llm_client(config, base_url, api_key):
+    """Long-lived AsyncOpenAI client per (endpoint, key) with a pooled HTTP client.
+
+    Keep-alive pool sizes come from config["llm_client"]; HTTP/2 is used when
+    enabled and the h2 package is installed. Use only on the shared LLM loop.
+    """
+    key = (base_url, api_key)
+    with _LLM_RUNTIME_LOCK:
+        client = _LLM_CLIENTS.get(key)
+        if client is not None:
+            return client
+
+        import importlib.util
+        import httpx
+        from openai import AsyncOpenAI
+
+        client_cfg = config.get("llm_client", {})
+        http2 = bool(client_cfg.get("http2", True)) and importlib.util.find_spec("h2") is not None
+        http_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=int(client_cfg.get("max_connections", 32)),
+                max_keepalive_connections=int(client_cfg.get("max_keepalive_connections", 16)),
+                keepalive_expiry=float(client_cfg.get("keepalive_expiry_seconds", 60)),
+            ),
+            timeout=httpx.Timeout(float(config.get("translation", {}).get("timeout_seconds", 300)), connect=10.0),
+        )
+        client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+        cassette_cfg = config.get("llm_cassette", {})
+        if cassette_cfg.get("record", False):
+            path = os.path.join(cassette_cfg.get("dir", "logs/cassettes"),
+                                f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl")
+            client = _RecordingClient(client, path)
+            print_info(f"Recording LLM calls to {path}")
+        _LLM_CLIENTS[key] = client
+        print_info(f"LLM client pool for {base_url} (HTTP/{'2' if http2 else '1.1'}, keep-alive)")
+        return client
+
+
+def cassette_key(model, messages):
+    """Replay key of one chat.completions request (scripts/mock_llm_server.py
+    computes the same digest)."""
+    import hashlib
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cassette_kind(messages):
+    system = messages[0].get("content", "") if messages else ""
+    if system.startswith(METADATA_EXTRACTION_PROMPT[:40]):
+        return "metadata"
+    if system.startswith("Classify this document"):
+        return "doc_type"
+    if system.startswith(GLOSSARY_PROMPT[:40]):
+        return "glossary"
+    return "translation"
+
+
+def _usage_dict(usage):
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+        "cached_tokens": _usage_cached_tokens(usage),
+    }
+
+
+class _RecordingStream:
+    """Passes a response stream through while recording its deltas with time offsets."""
+
+    def __init__(self, stream, entry, write, start):
+        self._stream = stream
+        self._entry = entry
+        self._write = write
+        self._start = start
+
+    async def __aiter__(self):
+        deltas = []
+        usage = None
+        complete = False
+        try:
+            async for chunk in self._stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    deltas.append([round(time.time() - self._start, 3), chunk.choices[0].delta.content])
+                yield chunk
+            complete = True
+        finally:
+            self._entry["response"] = {
+                "content": ''.join(d[1] for d in deltas),
+                "deltas": deltas,
+                "usage": _usage_dict(usage),
+                "complete": complete,
+            }
+            self._entry["elapsed"] = round(time.time() - self._start, 3)
+            self._write(self._entry)
+
+    async def close(self):
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            await close()
+
+
+class _RecordingClient:
+    """AsyncOpenAI stand-in that appends every chat.completions call to a JSONL cassette.
+
+    Each line holds the replay key (cassette_key), the request, the full
+    response (with timed deltas for streams), usage and latency;
+    scripts/mock_llm_server.py replays a directory of cassettes.
+    """
+
+    def __init__(self, client, path):
+        import types
+        self._client = client
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+
+    def _write(self, entry):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    async def _create(self, **kwargs):
+        messages = kwargs.get("messages", [])
+        entry = {
+            "key": cassette_key(kwargs.get("model"), messages),
+            "kind": _cassette_kind(messages),
+            "model": kwargs.get("model"),
+            "stream": bool(kwargs.get("stream")),
+            "request": {k: v for k, v in kwargs.items() if k in ("messages", "temperature", "max_tokens")},
+            "recorded_at": datetime.now().isoformat(),
+        }
+        start = time.time()
+        try:
+            result = await self._client.chat.completions.create(**kwargs)
+        except Exception as e:
+            entry["error"] = {"type": type(e).__name__,
+                              "status": getattr(e, "status_code", None), "message": str(e)[:500]}
+            entry["elapsed"] = round(time.time() - start, 3)
+            self._write(entry)
+            raise
+        if entry["stream"]:
+            return _RecordingStream(result, entry, self._write, start)
+        entry["response"] = {"content": result.choices[0].message.content,
+                             "usage": _usage_dict(getattr(result, "usage", None)), "complete": True}
+        entry["elapsed"] = round(time.time() - start, 3)
+        self._write(entry)
+        return result
 
 
 ##############################################################################
@@ -816,17 +1858,16 @@ Rules:
 - If you cannot determine a field, use null for strings or [] for arrays. For doc_type, always choose the closest match — never omit it."""
 
 
-def extract_paper_metadata(md_path, output_dir, config):
+def extract_paper_metadata(md_path, output_dir, config, usage=None):
     """Extract paper metadata (title, authors, abstract, categories) using AI.
 
     Reads the first portion of the markdown file and sends it to an
-    OpenAI-compatible API for structured metadata extraction.
+    OpenAI-compatible API for structured metadata extraction. usage is an
+    optional LLMUsage that records the extraction and doc_type calls.
 
     Returns:
         Metadata dict on success, None on failure.
     """
-    from openai import OpenAI
-
     # Load AI settings
     api_base = os.getenv("OPENAI_BASE_URL")
     api_key = os.getenv("OPENAI_API_KEY")
@@ -858,27 +1899,43 @@ def extract_paper_metadata(md_path, output_dir, config):
 
     print_info(f"Sending {len(md_content):,} chars to AI for metadata extraction...")
 
-    client = OpenAI(base_url=api_base, api_key=api_key)
+    try:
+        client = get_llm_client(config, api_base, api_key)
+    except Exception as e:
+        print_error(f"Failed to initialize OpenAI client: {e}")
+        return None
+    limiter = get_llm_limiter(config, api_base)
 
     for attempt in range(max_retries):
         try:
             import time
-            start_time = time.time()
             print_info(f"Calling API... (attempt {attempt+1}/{max_retries})")
 
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": METADATA_EXTRACTION_PROMPT},
-                    {"role": "user", "content": md_content}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=timeout
-            )
+            if limiter:
+                limiter.acquire()
+            start_time = time.time()
+            try:
+                response = run_on_llm_loop(client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": METADATA_EXTRACTION_PROMPT},
+                        {"role": "user", "content": md_content}
+                    ],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout
+                ))
+            except Exception as e:
+                if limiter:
+                    limiter.release(error=e)
+                raise
 
             result_text = response.choices[0].message.content.strip()
             elapsed = time.time() - start_time
+            if limiter:
+                limiter.release(latency=elapsed, size=len(result_text))
+            if usage is not None:
+                usage.record(getattr(response, "usage", None))
             print_info(f"API response received in {elapsed:.1f}s")
 
             # Strip markdown code block wrappers if present
@@ -914,7 +1971,7 @@ def extract_paper_metadata(md_path, output_dir, config):
             if not isinstance(doc_type, str) or doc_type.lower().strip() not in valid_doc_types:
                 print_warning("doc_type missing from AI response, requesting classification...")
                 try:
-                    dt_resp = client.chat.completions.create(
+                    dt_resp = run_on_llm_loop(client.chat.completions.create(
                         model=model,
                         messages=[
                             {"role": "system", "content": (
@@ -927,7 +1984,9 @@ def extract_paper_metadata(md_path, output_dir, config):
                         temperature=0,
                         max_tokens=10,
                         timeout=15,
-                    )
+                    ))
+                    if usage is not None:
+                        usage.record(getattr(dt_resp, "usage", None))
                     dt_val = dt_resp.choices[0].message.content.strip().lower().strip('"\'')
                     if dt_val in valid_doc_types:
                         metadata["doc_type"] = dt_val
@@ -986,12 +2045,19 @@ def extract_paper_metadata(md_path, output_dir, config):
             print_warning(f"JSON parse error (attempt {attempt+1}/{max_retries}): {e}")
             if attempt < max_retries - 1:
                 import time
+                if usage is not None:
+                    usage.record_retry()
                 time.sleep(retry_delay)
         except Exception as e:
             print_warning(f"Metadata extraction API error (attempt {attempt+1}/{max_retries}): {e}")
             if attempt < max_retries - 1:
                 import time
-                wait_time = retry_delay * (attempt + 1)
+                if usage is not None:
+                    usage.record_retry()
+                if limiter:
+                    wait_time = limiter.backoff_seconds(e, attempt, retry_delay)
+                else:
+                    wait_time = retry_delay * (attempt + 1)
                 time.sleep(wait_time)
 
     print_error("Metadata extraction failed after all retries")
@@ -1385,42 +2451,365 @@ def split_yaml_and_body(content):
     return '', content
 
 
-def clean_ocr_artifacts(text):
-    """Clean common OCR artifacts from marker-pdf output."""
-    import re
-    lines = text.split('\n')
-    cleaned = []
-
-    for line in lines:
-        stripped = line.strip()
-        # Skip standalone page numbers
-        if re.match(r'^[-–—]?\s*\d{1,4}\s*[-–—]?$', stripped):
-            continue
-        # Skip "Page N" / "Page N of M"
-        if re.match(r'^Page\s+\d+(\s+of\s+\d+)?$', stripped, re.IGNORECASE):
-            continue
-        # Skip copyright lines
-        if re.match(r'^[©®]\s*\d{4}', stripped):
-            continue
-        # Skip standalone DOI
-        if re.match(r'^(DOI|doi)\s*:\s*10\.', stripped):
-            continue
-        cleaned.append(line)
+# ── Markdown segment index ───────────────────────────────────────────────────
+MARKDOWN_INDEX_FILE = "markdown_index.json"
+_INDEX_HEADING_RE = re.compile(r'(#{1,6})[^\S\n]+(.+)')
+_INDEX_FENCE_RE = re.compile(r'^[^\S\n]*```', re.MULTILINE)
 
-    text = '\n'.join(cleaned)
 
-    # Fix hyphenation across lines: "compu-\nter" → "computer"
-    text = re.sub(r'(\w)-\n(\w)', r'\1\2', text)
+class MarkdownIndex:
+    """Block-level index of a markdown text, built in one pass over its lines.
 
-    # Fix marker-pdf author code block bug: ``` wrapping <sup> tags
-    # Use [^\n]* instead of .*? with DOTALL to prevent catastrophic backtracking
-    text = re.sub(
-        r'```\n((?:[^\n]*<sup>[^\n]*</sup>[^\n]*\n)+)```',
-        r'\1',
-        text
-    )
+    Blocks are YAML frontmatter, headings (one line each), fenced code,
+    $$ display math, tables (every line a | row) and paragraphs (everything
+    else up to a blank line). A fence or $$ without a closing line is plain
+    text, and a heading ends an open $$ block. Per block the index keeps char offsets, kind,
+    heading level, flags and the enclosing heading, in flat arrays so it is
+    cheap to keep around and to store in markdown_index.json. Heading lines
+    inside code fences are not headings.
+    """
 
-    return text
+    VERSION = 1
+    PARAGRAPH, HEADING, CODE, MATH, TABLE, YAML = range(6)
+    KIND_NAMES = ('paragraph', 'heading', 'code', 'math', 'table', 'yaml')
+    # Flags: inline $, inline `, | table rows, <<...>> placeholders
+    F_MATH, F_CODE, F_TABLE_ROWS, F_PLACEHOLDER = 1, 2, 4, 8
+
+    def __init__(self, length=0, body_start=0, groups=0):
+        from array import array
+        self.length = length
+        self.body_start = body_start
+        self.groups = groups  # runs of non-blank lines (paragraph count)
+        self.starts = array('l')
+        self.ends = array('l')
+        self.parents = array('l')
+        self.kinds = bytearray()
+        self.levels = bytearray()
+        self.flags = bytearray()
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def span(self, i):
+        return self.starts[i], self.ends[i]
+
+    def headings(self, max_level=6):
+        """Block indices of headings up to max_level, in document order."""
+        return [i for i, k in enumerate(self.kinds)
+                if k == self.HEADING and self.levels[i] <= max_level]
+
+    def heading_path(self, i, text):
+        """Texts of the headings enclosing block i (outermost first)."""
+        path = []
+        j = i if self.kinds[i] == self.HEADING else self.parents[i]
+        while j != -1:
+            path.append(_INDEX_HEADING_RE.fullmatch(text, self.starts[j], self.ends[j]).group(2).strip())
+            j = self.parents[j]
+        return path[::-1]
+
+    def has_flag(self, flag):
+        return any(f & flag for f in self.flags)
+
+    def _add(self, text, start, end, kind, level, parent):
+        flags = 0
+        if text.find('$', start, end) != -1:
+            flags |= self.F_MATH
+        if text.find('`', start, end) != -1:
+            flags |= self.F_CODE
+        if text.find('|', start, end) != -1:
+            flags |= self.F_TABLE_ROWS
+        if text.find('<<', start, end) != -1:
+            flags |= self.F_PLACEHOLDER
+        self.starts.append(start)
+        self.ends.append(end)
+        self.kinds.append(kind)
+        self.levels.append(level)
+        self.flags.append(flags)
+        self.parents.append(parent)
+
+    @classmethod
+    def build(cls, text, frontmatter=True):
+        """Index text; with frontmatter=False a leading '---' is not treated as YAML."""
+        body_start = 0
+        if frontmatter:
+            yaml_header, body = split_yaml_and_body(text)
+            body_start = len(text) - len(body)
+        index = cls(len(text), body_start)
+        if body_start:
+            index._add(text, 0, len(yaml_header), cls.YAML, 0, -1)
+
+        stack = []            # enclosing headings: (level, block index)
+        open_start = -1       # paragraph/table being collected
+        open_end = 0
+        all_rows = True
+        fence_start = -1      # ``` block being collected
+        math_start = -1       # $$ block being collected
+        in_group = False
+        pos, n = body_start, len(text)
+
+        def close_paragraph():
+            nonlocal open_start
+            if open_start != -1:
+                kind = cls.TABLE if all_rows else cls.PARAGRAPH
+                index._add(text, open_start, open_end, kind, 0, stack[-1][1] if stack else -1)
+                open_start = -1
+
+        while pos < n:
+            nl = text.find('\n', pos)
+            end = n if nl == -1 else nl
+            line = text[pos:end]
+            stripped = line.strip()
+            if stripped:
+                if not in_group:
+                    index.groups += 1
+                    in_group = True
+            else:
+                in_group = False
+
+            if fence_start != -1:
+                if stripped.startswith('```'):
+                    index._add(text, fence_start, end, cls.CODE, 0, stack[-1][1] if stack else -1)
+                    fence_start = -1
+            elif math_start != -1 and not (line[:1] == '#' and _INDEX_HEADING_RE.fullmatch(line)):
+                if '$$' in line:
+                    index._add(text, math_start, end, cls.MATH, 0, stack[-1][1] if stack else -1)
+                    math_start = -1
+            elif not stripped:
+                close_paragraph()
+            elif stripped.startswith('```') and (stripped.count('```') >= 2
+                                                 or _INDEX_FENCE_RE.search(text, end)):
+                close_paragraph()
+                if stripped.count('```') >= 2:
+                    index._add(text, pos, end, cls.CODE, 0, stack[-1][1] if stack else -1)
+                else:
+                    fence_start = pos
+            elif stripped.startswith('$$') and (stripped.count('$$') >= 2 or text.find('$$', end) != -1):
+                close_paragraph()
+                if stripped.count('$$') >= 2:
+                    index._add(text, pos, end, cls.MATH, 0, stack[-1][1] if stack else -1)
+                else:
+                    math_start = pos
+            elif line[0] == '#' and _INDEX_HEADING_RE.fullmatch(line):
+                close_paragraph()
+                if math_start != -1:
+                    # A heading ends a $$ block that was never closed
+                    index._add(text, math_start, pos - 1, cls.MATH, 0, stack[-1][1] if stack else -1)
+                    math_start = -1
+                level = len(line) - len(line.lstrip('#'))
+                while stack and stack[-1][0] >= level:
+                    stack.pop()
+                index._add(text, pos, end, cls.HEADING, level, stack[-1][1] if stack else -1)
+                stack.append((level, len(index) - 1))
+            else:
+                if open_start == -1:
+                    open_start = pos
+                    all_rows = True
+                open_end = end
+                if all_rows and not _TABLE_ROW_RE.match(line):
+                    all_rows = False
+            pos = end + 1
+
+        close_paragraph()
+        if math_start != -1:
+            index._add(text, math_start, n, cls.MATH, 0, stack[-1][1] if stack else -1)
+        return index
+
+    def to_dict(self):
+        return {
+            "version": self.VERSION,
+            "length": self.length,
+            "body_start": self.body_start,
+            "groups": self.groups,
+            "kind_names": list(self.KIND_NAMES),
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "kinds": list(self.kinds),
+            "levels": list(self.levels),
+            "flags": list(self.flags),
+            "parents": self.parents.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != cls.VERSION:
+            return None
+        index = cls(data["length"], data["body_start"], data.get("groups", 0))
+        index.starts.extend(data["starts"])
+        index.ends.extend(data["ends"])
+        index.parents.extend(data["parents"])
+        index.kinds.extend(data["kinds"])
+        index.levels.extend(data["levels"])
+        index.flags.extend(data["flags"])
+        return index
+
+
+_MARKDOWN_INDEXES = {}
+_MARKDOWN_INDEXES_LOCK = threading.Lock()
+_MARKDOWN_INDEX_CACHE_SIZE = 64
+
+
+def _markdown_sha256(text):
+    # Plain digest of the UTF-8 text, so the viewer can check the sidecar
+    import hashlib
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def get_markdown_index(text, frontmatter=True, cache=True):
+    """MarkdownIndex of text, built once per text version and process.
+
+    Stages that see the same text (heading normalization, section
+    classification, verification of a retried chunk) share one parse;
+    cache=False is for one-off texts such as LLM output.
+    """
+    key = (_markdown_sha256(text), frontmatter)
+    with _MARKDOWN_INDEXES_LOCK:
+        index = _MARKDOWN_INDEXES.get(key)
+    if index is not None:
+        return index
+    index = MarkdownIndex.build(text, frontmatter)
+    if cache:
+        with _MARKDOWN_INDEXES_LOCK:
+            if len(_MARKDOWN_INDEXES) >= _MARKDOWN_INDEX_CACHE_SIZE:
+                _MARKDOWN_INDEXES.pop(next(iter(_MARKDOWN_INDEXES)))
+            _MARKDOWN_INDEXES[key] = index
+    return index
+
+
+def save_markdown_index(md_path):
+    """Store the index of a final markdown file in its folder's markdown_index.json.
+
+    One entry per file name, keyed by the file's SHA-256; the viewer's RAG
+    chunker uses it instead of re-scanning the file. An entry whose hash
+    still matches is left as is.
+    """
+    try:
+        with open(md_path, 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+        path = os.path.join(os.path.dirname(md_path), MARKDOWN_INDEX_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        files = data.setdefault("files", {})
+        name = os.path.basename(md_path)
+        sha = _markdown_sha256(text)
+        entry = files.get(name) or {}
+        if entry.get("sha256") == sha and entry.get("version") == MarkdownIndex.VERSION:
+            return
+        files[name] = dict(get_markdown_index(text).to_dict(), sha256=sha,
+                           updated_at=datetime.now().isoformat())
+        _write_json_atomic(path, data)
+    except Exception as e:
+        print_warning(f"Failed to save markdown index for {os.path.basename(md_path)}: {e}")
+
+
+# Standalone page numbers, "Page N (of M)", copyright and DOI lines. Each
+# alternative is anchored on the preceding newline so one sub() drops whole
+# lines (see clean_ocr_artifacts); [^\S\n] is str.strip()'s whitespace.
+_OCR_NOISE_LINE_RE = re.compile(
+    r'\n[^\S\n]*(?:'
+    r'[-–—]?[^\S\n]*\d{1,4}[^\S\n]*[-–—]?'
+    r'|(?i:page)[^\S\n]+\d+(?:[^\S\n]+(?i:of)[^\S\n]+\d+)?'
+    r')[^\S\n]*(?=\n|\Z)'
+    r'|\n[^\S\n]*(?:[©®][^\S\n]*\d{4}|(?:DOI|doi)[^\S\n]*:[^\S\n]*10\.)[^\n]*'
+)
+# marker-pdf author code block bug: ``` wrapping <sup> tags
+# ([^\n]* instead of .*? with DOTALL prevents catastrophic backtracking)
+_OCR_SUP_CODE_BLOCK_RE = re.compile(r'```\n((?:[^\n]*<sup>[^\n]*</sup>[^\n]*\n)+)```')
+
+
+def _is_word_char(ch):
+    # Same test as the re module's \w for str patterns
+    return ch.isalnum() or ch == '_'
+
+
+def _join_hyphenated(text):
+    """re.sub(r'(\\w)-\\n(\\w)', r'\\1\\2', text), driven by the "-\\n" occurrences.
+
+    Like the regex, a match consumes the word characters on both sides, so in
+    "a-\\nb-\\nc" only the first break is joined.
+    """
+    parts = []
+    last = 0
+    match_end = 0
+    pos = text.find('-\n')
+    while pos != -1:
+        if (pos - 1 >= match_end and pos + 2 < len(text)
+                and _is_word_char(text[pos - 1]) and _is_word_char(text[pos + 2])):
+            parts.append(text[last:pos])
+            last = pos + 2
+            match_end = pos + 3
+        pos = text.find('-\n', pos + 1)
+    if not parts:
+        return text
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def clean_ocr_artifacts(text):
+    """Clean common OCR artifacts from marker-pdf output."""
+    # Prefixing a newline lets every dropped line take its leading separator
+    # with it; the result is "" or starts with that extra newline.
+    text = _OCR_NOISE_LINE_RE.sub('', '\n' + text)[1:]
+
+    # Fix hyphenation across lines: "compu-\nter" → "computer"
+    text = _join_hyphenated(text)
+
+    if '<sup>' in text:
+        text = _OCR_SUP_CODE_BLOCK_RE.sub(r'\1', text)
+
+    return text
+
+
+_OCR_MATH_OPS = ('min', 'max', 'log', 'exp', 'sin', 'cos', 'tan', 'lim', 'sup', 'inf',
+                 'arg', 'det', 'dim', 'gcd', 'deg', 'ker')
+_OCR_SPACED_CHARS_RE = re.compile(
+    r'\\(mathrm|mathbf|mathtt|mathcal|mathbb|mathfrak|text|textbf|textit|tt|bf|it)\s*\{\s*'
+    r'((?:[A-Za-z0-9]\s+)*[A-Za-z0-9])\s*\}')
+_OCR_MATH_OP_RE = re.compile(r'\\mathrm\{(' + '|'.join(_OCR_MATH_OPS) + r')\}')
+_OCR_SCRIPT_BRACES_RE = re.compile(r'([A-Za-z0-9\}\\])\s*([_^])\s*\{\s*([^}]*?)\s*\}')
+_OCR_SCRIPT_BASE_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789}\\')
+_OCR_BEGIN_ARGS_RE = re.compile(r'(\\begin\{[^}]+\})\s*\{\s*([^}]*?)\s*\}')
+_OCR_END_BRACE_RE = re.compile(r'(\\end\{[^}]+\})\s*\}')
+
+
+def _fix_script_braces(text):
+    """_OCR_SCRIPT_BRACES_RE.sub() tried only where a match can start.
+
+    Every match has a "_" or "^" right after its base character and optional
+    whitespace, so walking those (rare) characters and matching from the base
+    gives the same leftmost, non-overlapping matches as a full scan, without
+    attempting the pattern at every letter of the document.
+    """
+    parts = []
+    last = 0
+    next_u = text.find('_')
+    next_c = text.find('^')
+    while next_u != -1 or next_c != -1:
+        if next_c == -1 or (next_u != -1 and next_u < next_c):
+            pos, next_u = next_u, text.find('_', next_u + 1)
+        else:
+            pos, next_c = next_c, text.find('^', next_c + 1)
+        start = pos - 1
+        while start >= last and text[start].isspace():
+            start -= 1
+        if start < last or text[start] not in _OCR_SCRIPT_BASE_CHARS:
+            continue
+        m = _OCR_SCRIPT_BRACES_RE.match(text, start)
+        if m is None:
+            continue
+        fixed = f'{m.group(1)}{m.group(2)}{{{m.group(3).strip()}}}'
+        if fixed != m.group(0):
+            parts.append(text[last:start])
+            parts.append(fixed)
+        else:
+            parts.append(text[last:m.end()])
+        last = m.end()
+    if not parts:
+        return text
+    parts.append(text[last:])
+    return ''.join(parts)
 
 
 def clean_ocr_math(text):
@@ -1431,65 +2820,33 @@ def clean_ocr_math(text):
     - \\begin{array} { c } → \\begin{array}{c}
     - a _ { c } → a_{c}
     - \\mathrm { m i n } → \\min
-    """
-    import re
-
-    # 1. Fix spaced-out single characters in text-mode commands:
-    #    \mathrm { A P I } → \mathrm{API}
-    #    \mathbf { e } → \mathbf{e}
-    #    \mathtt { A P I } → \mathtt{API}
-    #    \text { s o m e } → \text{some}
-    def _collapse_spaced_chars(m):
-        cmd = m.group(1)  # e.g., "mathrm", "mathbf"
-        inner = m.group(2)  # e.g., "A P I" or "e"
-        collapsed = inner.replace(' ', '')
-        return f'\\{cmd}{{{collapsed}}}'
 
-    text = re.sub(
-        r'\\(mathrm|mathbf|mathtt|mathcal|mathbb|mathfrak|text|textbf|textit|tt|bf|it)\s*\{\s*'
-        r'((?:[A-Za-z0-9]\s+)*[A-Za-z0-9])\s*\}',
-        _collapse_spaced_chars,
-        text
-    )
+    Each rule is a precompiled pass guarded by the literal it needs, so text
+    that is already clean (the translation step cleans the converted file
+    again) goes through a few fast scans without being rebuilt.
+    """
+    if '\\' in text:
+        # 1. Fix spaced-out single characters in text-mode commands:
+        #    \mathrm { A P I } → \mathrm{API}, \text { s o m e } → \text{some}
+        text = _OCR_SPACED_CHARS_RE.sub(
+            lambda m: f'\\{m.group(1)}{{{m.group(2).replace(" ", "")}}}', text)
 
-    # 2. Fix known math operators misrendered as \mathrm{...}:
-    #    \mathrm{min} → \min, \mathrm{max} → \max, etc.
-    _MATH_OPS = {
-        'min': '\\min', 'max': '\\max', 'log': '\\log', 'exp': '\\exp',
-        'sin': '\\sin', 'cos': '\\cos', 'tan': '\\tan',
-        'lim': '\\lim', 'sup': '\\sup', 'inf': '\\inf',
-        'arg': '\\arg', 'det': '\\det', 'dim': '\\dim',
-        'gcd': '\\gcd', 'deg': '\\deg', 'ker': '\\ker',
-    }
-    for word, replacement in _MATH_OPS.items():
-        text = re.sub(
-            rf'\\mathrm\{{{word}\}}',
-            lambda _, r=replacement: r,
-            text
-        )
+        # 2. Fix known math operators misrendered as \mathrm{...}:
+        #    \mathrm{min} → \min, \mathrm{max} → \max, etc.
+        if '\\mathrm{' in text:
+            text = _OCR_MATH_OP_RE.sub(lambda m: '\\' + m.group(1), text)
 
     # 3. Fix spaced subscript/superscript braces:
-    #    a _ { c } → a_{c}
-    #    x ^ { 2 } → x^{2}
-    text = re.sub(
-        r'([A-Za-z0-9\}\\])\s*([_^])\s*\{\s*([^}]*?)\s*\}',
-        lambda m: f'{m.group(1)}{m.group(2)}{{{m.group(3).strip()}}}',
-        text
-    )
+    #    a _ { c } → a_{c}, x ^ { 2 } → x^{2}
+    text = _fix_script_braces(text)
 
     # 4. Fix \begin{env} { args } → \begin{env}{args}
-    text = re.sub(
-        r'(\\begin\{[^}]+\})\s*\{\s*([^}]*?)\s*\}',
-        lambda m: f'{m.group(1)}{{{m.group(2).strip()}}}',
-        text
-    )
+    if '\\begin{' in text:
+        text = _OCR_BEGIN_ARGS_RE.sub(lambda m: f'{m.group(1)}{{{m.group(2).strip()}}}', text)
 
     # 5. Fix \end{env} } → \end{env}  (trailing stray braces)
-    text = re.sub(
-        r'(\\end\{[^}]+\})\s*\}',
-        r'\1',
-        text
-    )
+    if '\\end{' in text:
+        text = _OCR_END_BRACE_RE.sub(r'\1', text)
 
     return text
 
@@ -1497,7 +2854,6 @@ def clean_ocr_math(text):
 # ── Heading normalization constants ──────────────────────────────────────────
 import re as _re
 
-_HEADING_RE = _re.compile(r'^(#{1,6})\s+(.+)$', _re.MULTILINE)
 _SPAN_RE = _re.compile(r'<span[^>]*>|</span>')
 _EMPHASIS_RE = _re.compile(r'^\*+(.+?)\*+$')
 
@@ -1572,14 +2928,16 @@ def normalize_heading_levels(text):
       Structural (References, etc.)    → H2
       Unnumbered                       → previous numbered level + 1
     """
-    yaml_header, body = split_yaml_and_body(text)
+    index = get_markdown_index(text)
+    yaml_header = text[:index.ends[0]] if index.body_start else ''
 
-    # Collect all heading texts for scheme detection
-    all_headings = _HEADING_RE.findall(body)
+    # Collect all heading texts for scheme detection (lines in code fences
+    # are not headings)
+    all_headings = [_INDEX_HEADING_RE.fullmatch(text, *index.span(i)) for i in index.headings()]
     if not all_headings:
         return text
 
-    heading_texts = [h[1] for h in all_headings]
+    heading_texts = [m.group(2) for m in all_headings]
     scheme = _detect_numbering_scheme(heading_texts)
 
     title_found = False
@@ -1631,29 +2989,98 @@ def normalize_heading_levels(text):
 
         return f'{"#" * level} {heading_content}'
 
-    normalized = _HEADING_RE.sub(_replace_heading, body)
+    parts = []
+    last = index.body_start
+    for match in all_headings:
+        parts.append(text[last:match.start()])
+        parts.append(_replace_heading(match))
+        last = match.end()
+    parts.append(text[last:])
+    normalized = ''.join(parts)
 
     if yaml_header:
         return yaml_header + '\n' + normalized
     return normalized
 
 
-def protect_special_blocks(text):
-    """Replace code blocks with placeholders before translation.
+# <<KIND_n>>, or <<KIND_n_xxxxxx>> with a per-document nonce when the source
+# already contains text of that shape (see protect_special_blocks)
+_PLACEHOLDER_RE = re.compile(r'<<([A-Z_]+)_\d+(?:_[0-9a-f]{6})?>>')
+# Placeholders as LLMs tend to mangle them: spaced, lower-cased, single or
+# escaped brackets, guillemets, full-width or HTML-escaped angle brackets
+_PLACEHOLDER_LOOSE_RE = re.compile(
+    r'(?:\\?<|&lt;|[«《＜〈]){1,2}\s*([A-Za-z]+(?:[ _][A-Za-z]+)*)[ _]?(\d+)'
+    r'(?:[ _]([0-9a-fA-F]{6}))?\s*(?:\\?>|&gt;|[»》＞〉]){1,2}')
+_ANCHOR_RUN_RE = re.compile(r'(?:<(?:span|a)\s+(?:id|name)="[^"]*"\s*>\s*</(?:span|a)>)+')
+_IMAGE_LINK_RE = re.compile(r'!\[[^\]\n]*\]\([^)\n]*\)')
+_URL_RE = re.compile(r'https?://[^\s<>()\[\]"\']*[^\s<>()\[\]"\'.,;:!?]')
+_TABLE_ROW_RE = re.compile(r'^\s*\|.*\|\s*$')
+_TABLE_RULE_RE = re.compile(r'^[\s|:\-]+$')
+_REFERENCE_ENTRY_RE = re.compile(r'^\s*(?:[-*]\s*)?\[\d+\]\s+\S')
+
+
+def _protect_line_blocks(text, line_re, accept, replace):
+    """Replace runs of lines matching line_re (blank lines allowed inside)
+    for which accept(lines) is true."""
+    lines = text.split('\n')
+    out, i = [], 0
+    while i < len(lines):
+        if not line_re.match(lines[i]):
+            out.append(lines[i])
+            i += 1
+            continue
+        j = end = i
+        while j < len(lines) and (line_re.match(lines[j]) or not lines[j].strip()):
+            if lines[j].strip():
+                end = j
+            j += 1
+        block = lines[i:end + 1]
+        out.append(replace('\n'.join(block)) if accept(block) else '\n'.join(block))
+        i = end + 1
+    return '\n'.join(out)
+
+
+def _is_numeric_table(rows, min_rows, max_text_ratio):
+    rows = [r for r in rows if r.strip() and not _TABLE_RULE_RE.match(r)]
+    if len(rows) < min_rows:
+        return False
+    cells = [c.strip() for r in rows for c in r.strip().strip('|').split('|')]
+    cells = [c for c in cells if c]
+    if not cells:
+        return False
+    text_cells = sum(1 for c in cells if re.search(r'[A-Za-z]{3,}', c))
+    return text_cells / len(cells) <= max_text_ratio
+
+
+def protect_special_blocks(text, config=None):
+    """Replace non-translatable spans with placeholders before translation.
+
+    Fenced code is always protected. The classes in translation.protect
+    (html_anchors, images, urls, numeric_tables, reference_lists; all on by
+    default) cover marker output that costs input and output tokens without
+    needing translation: <span id="page-3-0"></span> anchors, image links,
+    URLs, tables that are mostly numbers and [n]-style reference lists.
 
     Math expressions ($...$, $$...$$) are NOT protected — they are sent to the
     LLM so it can fix OCR artifacts while preserving the formulas.
 
+    Keys are unique: when the document already contains <<KIND_n>>-shaped
+    text, every key carries a nonce derived from the document.
+
     Returns:
         (protected_text, placeholders_dict)
     """
-    import re
+    protect = (config or {}).get("translation", {}).get("protect", {})
     placeholders = {}
     counter = [0]
+    # Keys stay <<KIND_n>> (stable chunk text for the translation memory)
+    # unless the document itself contains such tokens
+    nonce = f"_{_text_sha256(text)[:6]}" if _PLACEHOLDER_RE.search(text) else ""
 
     def _replace(match, prefix):
-        key = f"<<{prefix}_{counter[0]}>>"
-        placeholders[key] = match.group(0)
+        original = match if isinstance(match, str) else match.group(0)
+        key = f"<<{prefix}_{counter[0]}{nonce}>>"
+        placeholders[key] = original
         counter[0] += 1
         return key
 
@@ -1664,6 +3091,26 @@ def protect_special_blocks(text):
         text
     )
 
+    if protect.get("numeric_tables", True):
+        min_rows = protect.get("numeric_table_min_rows", 4)
+        max_text_ratio = protect.get("numeric_table_max_text_ratio", 0.35)
+        text = _protect_line_blocks(
+            text, _TABLE_ROW_RE,
+            lambda rows: _is_numeric_table(rows, min_rows, max_text_ratio),
+            lambda block: _replace(block, 'TABLE'))
+    if protect.get("reference_lists", True):
+        min_entries = protect.get("reference_list_min_entries", 5)
+        text = _protect_line_blocks(
+            text, _REFERENCE_ENTRY_RE,
+            lambda lines: sum(1 for l in lines if l.strip()) >= min_entries,
+            lambda block: _replace(block, 'REFS'))
+    if protect.get("html_anchors", True):
+        text = _ANCHOR_RUN_RE.sub(lambda m: _replace(m, 'ANCHOR'), text)
+    if protect.get("images", True):
+        text = _IMAGE_LINK_RE.sub(lambda m: _replace(m, 'IMG'), text)
+    if protect.get("urls", True):
+        text = _URL_RE.sub(lambda m: _replace(m, 'URL'), text)
+
     # Math is intentionally NOT protected:
     # LLM sees math expressions and can fix OCR artifacts like
     # \mathrm { A P I } → \mathrm{API}, a _ { c } → a_{c}
@@ -1672,10 +3119,77 @@ def protect_special_blocks(text):
 
 
 def restore_special_blocks(text, placeholders):
-    """Restore placeholders back to original content."""
-    for key, value in placeholders.items():
-        text = text.replace(key, value)
-    return text
+    """Restore placeholders back to original content (single regex pass)."""
+    if not placeholders:
+        return text
+    return _PLACEHOLDER_RE.sub(lambda m: placeholders.get(m.group(0), m.group(0)), text)
+
+
+def check_placeholders(source_text, translated_text):
+    """Placeholders of source_text that did not survive translation intact.
+
+    Returns (missing, mangled): keys with no exact occurrence in the
+    translation, and (variant, key) pairs for those of them that came back
+    in a recognisable but altered form (e.g. "<<code block 3>>", "«CODE_BLOCK_3»").
+    """
+    expected = set(m.group(0) for m in _PLACEHOLDER_RE.finditer(source_text))
+    if not expected:
+        return [], []
+    missing = [k for k in sorted(expected) if k not in translated_text]
+    mangled = []
+    if missing:
+        wanted = set(missing)
+        for m in _PLACEHOLDER_LOOSE_RE.finditer(translated_text):
+            kind, n, nonce = m.groups()
+            key = f"<<{kind.upper().replace(' ', '_')}_{n}{'_' + nonce.lower() if nonce else ''}>>"
+            if key in wanted:
+                mangled.append((m.group(0), key))
+                wanted.discard(key)
+    return missing, mangled
+
+
+def reinsert_placeholders(source_text, translated_text):
+    """Put lost placeholders back without another API call.
+
+    Mangled placeholders are rewritten to their exact key. A placeholder
+    that was a paragraph of its own in the source (code block, table,
+    reference list, image) and is gone from the translation is re-inserted
+    at the aligned position. Inline placeholders that are still missing are
+    left to verification, which marks their paragraph for repair.
+
+    Returns (text, n_fixed).
+    """
+    missing, mangled = check_placeholders(source_text, translated_text)
+    if not missing:
+        return translated_text, 0
+    fixed = 0
+    for variant, key in mangled:
+        translated_text = translated_text.replace(variant, key, 1)
+        fixed += 1
+    lost = set(missing) - set(key for _, key in mangled)
+    source_paras = [p for p in source_text.split('\n\n') if p.strip()]
+    standalone = {si for si, p in enumerate(source_paras) if p.strip() in lost}
+    if not standalone:
+        return translated_text, fixed
+
+    trans_paras = [p for p in translated_text.split('\n\n') if p.strip()]
+    out = []
+    for si, ti in _align_paragraphs(source_paras, trans_paras):
+        if si in standalone:
+            out.append(source_paras[si].strip())
+            fixed += 1
+        if ti is not None:
+            out.append(trans_paras[ti])
+    return '\n\n'.join(out), fixed
+
+
+def _is_non_prose(text):
+    """True if nothing but placeholders, math, markup and numbers is left,
+    i.e. there is nothing for the LLM to translate."""
+    stripped = _PLACEHOLDER_RE.sub(' ', text)
+    stripped = re.sub(r'\$\$[\s\S]*?\$\$|\$[^$\n]+\$', ' ', stripped)
+    stripped = re.sub(r'<[^>]+>', ' ', stripped)
+    return not re.search(r'[A-Za-z]{2,}', stripped)
 
 
 # Section header translations for skip targets
@@ -1697,28 +3211,13 @@ def classify_sections(body):
         list of (section_text, should_translate: bool)
     """
     import re
-    # Split on markdown headings, keeping the heading with its content
-    parts = re.split(r'(^#{1,4}\s+.+$)', body, flags=re.MULTILINE)
-
-    sections = []
-    current_heading = None
-    current_body_parts = []
-
-    for part in parts:
-        if re.match(r'^#{1,4}\s+', part):
-            # Save previous section
-            if current_heading is not None or current_body_parts:
-                section_text = (current_heading + '\n' if current_heading else '') + '\n'.join(current_body_parts)
-                sections.append(section_text.strip())
-            current_heading = part
-            current_body_parts = []
-        else:
-            current_body_parts.append(part)
-
-    # Save last section
-    if current_heading is not None or current_body_parts:
-        section_text = (current_heading + '\n' if current_heading else '') + '\n'.join(current_body_parts)
-        sections.append(section_text.strip())
+    # Split at headings up to H4, keeping the heading with its content
+    index = get_markdown_index(body, frontmatter=False)
+    bounds = [index.span(i) for i in index.headings(max_level=4)]
+    sections = [body[:bounds[0][0]].strip() if bounds else body.strip()]
+    for k, (start, end) in enumerate(bounds):
+        next_start = bounds[k + 1][0] if k + 1 < len(bounds) else len(body)
+        sections.append((body[start:end] + '\n' + body[end:next_start]).strip())
 
     # Classify each section
     classified = []
@@ -1761,6 +3260,51 @@ def classify_sections(body):
     return classified
 
 
+def iter_markdown_sections(md_path):
+    """Yield the body of a markdown file section by section, without reading it whole.
+
+    Same frontmatter rule as split_yaml_and_body; a section starts at every
+    H1-H4 heading line outside code fences (the classify_sections split).
+    Sections are yielded with their line endings, unstripped.
+    """
+    import itertools
+    with open(md_path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+        head = [first]
+        if first.startswith('---'):
+            pos = first.find('---', 3)
+            while pos == -1:
+                line = f.readline()
+                if not line:
+                    break
+                head = [line]
+                pos = line.find('---')
+            if pos == -1:
+                f.seek(0)
+                head = []
+            else:
+                head = [head[0][pos + 3:].lstrip('\n')]
+        lines = []
+        in_fence = False
+        leading = not (head and head[0])
+        for line in itertools.chain(head, f):
+            if leading:
+                if line.strip('\n') == '':
+                    continue
+                leading = False
+            stripped = line.strip()
+            if stripped.startswith('```') and stripped.count('```') % 2 == 1:
+                in_fence = not in_fence
+            elif not in_fence and line.startswith('#') and lines:
+                m = _INDEX_HEADING_RE.fullmatch(line.rstrip('\n'))
+                if m and len(m.group(1)) <= 4:
+                    yield ''.join(lines)
+                    lines = []
+            lines.append(line)
+        if lines:
+            yield ''.join(lines)
+
+
 def _is_safe_split_point(prev_paragraph):
     """Check if the paragraph ends at a natural sentence boundary.
 
@@ -1834,16 +3378,27 @@ def _verify_translation(source_text, translated_text):
 
     if source_len == 0:
         return True, "ok"
+    if translated_text == source_text and _is_non_prose(source_text):
+        return True, "ok"
 
     ratio = trans_len / source_len
 
+    # Every protected span must come back (reinsert_placeholders already
+    # fixed what it could; the rest is targeted by the paragraph repair)
+    missing, _ = check_placeholders(source_text, translated_text)
+    if missing:
+        return False, f"placeholders missing ({', '.join(missing[:3])}{', ...' if len(missing) > 3 else ''})"
+
     # Korean is typically 0.5~1.2x the length of English
     if ratio < 0.4:
         return False, f"too short ({ratio:.0%} of source)"
 
-    # Compare markdown heading counts
-    source_headings = len(re.findall(r'^#{1,4}\s+', source_text, re.MULTILINE))
-    trans_headings = len(re.findall(r'^#{1,4}\s+', translated_text, re.MULTILINE))
+    # Compare markdown heading counts (the source index is cached, retries
+    # and repairs verify the same source again)
+    source_index = get_markdown_index(source_text, frontmatter=False)
+    trans_index = get_markdown_index(translated_text, frontmatter=False, cache=False)
+    source_headings = len(source_index.headings(max_level=4))
+    trans_headings = len(trans_index.headings(max_level=4))
     if source_headings > 0 and trans_headings < source_headings * 0.5:
         return False, f"headings missing ({trans_headings}/{source_headings})"
 
@@ -1852,8 +3407,8 @@ def _verify_translation(source_text, translated_text):
         return False, f"extra headings ({trans_headings} vs {source_headings} in source)"
 
     # Compare paragraph counts
-    source_paras = len([p for p in source_text.split('\n\n') if p.strip()])
-    trans_paras = len([p for p in translated_text.split('\n\n') if p.strip()])
+    source_paras = source_index.groups
+    trans_paras = trans_index.groups
     if source_paras > 3 and trans_paras < source_paras * 0.5:
         return False, f"paragraphs missing ({trans_paras}/{source_paras})"
 
@@ -1892,6 +3447,121 @@ def _verify_translation(source_text, translated_text):
     return True, "ok"
 
 
+def _paragraph_kind(para):
+    """Structural kind of a markdown paragraph, used to align source and translation."""
+    s = para.lstrip()
+    if s.startswith('#'):
+        return 'h' + str(len(s) - len(s.lstrip('#')))
+    if s.startswith('$$'):
+        return 'math'
+    if s.startswith('```') or _PLACEHOLDER_RE.fullmatch(s.strip()):
+        return 'code'
+    if s.startswith('|'):
+        return 'table'
+    if s.startswith('!['):
+        return 'image'
+    if re.match(r'([-*+]|\d+[.)])\s', s):
+        return 'list'
+    return 'text'
+
+
+def _paragraph_anchors(para):
+    """Tokens that survive translation unchanged: numbers, acronyms, citations, inline math."""
+    return set(re.findall(r'\d+(?:\.\d+)?|\b[A-Z][A-Za-z]*[A-Z]+\w*|\[\d+(?:,\s*\d+)*\]|\$[^$]+\$', para))
+
+
+def _align_paragraphs(source_paras, trans_paras):
+    """Align source and translated paragraphs by structure, anchors and relative length.
+
+    Edit-distance DP: matching paragraphs of a different kind is expensive,
+    shared anchors (numbers, acronyms, citations, inline math) make a match
+    cheaper, length mismatches (relative to the section's overall ratio) cost
+    a little, and a source paragraph can be left unmatched (missing in the
+    translation) or a translated one extra. Returns a list of
+    (src_index|None, trans_index|None) in document order.
+    """
+    import math
+    src_kinds = [_paragraph_kind(p) for p in source_paras]
+    trans_kinds = [_paragraph_kind(p) for p in trans_paras]
+    src_anchors = [_paragraph_anchors(p) for p in source_paras]
+    trans_anchors = [_paragraph_anchors(p) for p in trans_paras]
+    src_len = [len(p) for p in source_paras]
+    trans_len = [len(p) for p in trans_paras]
+    ratio = sum(trans_len) / sum(src_len) if sum(src_len) else 1.0
+    ratio = min(max(ratio, 0.3), 1.5)
+    gap = 1.5
+
+    def cost(i, j):
+        a, b = src_kinds[i], trans_kinds[j]
+        c = 0.0 if a == b else (1.0 if {a, b} <= {'text', 'list'} else 3.0)
+        sa, ta = src_anchors[i], trans_anchors[j]
+        if sa and ta:
+            c += 0.5 - len(sa & ta) / len(sa | ta)
+        return c + 0.5 * min(abs(math.log((trans_len[j] + 20) / (ratio * src_len[i] + 20))), 3.0)
+
+    n, m = len(source_paras), len(trans_paras)
+    dp = [[0.0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        dp[i][0] = i * gap
+    for j in range(1, m + 1):
+        dp[0][j] = j * gap
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            dp[i][j] = min(dp[i - 1][j - 1] + cost(i - 1, j - 1),
+                           dp[i - 1][j] + gap, dp[i][j - 1] + gap)
+
+    pairs = []
+    i, j = n, m
+    while i or j:
+        if i and j and dp[i][j] == dp[i - 1][j - 1] + cost(i - 1, j - 1):
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif i and (not j or dp[i][j] == dp[i - 1][j] + gap):
+            pairs.append((i - 1, None))
+            i -= 1
+        else:
+            pairs.append((None, j - 1))
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+
+def _find_repair_targets(source_text, translated_text):
+    """Locate source paragraphs that are missing, left untranslated or lost a placeholder.
+
+    Returns (source_paras, trans_paras, pairs, targets) where targets is the
+    sorted list of source paragraph indices that need re-translation.
+    """
+    source_paras = [p for p in source_text.split('\n\n') if p.strip()]
+    trans_paras = [p for p in translated_text.split('\n\n') if p.strip()]
+    pairs = _align_paragraphs(source_paras, trans_paras)
+    total_src = sum(len(p) for p in source_paras) or 1
+    ratio = min(max(sum(len(p) for p in trans_paras) / total_src, 0.3), 1.5)
+
+    lost = set(check_placeholders(source_text, translated_text)[0])
+
+    targets = []
+    for si, ti in pairs:
+        if si is None:
+            continue
+        src = source_paras[si]
+        if ti is None:
+            targets.append(si)
+            continue
+        if lost and any(m.group(0) in lost for m in _PLACEHOLDER_RE.finditer(src)):
+            targets.append(si)  # protected span dropped
+            continue
+        if _paragraph_kind(src) not in ('text', 'list') or len(src) < 80:
+            continue
+        trans = trans_paras[ti]
+        has_korean = re.search(r'[가-힣]', trans) is not None
+        if (not has_korean and len(re.findall(r'[A-Za-z]', trans)) > 40) or trans.strip() == src.strip():
+            targets.append(si)  # left in English
+        elif len(src) > 200 and len(trans) < 0.3 * ratio * len(src):
+            targets.append(si)  # truncated
+    return source_paras, trans_paras, pairs, sorted(set(targets))
+
+
 def _strip_spurious_headings(source_text, translated_text):
     """Remove headings in translation that don't exist in the source.
 
@@ -1938,22 +3608,536 @@ def _strip_spurious_headings(source_text, translated_text):
     return translated_text
 
 
+_TOKEN_ENCODING = None
+_TOKEN_ENCODING_FAILED = False
+
+def _token_encoding():
+    global _TOKEN_ENCODING, _TOKEN_ENCODING_FAILED
+    if _TOKEN_ENCODING is None and TIKTOKEN_AVAILABLE and not _TOKEN_ENCODING_FAILED:
+        try:
+            _TOKEN_ENCODING = tiktoken.get_encoding(os.getenv("TRANSLATION_TOKENIZER", "o200k_base"))
+        except Exception as e:
+            # e.g. the BPE file cannot be downloaded; fall back to the estimate
+            _TOKEN_ENCODING_FAILED = True
+            print_warning(f"tiktoken encoding unavailable, using character-class estimate: {e}")
+    return _TOKEN_ENCODING
+
+
 def estimate_tokens(text):
-    """Rough token estimate. English words * 1.3 approximation."""
-    return int(len(text.split()) * 1.3)
+    """Token count used for request budgets.
+
+    Exact with tiktoken (TRANSLATION_TOKENIZER, default o200k_base) when it is
+    installed. Otherwise a character-class estimate: Latin words by length,
+    digit runs in groups of three, every symbol as its own token (math-heavy
+    text is mostly symbols) and one token per Hangul / CJK character, where
+    the old words x 1.3 rule was far too low.
+    """
+    if not text:
+        return 0
+    encoding = _token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    words = re.findall(r'[A-Za-z]+', text)
+    tokens = sum(1 + (len(w) - 1) // 5 for w in words)
+    tokens += sum((len(d) + 2) // 3 for d in re.findall(r'\d+', text))
+    tokens += len(re.findall(r'[^\w\s]', text))
+    tokens += len(re.findall(r'[\uAC00-\uD7A3\u3040-\u30FF\u4E00-\u9FFF]', text))
+    tokens += len(re.findall(r'[^\x00-\x7F\uAC00-\uD7A3\u3040-\u30FF\u4E00-\u9FFF]', text))
+    return tokens
+
+
+_PREV_CONTEXT_MARKER = "\n\n[Previous context for terminology consistency:"
+_DOC_CONTEXT_MARKER = "\n\n[Document context for terminology consistency:"
+_GLOSSARY_MARKER = "\n\n[Glossary, use these Korean renderings consistently:"
+_TRANSLATION_RETRY_INSTRUCTION = "\n\nIMPORTANT: Your previous translation was incomplete or not translated to Korean. You MUST translate ALL text into Korean (한국어). Do NOT return the original English text. Translate EVERY sentence without any omission."
+_TRANSLATION_REPAIR_INSTRUCTION = "\n\nIMPORTANT: The text consists of paragraphs, each preceded by a marker line of the form [[P<n>]]. Translate every paragraph into Korean (한국어). Return every marker line unchanged on its own line, followed by the translation of that paragraph, in the same order. Do not merge, drop or add paragraphs."
+_TRANSLATION_PACK_INSTRUCTION = "\n\nIMPORTANT: The text consists of several independent sections, each preceded by a marker line of the form [[S<n>]]. Translate every section into Korean (한국어). Return every marker line unchanged on its own line, followed by the translation of that section, in the same order. Do not merge, drop or add sections or markers."
+_PACK_MARKER_RE = re.compile(r'^\[\[S(\d+)\]\]\s*$', re.MULTILINE)
+_CONTEXT_NOTES_HEADER = "Reference notes for this request (do not translate or repeat them in your output):"
+
+
+def _prompt_context_start(system_prompt, markers=(_PREV_CONTEXT_MARKER, _DOC_CONTEXT_MARKER, _GLOSSARY_MARKER)):
+    """Index where the per-call context suffixes begin (len(system_prompt) if none)."""
+    cut = len(system_prompt)
+    for marker in markers:
+        pos = system_prompt.find(marker)
+        if pos != -1:
+            cut = min(cut, pos)
+    return cut
+
+
+def _translation_messages(system_prompt, content, config):
+    """Chat messages for one translation request.
+
+    With translation.prompt_layout "cache_friendly" (default) the system
+    message is the bare load_prompt() text, byte-identical for the whole run,
+    and the per-call suffixes (document outline, glossary, previous-section
+    context, retry / repair / packing instructions) are sent as a user message ahead of the text, so the
+    provider's prompt prefix cache can serve the system prompt. "legacy" sends
+    the combined system prompt as a single message.
+    """
+    if config.get("translation", {}).get("prompt_layout", "cache_friendly") == "cache_friendly":
+        cut = _prompt_context_start(
+            system_prompt, (_PREV_CONTEXT_MARKER, _DOC_CONTEXT_MARKER, _GLOSSARY_MARKER,
+                            _TRANSLATION_RETRY_INSTRUCTION, _TRANSLATION_REPAIR_INSTRUCTION,
+                            _TRANSLATION_PACK_INSTRUCTION))
+        notes = system_prompt[cut:].strip()
+        if notes:
+            return [
+                {"role": "system", "content": system_prompt[:cut]},
+                {"role": "user", "content": f"{_CONTEXT_NOTES_HEADER}\n{notes}"},
+                {"role": "user", "content": content},
+            ]
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": content},
+    ]
+
+
+def _usage_cached_tokens(usage):
+    """Cached prompt tokens from a usage object (OpenAI, DeepSeek and Anthropic-style fields)."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    if cached is None:
+        cached = getattr(usage, "cache_read_input_tokens", None)
+    return int(cached or 0)
+
+
+class LLMUsage:
+    """Token and time-to-first-token counters for one stage of one paper.
+
+    Filled from the usage block the API reports (the last stream chunk with
+    stream_options include_usage, or the response of a non-streaming call);
+    shared by concurrent calls, so updates take a lock. Wall time runs from
+    construction to summary().
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.retries = 0
+        self.reported = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.protected_tokens = 0
+        self.skipped_chunks = 0
+        self.placeholders_fixed = 0
+        self.placeholders_lost = 0
+        self.hedged = 0
+        self.models = {}
+        self._ttft = {True: [], False: []}
+        self._lock = threading.Lock()
+
+    def record(self, usage=None, ttft=None, model=None):
+        with self._lock:
+            self.requests += 1
+            if model:
+                self.models[model] = self.models.get(model, 0) + 1
+            cached = 0
+            if usage is not None:
+                self.reported += 1
+                cached = _usage_cached_tokens(usage)
+                self.prompt_tokens += int(getattr(usage, "prompt_tokens", 0) or 0)
+                self.completion_tokens += int(getattr(usage, "completion_tokens", 0) or 0)
+                self.cached_tokens += cached
+            if ttft is not None:
+                self._ttft[cached > 0].append(ttft)
+
+    def record_retry(self):
+        """A request failed and is being retried."""
+        with self._lock:
+            self.retries += 1
+
+    def record_hedge(self):
+        """A duplicate (hedged) request was sent; its tokens are not reported
+        when it loses and is cancelled."""
+        with self._lock:
+            self.requests += 1
+            self.hedged += 1
+
+    def record_skip(self):
+        """A chunk with nothing to translate was passed through without a request."""
+        with self._lock:
+            self.skipped_chunks += 1
+
+    def record_placeholders(self, fixed=0, lost=0):
+        """Placeholders re-inserted after a response / missing from the final text."""
+        with self._lock:
+            self.placeholders_fixed += fixed
+            self.placeholders_lost += lost
+
+    def summary(self):
+        with self._lock:
+            def _avg(values):
+                return round(sum(values) / len(values), 3) if values else None
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "usage_reported": self.reported,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cached_ratio": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+                "avg_ttft_cached_seconds": _avg(self._ttft[True]),
+                "avg_ttft_uncached_seconds": _avg(self._ttft[False]),
+                "protected_tokens": self.protected_tokens,
+                "skipped_chunks": self.skipped_chunks,
+                "placeholders_fixed": self.placeholders_fixed,
+                "placeholders_lost": self.placeholders_lost,
+                "hedged_requests": self.hedged,
+                "wall_seconds": round(time.time() - self.started, 2),
+                "requests_by_model": dict(self.models),
+            }
+
+    def describe(self):
+        s = self.summary()
+        if not s["usage_reported"]:
+            return f"{s['requests']} request(s), no usage reported by the API"
+        text = (f"{s['requests']} request(s), prompt {s['prompt_tokens']:,} tokens "
+                f"({s['cached_tokens']:,} cached, {s['cached_ratio'] * 100:.0f}%), "
+                f"completion {s['completion_tokens']:,}")
+        if s["avg_ttft_cached_seconds"] is not None and s["avg_ttft_uncached_seconds"] is not None:
+            text += (f"; first token {s['avg_ttft_cached_seconds']:.2f}s cached vs "
+                     f"{s['avg_ttft_uncached_seconds']:.2f}s uncached")
+        return text
 
 
-def _call_translation_api(client, model, system_prompt, content, config, source_chars=0, max_tokens_override=0):
-    """Call OpenAI-compatible API with streaming, progress bar, and retry logic.
+USAGE_FILE = "usage.json"
+_USAGE_SUM_FIELDS = ("requests", "retries", "usage_reported", "prompt_tokens", "cached_tokens",
+                     "completion_tokens", "hedged_requests", "skipped_chunks", "protected_tokens",
+                     "placeholders_fixed", "placeholders_lost", "wall_seconds")
+
+def record_paper_usage(output_dir, stage, usage):
+    """Add one stage run's LLMUsage to <output_dir>/usage.json.
+
+    Per stage, counters accumulate over runs (reruns and re-translations are
+    spend too) and last_run keeps the latest summary; totals sums all stages.
+    The viewer adds its chat usage to the same file and aggregates the
+    ledgers in GET /api/usage.
+    """
+    if not output_dir or not os.path.isdir(output_dir):
+        return
+    path = os.path.join(output_dir, USAGE_FILE)
+    summary = usage.summary() if isinstance(usage, LLMUsage) else dict(usage)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            ledger = json.load(f)
+    except Exception:
+        ledger = {}
+    stages = ledger.setdefault("stages", {})
+    entry = stages.setdefault(stage, {"runs": 0})
+    entry["runs"] = entry.get("runs", 0) + 1
+    for field in _USAGE_SUM_FIELDS:
+        entry[field] = round(entry.get(field, 0) + (summary.get(field) or 0), 2)
+    entry["last_run"] = dict(summary, recorded_at=datetime.now().isoformat())
+    ledger["totals"] = {
+        field: round(sum(e.get(field, 0) for e in stages.values()), 2) for field in _USAGE_SUM_FIELDS
+    }
+    ledger["model"] = os.getenv("TRANSLATION_MODEL", "gemini-claude-sonnet-4-5")
+    ledger["updated_at"] = datetime.now().isoformat()
+    try:
+        _write_json_atomic(path, ledger)
+    except Exception as e:
+        print_warning(f"Could not write {USAGE_FILE}: {e}")
+
+
+class TranslationMemory:
+    """SQLite segment cache: normalized source chunk → translation.
+
+    Entries are keyed by the hash of the whitespace-normalized source, the
+    model and the system prompt with the per-call / per-document context
+    suffixes stripped, so reruns, duplicate papers and boilerplate repeated across
+    papers are served locally. Hit/miss counters are kept per process and
+    accumulated in the stats table; entries expire after ttl_days and the
+    least recently used are evicted beyond max_entries.
+
+    get() only reads: hit statistics (last_used, hits, stats table) are
+    collected in memory and written by flush() at the end of a translation
+    run. The async translation path runs every call through asyncio.to_thread
+    so a busy database never stalls the shared LLM event loop.
+    """
+
+    _EVICT_EVERY = 200  # puts between eviction passes
+
+    def __init__(self, path, ttl_days=180, max_entries=200000):
+        import sqlite3
+        self.path = os.path.expanduser(path)
+        self.ttl_seconds = float(ttl_days) * 86400 if ttl_days else None
+        self.max_entries = int(max_entries) if max_entries else None
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._pending_hits = {}  # key -> [hits, last_used] not yet written
+        self._pending_stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            " key TEXT PRIMARY KEY, model TEXT, prompt_hash TEXT, translation TEXT NOT NULL,"
+            " source_chars INTEGER, created_at REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS segments_last_used ON segments(last_used)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+        self._db.commit()
+        self.evict()
+
+    @staticmethod
+    def prompt_hash(system_prompt):
+        return _text_sha256(system_prompt[:_prompt_context_start(system_prompt)])
+
+    @classmethod
+    def make_key(cls, model, system_prompt, content):
+        normalized = re.sub(r'\s+', ' ', content).strip()
+        return _text_sha256(normalized, model, cls.prompt_hash(system_prompt))
+
+    def _bump_stat(self, name, count=1):
+        self._db.execute(
+            "INSERT INTO stats(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, count)
+        )
+
+    def get(self, model, system_prompt, content):
+        key = self.make_key(model, system_prompt, content)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT translation, created_at FROM segments WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                row = None
+            if row:
+                self.hits += 1
+                self._pending_stats["hits"] += 1
+                pending = self._pending_hits.setdefault(key, [0, now])
+                pending[0] += 1
+                pending[1] = now
+            else:
+                self.misses += 1
+                self._pending_stats["misses"] += 1
+        return row[0] if row else None
+
+    def flush(self):
+        """Write the hit statistics collected by get() since the last flush."""
+        with self._lock:
+            if not self._pending_hits and not any(self._pending_stats.values()):
+                return
+            self._db.executemany(
+                "UPDATE segments SET last_used = ?, hits = hits + ? WHERE key = ?",
+                [(last_used, hits, key) for key, (hits, last_used) in self._pending_hits.items()],
+            )
+            for name, count in self._pending_stats.items():
+                if count:
+                    self._bump_stat(name, count)
+            self._db.commit()
+            self._pending_hits.clear()
+            self._pending_stats = {"hits": 0, "misses": 0}
+
+    def put(self, model, system_prompt, content, translation):
+        if not translation or not translation.strip():
+            return
+        key = self.make_key(model, system_prompt, content)
+        now = time.time()
+        with self._lock:
+            # Re-storing a verified memory hit keeps its age and hit count
+            row = self._db.execute("SELECT translation FROM segments WHERE key = ?", (key,)).fetchone()
+            if row and row[0] == translation:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO segments"
+                " (key, model, prompt_hash, translation, source_chars, created_at, last_used, hits)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, model, self.prompt_hash(system_prompt), translation, len(content), now, now),
+            )
+            self._db.commit()
+            self._puts += 1
+            evict = self._puts % self._EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def contains(self, model, system_prompt, content):
+        """True if a live entry exists (does not count as a hit)."""
+        key = self.make_key(model, system_prompt, content)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT created_at FROM segments WHERE key = ?", (key,)
+            ).fetchone()
+        return bool(row) and not (self.ttl_seconds and time.time() - row[0] > self.ttl_seconds)
+
+    def forget(self, model, system_prompt, content):
+        """Drop an entry, e.g. a translation that failed verification."""
+        key = self.make_key(model, system_prompt, content)
+        with self._lock:
+            self._db.execute("DELETE FROM segments WHERE key = ?", (key,))
+            self._db.commit()
+
+    def evict(self):
+        """Apply TTL and max_entries (LRU). Returns the number of rows removed."""
+        self.flush()
+        removed = 0
+        with self._lock:
+            if self.ttl_seconds:
+                cur = self._db.execute(
+                    "DELETE FROM segments WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                )
+                removed += cur.rowcount
+            if self.max_entries:
+                cur = self._db.execute(
+                    "DELETE FROM segments WHERE key IN (SELECT key FROM segments"
+                    " ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                )
+                removed += cur.rowcount
+            self._db.commit()
+        return removed
+
+    def lifetime_stats(self):
+        self.flush()
+        with self._lock:
+            stats = dict(self._db.execute("SELECT name, value FROM stats").fetchall())
+            stats["entries"] = self._db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return stats
+
+
+_TRANSLATION_MEMORIES = {}
+_TRANSLATION_MEMORIES_LOCK = threading.Lock()
+
+def get_translation_memory(config):
+    """Shared TranslationMemory for config["translation_memory"], or None if disabled."""
+    tm_cfg = config.get("translation_memory", {})
+    if not tm_cfg.get("enabled", True):
+        return None
+    path = os.path.expanduser(tm_cfg.get("path", "~/.cache/paperflow/translation_memory.sqlite3"))
+    with _TRANSLATION_MEMORIES_LOCK:
+        if path not in _TRANSLATION_MEMORIES:
+            try:
+                _TRANSLATION_MEMORIES[path] = TranslationMemory(
+                    path,
+                    ttl_days=tm_cfg.get("ttl_days", 180),
+                    max_entries=tm_cfg.get("max_entries", 200000),
+                )
+            except Exception as e:
+                print_warning(f"Translation memory unavailable ({path}): {e}")
+                _TRANSLATION_MEMORIES[path] = None
+        return _TRANSLATION_MEMORIES[path]
+
+
+class ModelRouter:
+    """Sends easy translation chunks to a cheaper, faster model tier.
+
+    tiers is an ordered list of {"model", "max_chars", "max_math_density",
+    "max_table_ratio"}; a chunk goes to the first tier whose limits it meets
+    and everything else to the requested model (TRANSLATION_MODEL).
+    Escalated calls - retries and repairs after _verify_translation failed,
+    and chunks that failed verification in an earlier run (recorded in the
+    segment sidecar) - always use the requested model. Translation memory
+    entries are keyed on the requested model too, so a tier's answer that
+    fails verification is forgotten under the key it was stored with.
+    """
+
+    def __init__(self, tiers):
+        self.tiers = [t for t in tiers if t.get("model")]
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def features(text):
+        """(chars, math_density, table_ratio) of a chunk."""
+        chars = len(text)
+        math = sum(len(m) for m in re.findall(r'\$\$[\s\S]*?\$\$|\$[^$\n]+\$', text))
+        math += sum(len(m) for m in re.findall(r'\\[A-Za-z]+', text))
+        lines = [l for l in text.split('\n') if l.strip()]
+        table_lines = sum(1 for l in lines if l.lstrip().startswith('|'))
+        return chars, math / max(chars, 1), table_lines / max(len(lines), 1)
+
+    def pick(self, default_model, content, escalate=False):
+        model = default_model
+        if not escalate:
+            chars, math_density, table_ratio = self.features(content)
+            for tier in self.tiers:
+                if (chars <= tier.get("max_chars", 3000)
+                        and math_density <= tier.get("max_math_density", 0.02)
+                        and table_ratio <= tier.get("max_table_ratio", 0.1)):
+                    model = tier["model"]
+                    break
+        with self._lock:
+            self.counts[model] = self.counts.get(model, 0) + 1
+        return model
+
+
+_MODEL_ROUTERS = {}
+
+def get_model_router(config):
+    """Shared ModelRouter for the configured tiers, or None if routing is off."""
+    route_cfg = config.get("model_routing", {})
+    tiers = route_cfg.get("tiers") or []
+    if not route_cfg.get("enabled", False) or not any(t.get("model") for t in tiers):
+        return None
+    key = json.dumps(tiers, sort_keys=True)
+    with _LLM_LIMITERS_LOCK:
+        router = _MODEL_ROUTERS.get(key)
+        if router is None:
+            router = _MODEL_ROUTERS[key] = ModelRouter(tiers)
+        return router
+
+
+def _call_translation_api(client, model, system_prompt, content, config, source_chars=0, max_tokens_override=0,
+                          usage=None, segments=None, escalate=False, remember=True):
+    """Blocking call with streaming progress bar and retry logic.
+
+    Runs _call_translation_api_async on the shared LLM event loop, so the
+    sequential and parallel paths share one implementation and one pooled
+    client (from get_llm_client()).
+
+    Args:
+        source_chars: Length of source text for progress estimation (0 = no progress bar)
+        max_tokens_override: Dynamic max_tokens value (0 = use env/default)
+        usage: Optional LLMUsage collecting token counts
+        segments: Optional TranslationSegments of the paper
+        escalate: Skip model routing (retry after a failed verification)
+        remember: Store the result in translation memory and the segment sidecar
+
+    Returns:
+        translated text or None on failure
+    """
+    return run_on_llm_loop(_call_translation_api_async(
+        client, model, system_prompt, content, config,
+        source_chars=source_chars, max_tokens_override=max_tokens_override, verbose=True,
+        usage=usage, segments=segments, escalate=escalate, remember=remember,
+    ))
+
+
+async def _call_translation_api_async(client, model, system_prompt, content, config,
+                                       source_chars=0, max_tokens_override=0, verbose=False, usage=None,
+                                       segments=None, escalate=False, remember=True):
+    """Call OpenAI-compatible API with streaming and retry logic.
 
     Args:
+        client: AsyncOpenAI client instance
+        model: Model name
+        system_prompt: System prompt string
+        content: Content to translate
+        config: Configuration dict
         source_chars: Length of source text for progress estimation (0 = no progress bar)
         max_tokens_override: Dynamic max_tokens value (0 = use env/default)
+        verbose: Print attempt / progress bar lines (sequential mode)
+        usage: Optional LLMUsage collecting token counts and time to first token
+        segments: Optional TranslationSegments; unchanged chunks are served
+            from it and every result is recorded in it
+        escalate: Use model as is; otherwise model_routing may send an easy
+            chunk to a faster tier (see ModelRouter)
+        remember: Store the result in translation memory and the segment
+            sidecar. Callers that verify pass False and store the unit
+            themselves once it verified (_verify_and_repair_async)
 
     Returns:
         translated text or None on failure
     """
     import time
+    import asyncio
 
     max_retries = config.get("translation", {}).get("max_retries", 3)
     retry_delay = config.get("translation", {}).get("retry_delay_seconds", 2)
@@ -1972,32 +4156,75 @@ def _call_translation_api(client, model, system_prompt, content, config, source_
             source_token_est = estimate_tokens(content)
             max_tokens = max(int(source_token_est * 1.8), 4096)
 
-    for attempt in range(max_retries):
-        try:
-            print_info(f"Calling API... (attempt {attempt+1}/{max_retries}, timeout={timeout}s)")
-            start_time = time.time()
-            stream = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": content}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=timeout,
-                stream=True
-            )
+    if _is_non_prose(content):
+        if verbose:
+            print(f"{Colors.OKCYAN}  ↳ Nothing to translate ({len(content):,} chars), kept as is{Colors.ENDC}")
+        if usage is not None:
+            usage.record_skip()
+        return content
+
+    if segments is not None:
+        reused = segments.get(content)
+        if reused is not None:
+            if verbose:
+                print(f"{Colors.OKCYAN}  ↳ Unchanged since last translation ({len(reused):,} chars){Colors.ENDC}")
+            return reused
+
+    # Translation memory stays keyed on the requested model, the key every
+    # caller verifies, stores and forgets under, whichever tier answers
+    call_model = model
+    router = get_model_router(config)
+    if router:
+        call_model = router.pick(model, content,
+                                 escalate=escalate or (segments is not None and segments.is_hard(content)))
+        if verbose and call_model != model:
+            print(f"{Colors.OKCYAN}  ↳ Routed to {call_model}{Colors.ENDC}")
+
+    memory = get_translation_memory(config)
+    if memory:
+        cached = await asyncio.to_thread(memory.get, model, system_prompt, content)
+        if cached is not None:
+            if verbose:
+                print(f"{Colors.OKCYAN}  ↳ Translation memory hit ({len(cached):,} chars){Colors.ENDC}")
+            if remember and segments is not None:
+                segments.put(content, cached)
+            return cached
+
+    messages = _translation_messages(system_prompt, content, config)
+    extra = {}
+    if config.get("translation", {}).get("stream_usage", True):
+        extra["stream_options"] = {"include_usage": True}
+
+    async def _stream_once(report, progress):
+        start_time = time.time()
+        stream = await client.chat.completions.create(
+            model=call_model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            stream=True,
+            **extra
+        )
 
-            chunks = []
-            char_count = 0
-            last_report = 0
-            for chunk in stream:
+        chunks = []
+        char_count = 0
+        last_report = 0
+        first_token = None
+        reported_usage = None
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    reported_usage = chunk.usage
                 if chunk.choices and chunk.choices[0].delta.content:
                     text = chunk.choices[0].delta.content
+                    if first_token is None:
+                        first_token = time.time() - start_time
+                        progress["first_token"] = first_token
                     chunks.append(text)
                     char_count += len(text)
                     # Report progress every 500 chars
-                    if char_count - last_report >= 500:
+                    if report and char_count - last_report >= 500:
                         elapsed = time.time() - start_time
                         if source_chars > 0:
                             # Korean is ~0.7~1.0x length of English
@@ -2005,100 +4232,197 @@ def _call_translation_api(client, model, system_prompt, content, config, source_
                             pct = min(char_count / estimated_total * 100, 99) if estimated_total > 0 else 0
                             bar_len = 20
                             filled = int(bar_len * pct / 100)
-                            bar = '\u2588' * filled + '\u2591' * (bar_len - filled)
-                            print(f"\r{Colors.OKCYAN}  \u21b3 [{bar}] {pct:.0f}% ({char_count:,} chars, {elapsed:.0f}s){Colors.ENDC}", end="", flush=True)
+                            bar = '█' * filled + '░' * (bar_len - filled)
+                            print(f"\r{Colors.OKCYAN}  ↳ [{bar}] {pct:.0f}% ({char_count:,} chars, {elapsed:.0f}s){Colors.ENDC}", end="", flush=True)
                         else:
-                            print(f"\r{Colors.OKCYAN}  \u21b3 Receiving: {char_count:,} chars ({elapsed:.0f}s){Colors.ENDC}", end="", flush=True)
+                            print(f"\r{Colors.OKCYAN}  ↳ Receiving: {char_count:,} chars ({elapsed:.0f}s){Colors.ENDC}", end="", flush=True)
                         last_report = char_count
+        except asyncio.CancelledError:
+            # Lost a hedge race: drop the connection instead of draining it
+            close = getattr(stream, "close", None)
+            if close is not None:
+                try:
+                    await close()
+                except Exception:
+                    pass
+            raise
+        return {"text": ''.join(chunks), "usage": reported_usage, "first_token": first_token,
+                "elapsed": time.time() - start_time, "chars": char_count}
+
+    def _start_hedge():
+        if not hedging.try_hedge():
+            return None
+        if limiter and not limiter.try_acquire():
+            hedging.undo_hedge()
+            return None
+        task = asyncio.ensure_future(_stream_once(False, {}))
+        if limiter:
+            def _release(t):
+                if t.cancelled():
+                    limiter.release(record=False)
+                elif t.exception() is not None:
+                    limiter.release(error=t.exception())
+                else:
+                    limiter.release(latency=t.result()["elapsed"], size=t.result()["chars"])
+            task.add_done_callback(_release)
+        if usage is not None:
+            usage.record_hedge()
+        return task
+
+    limiter = get_llm_limiter(config)
+    hedging = get_hedge_policy(config)
+    for attempt in range(max_retries):
+        held = bool(limiter)
+        if held:
+            await limiter.acquire_async()
+        try:
+            if verbose:
+                print_info(f"Calling API... (attempt {attempt+1}/{max_retries}, timeout={timeout}s)")
+            start_time = time.time()
+            first_deadline, finish_deadline = hedging.deadlines(len(content)) if hedging else (None, None)
+            if first_deadline is None and finish_deadline is None:
+                result, hedge_won = await _stream_once(verbose, {}), False
+            else:
+                progress = {}
+                result, hedge_won = await _race_hedged(
+                    asyncio.ensure_future(_stream_once(verbose, progress)), _start_hedge, hedging,
+                    first_deadline, finish_deadline, progress, start_time)
 
             elapsed = time.time() - start_time
-            print(f"\r{Colors.OKCYAN}  \u21b3 Received: {char_count:,} chars in {elapsed:.1f}s{Colors.ENDC}          ")
-            return ''.join(chunks)
+            char_count = result["chars"]
+            if verbose:
+                print(f"\r{Colors.OKCYAN}  ↳ Received: {char_count:,} chars in {elapsed:.1f}s{Colors.ENDC}          ")
+            if held:
+                held = False
+                limiter.release(latency=elapsed, size=char_count)
+            if hedging:
+                hedging.observe(None if hedge_won else result["first_token"], elapsed, len(content))
+            if usage is not None:
+                usage.record(result["usage"], result["first_token"], model=call_model)
+            translated, fixed = reinsert_placeholders(content, result["text"])
+            if fixed and usage is not None:
+                usage.record_placeholders(fixed=fixed)
+            if remember:
+                if memory:
+                    await asyncio.to_thread(memory.put, model, system_prompt, content, translated)
+                if segments is not None:
+                    segments.put(content, translated)
+            return translated
 
         except Exception as e:
+            if held:
+                limiter.release(error=e)
             if attempt < max_retries - 1:
-                wait_time = retry_delay * (attempt + 1)
+                if usage is not None:
+                    usage.record_retry()
+                if limiter:
+                    wait_time = limiter.backoff_seconds(e, attempt, retry_delay)
+                else:
+                    wait_time = retry_delay * (attempt + 1)
                 print_warning(f"API call failed (attempt {attempt+1}/{max_retries}): {e}")
-                print_info(f"Retrying in {wait_time}s...")
-                time.sleep(wait_time)
+                if verbose:
+                    print_info(f"Retrying in {wait_time:.1f}s...")
+                await asyncio.sleep(wait_time)
             else:
                 print_error(f"API call failed after {max_retries} attempts: {e}")
                 return None
+        except BaseException:
+            # Cancelled (lost a hedge race one level up, shutdown): free the slot only
+            if held:
+                limiter.release(record=False)
+            raise
 
 
-async def _call_translation_api_async(client, model, system_prompt, content, config,
-                                       source_chars=0, max_tokens_override=0):
-    """Async version of _call_translation_api with identical logic.
+_REPAIR_MARKER_RE = re.compile(r'^\[\[P(\d+)\]\]\s*$', re.MULTILINE)
 
-    Args:
-        client: AsyncOpenAI client instance
-        model: Model name
-        system_prompt: System prompt string
-        content: Content to translate
-        config: Configuration dict
-        source_chars: Length of source text for progress estimation (0 = no progress bar)
-        max_tokens_override: Dynamic max_tokens value (0 = use env/default)
+
+async def _repair_translation_async(client, model, system_prompt, source_text, translated_text, config,
+                                    usage=None, max_share=0.5):
+    """Re-translate only the missing / untranslated paragraphs of a failed translation.
+
+    Source and translated paragraphs are aligned (_align_paragraphs), the
+    failing source paragraphs are sent in one batched call as [[P<n>]]
+    blocks, and the answers are spliced back in place.
 
     Returns:
-        translated text or None on failure
+        (repaired_text, n_repaired), or (None, 0) when nothing can be located,
+        more than max_share of the paragraphs fail (a full retry is cheaper
+        to reason about) or the batched answer cannot be parsed.
+    """
+    source_paras, trans_paras, pairs, targets = _find_repair_targets(source_text, translated_text)
+    if not targets or len(targets) > max(1, int(len(source_paras) * max_share)):
+        return None, 0
+
+    blocks = '\n\n'.join(f"[[P{n}]]\n{source_paras[si]}" for n, si in enumerate(targets, 1))
+    answer = await _call_translation_api_async(
+        client, model, system_prompt + _TRANSLATION_REPAIR_INSTRUCTION, blocks, config,
+        source_chars=len(blocks), max_tokens_override=max(int(estimate_tokens(blocks) * 1.8), 2048),
+        usage=usage, escalate=True, remember=False,
+    )
+    if not answer:
+        return None, 0
+    parts = _REPAIR_MARKER_RE.split(answer)
+    repaired = {}
+    for k in range(1, len(parts) - 1, 2):
+        text = parts[k + 1].strip()
+        if text:
+            repaired[int(parts[k])] = text
+    if set(repaired) != set(range(1, len(targets) + 1)):
+        return None, 0
+
+    fixed = {si: repaired[n] for n, si in enumerate(targets, 1)}
+    out = []
+    for si, ti in pairs:
+        if si is not None and si in fixed:
+            out.append(fixed[si])
+        elif ti is not None:
+            out.append(trans_paras[ti])
+    return '\n\n'.join(out), len(targets)
+
+
+async def _verify_and_repair_async(client, model, system_prompt, source_text, translated_text, config,
+                                   usage=None, segments=None, label=""):
+    """Verify one translated unit; on failure try a paragraph-targeted repair.
+
+    Returns (text, is_ok, reason) with the repaired text when the repair ran.
+    A unit that verifies (directly or after the repair) is stored in the
+    translation memory and segment sidecar; callers translate with
+    remember=False and leave that to this function. A unit that stays
+    unverified (repair impossible, failed or not enough) is dropped from both,
+    so no later run serves it, and marked hard so model routing escalates it
+    from now on.
     """
-    import time
     import asyncio
-
-    max_retries = config.get("translation", {}).get("max_retries", 3)
-    retry_delay = config.get("translation", {}).get("retry_delay_seconds", 2)
-    timeout = config.get("translation", {}).get("timeout_seconds", 300)
-    temperature = float(os.getenv("TRANSLATION_TEMPERATURE", "0.3"))
-
-    # Dynamic max_tokens: use override, then env, then calculate from source
-    if max_tokens_override > 0:
-        max_tokens = max_tokens_override
-    else:
-        env_max = int(os.getenv("TRANSLATION_MAX_TOKENS", "0"))
-        if env_max > 0:
-            max_tokens = env_max
-        else:
-            source_token_est = estimate_tokens(content)
-            max_tokens = max(int(source_token_est * 1.8), 4096)
-
-    for attempt in range(max_retries):
+    is_ok, reason = _verify_translation(source_text, translated_text)
+    if not is_ok:
+        if segments is not None:
+            segments.mark_hard(source_text)
         try:
-            start_time = time.time()
-            stream = await client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": content}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=timeout,
-                stream=True
-            )
-
-            chunks = []
-            char_count = 0
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    text = chunk.choices[0].delta.content
-                    chunks.append(text)
-                    char_count += len(text)
-
-            elapsed = time.time() - start_time
-            return ''.join(chunks)
-
+            repaired, count = await _repair_translation_async(
+                client, model, system_prompt, source_text, translated_text, config, usage=usage)
         except Exception as e:
-            if attempt < max_retries - 1:
-                wait_time = retry_delay * (attempt + 1)
-                print_warning(f"Async API call failed (attempt {attempt+1}/{max_retries}): {e}")
-                await asyncio.sleep(wait_time)
-            else:
-                print_error(f"Async API call failed after {max_retries} attempts: {e}")
-                return None
+            print_warning(f"Paragraph repair failed{label}: {e}")
+            repaired, count = None, 0
+        if repaired is not None:
+            is_ok, reason2 = _verify_translation(source_text, repaired)
+            print_info(f"Repaired {count} paragraph(s){label} ({reason} -> {reason2})")
+            translated_text, reason = repaired, reason2
+    memory = get_translation_memory(config)
+    if is_ok:
+        if memory:
+            await asyncio.to_thread(memory.put, model, system_prompt, source_text, translated_text)
+        if segments is not None:
+            segments.put(source_text, translated_text)
+    else:
+        if memory:
+            await asyncio.to_thread(memory.forget, model, system_prompt, source_text)
+        if segments is not None:
+            segments.discard(source_text)
+    return translated_text, is_ok, reason
 
 
 async def _translate_chunks_parallel(client, model, system_prompt, chunks,
-                                      prev_context, config):
+                                      prev_context, config, usage=None, segments=None):
     """Translate multiple chunks in parallel with concurrency control.
 
     Args:
@@ -2114,7 +4438,10 @@ async def _translate_chunks_parallel(client, model, system_prompt, chunks,
     """
     import asyncio
 
-    max_workers = config.get("translation", {}).get("parallel_max_workers", 3)
+    # With the adaptive limiter the real cap is applied per API call
+    limiter = get_llm_limiter(config)
+    max_workers = limiter.max_limit if limiter else config.get("translation", {}).get("parallel_max_workers", 3)
+    verify_enabled = config.get("translation", {}).get("verify_translation", True)
     semaphore = asyncio.Semaphore(max_workers)
 
     async def translate_one_chunk(idx, chunk):
@@ -2128,8 +4455,14 @@ async def _translate_chunks_parallel(client, model, system_prompt, chunks,
 
             result = await _call_translation_api_async(
                 client, model, prompt_with_context, chunk, config,
-                source_chars=len(chunk), max_tokens_override=dynamic_max
+                source_chars=len(chunk), max_tokens_override=dynamic_max, usage=usage, segments=segments,
+                remember=not verify_enabled
             )
+            if result and verify_enabled:
+                result, _, _ = await _verify_and_repair_async(
+                    client, model, prompt_with_context, chunk, result, config,
+                    usage=usage, segments=segments, label=f" in chunk {idx + 1}"
+                )
 
             return (idx, result)
 
@@ -2163,15 +4496,386 @@ async def _translate_chunks_parallel(client, model, system_prompt, chunks,
     return [r if r is not None else "" for r in ordered_results]
 
 
-def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, progress_callback=None):
-    """Translate English markdown to Korean using OpenAI-compatible API.
-
-    Pipeline: YAML分離 → OCR정리 → 코드보호 → 섹션분류 → 번역(수식OCR정리포함) → 복원/결합
+def _build_document_context(sections, max_chars=1500):
+    """Title and section outline shared by every translation call of a document.
 
-    Returns:
+    Replaces the previous-section tail as the terminology anchor, so sections
+    no longer depend on each other and can be translated concurrently.
+    """
+    headings = []
+    for section_text, _ in sections:
+        for line in section_text.split('\n'):
+            m = re.match(r'^(#{1,3})\s+(.+?)\s*$', line)
+            if m and not m.group(2).startswith('__'):
+                headings.append(m.group(2))
+    if not headings:
+        return ""
+    outline = headings[0]
+    for heading in headings[1:]:
+        if len(outline) + len(heading) + 3 > max_chars:
+            break
+        outline += f" | {heading}"
+    return f"{_DOC_CONTEXT_MARKER} {outline}]"
+
+
+GLOSSARY_FILE = "glossary.json"
+
+GLOSSARY_PROMPT = """You build a terminology glossary for translating an English academic document into Korean.
+From the headings, abstract and frequent terms below, choose up to {max_terms} key technical terms whose Korean rendering must stay consistent throughout the document.
+Return ONLY a valid JSON object mapping each English term to its Korean rendering, e.g. {{"attention head": "어텐션 헤드", "fine-tuning": "미세 조정"}}.
+Keep acronyms, model names, dataset names and other proper nouns in English (map them to themselves)."""
+
+_GLOSSARY_STOPWORDS = frozenset("""
+a an the and or of in on at to for from by with without into over under than then as is are was were be been
+being this that these those it its we our they their he she his her you your which who whom whose what when
+where how why not no can could may might must shall should will would do does did done has have had having
+also such each both all any some more most other only same so very via per using use used based between
+uses show shows shown propose proposes proposed provide provides make makes made given
+figure table section fig eq equation et al i e g
+""".split())
+
+
+def _glossary_candidates(body, sections, max_terms=80, abstract_chars=1500):
+    """Headings, abstract and frequent n-grams of a paper, as input for the glossary call."""
+    headings = []
+    for section_text, _ in sections:
+        for line in section_text.split('\n'):
+            m = re.match(r'^#{1,4}\s+(.+?)\s*$', line)
+            if m and not m.group(1).startswith('__'):
+                headings.append(m.group(1))
+
+    abstract = ""
+    for section_text, _ in sections:
+        first = section_text.lstrip().split('\n', 1)[0]
+        if re.match(r'^#{1,4}\s+(\d+\.?\s*)?abstract\b', first, re.IGNORECASE):
+            abstract = section_text
+            break
+    if not abstract:
+        abstract = body
+    abstract = abstract[:abstract_chars]
+
+    text = re.sub(r'<<[A-Z_]+_\d+(?:_[0-9a-f]{6})?>>|\$\$[\s\S]*?\$\$|\$[^$\n]*\$|https?://\S+', ' ', body)
+    counts = {}
+    for sentence in re.split(r'[.!?;:()\[\]\n]', text):
+        words = re.findall(r'[A-Za-z][A-Za-z0-9-]*', sentence)
+        for n in (1, 2, 3):
+            for k in range(len(words) - n + 1):
+                gram = words[k:k + n]
+                if gram[0].lower() in _GLOSSARY_STOPWORDS or gram[-1].lower() in _GLOSSARY_STOPWORDS:
+                    continue
+                # Single words only when they look like terms (acronyms, hyphenated, CamelCase)
+                if n == 1 and not re.search(r'[A-Z].*[A-Z]|-', gram[0]):
+                    continue
+                key = ' '.join(gram)
+                counts[key] = counts.get(key, 0) + 1
+    frequent = sorted(((c, t) for t, c in counts.items() if c >= 3 and len(t) > 2), reverse=True)
+    terms = [t for _, t in frequent[:max_terms]]
+    return headings, abstract, terms
+
+
+def build_paper_glossary(body, sections, output_dir, config, usage=None):
+    """Key term → Korean rendering map for one paper, from one LLM call.
+
+    The call sees only the headings, abstract and frequent n-grams. The result
+    is cached in the output directory's glossary.json and reused while that
+    input and the model are unchanged; setting "locked": true in the file keeps
+    a hand-edited glossary. Returns {} when disabled or on failure.
+    """
+    gloss_cfg = config.get("glossary", {})
+    if not gloss_cfg.get("enabled", True):
+        return {}
+    model = gloss_cfg.get("model") or os.getenv("GLOSSARY_MODEL") or os.getenv("TRANSLATION_MODEL", "gemini-claude-sonnet-4-5")
+    max_terms = int(gloss_cfg.get("max_terms", 40))
+
+    headings, abstract, terms = _glossary_candidates(body, sections, int(gloss_cfg.get("max_candidates", 80)))
+    if not terms and not headings:
+        return {}
+    content = "Headings:\n" + "\n".join(f"- {h}" for h in headings[:60])
+    content += f"\n\nAbstract:\n{abstract}"
+    content += "\n\nFrequent terms:\n" + "\n".join(f"- {t}" for t in terms)
+    fingerprint = _text_sha256(model, str(max_terms), content)
+
+    path = os.path.join(output_dir, GLOSSARY_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get("locked") or cached.get("fingerprint") == fingerprint:
+            print_info(f"Glossary: {len(cached.get('terms', {}))} term(s) from {GLOSSARY_FILE}")
+            return cached.get("terms", {})
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print_warning(f"Ignoring unreadable {path}: {e}")
+
+    api_base = os.getenv("OPENAI_BASE_URL")
+    api_key = os.getenv("OPENAI_API_KEY")
+    limiter = get_llm_limiter(config, api_base)
+    import time
+    start_time = time.time()
+    if limiter:
+        limiter.acquire()
+    try:
+        client = get_llm_client(config, api_base, api_key)
+        response = run_on_llm_loop(client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": GLOSSARY_PROMPT.format(max_terms=max_terms)},
+                {"role": "user", "content": content},
+            ],
+            temperature=0,
+            max_tokens=int(gloss_cfg.get("max_tokens", 2048)),
+            timeout=int(gloss_cfg.get("timeout_seconds", 60)),
+        ))
+        result_text = response.choices[0].message.content.strip()
+    except Exception as e:
+        if limiter:
+            limiter.release(error=e)
+        print_warning(f"Glossary extraction failed (translating without glossary): {e}")
+        return {}
+    elapsed = time.time() - start_time
+    if limiter:
+        limiter.release(latency=elapsed, size=len(result_text))
+    if usage is not None:
+        usage.record(getattr(response, "usage", None))
+
+    if result_text.startswith("```"):
+        result_text = re.sub(r'^```(?:json)?\s*\n?', '', result_text)
+        result_text = re.sub(r'\n?```\s*$', '', result_text)
+    try:
+        parsed = json.loads(result_text)
+    except json.JSONDecodeError as e:
+        print_warning(f"Glossary response is not valid JSON (translating without glossary): {e}")
+        return {}
+    glossary = {
+        str(k).strip(): str(v).strip()
+        for k, v in parsed.items() if isinstance(v, str) and str(k).strip() and v.strip()
+    } if isinstance(parsed, dict) else {}
+    glossary = dict(list(glossary.items())[:max_terms])
+
+    try:
+        _write_json_atomic(path, {
+            "version": 1,
+            "model": model,
+            "fingerprint": fingerprint,
+            "locked": False,
+            "terms": glossary,
+            "created_at": datetime.now().isoformat(),
+        })
+    except Exception as e:
+        print_warning(f"Failed to save glossary: {e}")
+    print_info(f"Glossary: {len(glossary)} term(s) extracted in {elapsed:.1f}s")
+    return glossary
+
+
+def _format_glossary(glossary, max_chars=1500):
+    """Compact prompt suffix for a glossary ("" when empty)."""
+    entries = []
+    used = 0
+    for term, ko in glossary.items():
+        entry = term if term == ko else f"{term}={ko}"
+        if used + len(entry) + 2 > max_chars:
+            break
+        entries.append(entry)
+        used += len(entry) + 2
+    if not entries:
+        return ""
+    return f"{_GLOSSARY_MARKER} {'; '.join(entries)}]"
+
+
+async def _translate_document_parallel(client, model, system_prompt, doc_context, sections,
+                                       config, on_section_done=None, usage=None, segments=None):
+    """Translate all chunks of all sections through one bounded async pool.
+
+    sections: list of (key, section_text, chunks). Chunks are dispatched as a
+    single document-wide work list limited to parallel_max_workers in flight;
+    results are reassembled per section in order. Adjacent small single-chunk
+    sections are packed into one request of up to translation.pack_target_tokens
+    ([[S<n>]] delimited, split back per section; a pack whose answer does not
+    split cleanly is re-sent section by section). Single-chunk sections keep
+    the verify / repair / retry-once behaviour, chunks of long sections are
+    verified one by one.
+
+    on_section_done(key, translated) runs in a worker thread (asyncio.to_thread),
+    one call at a time, so its file writes never stall the shared LLM loop.
+
+    Returns {key: translated_section} for every section that completed;
+    missing keys are left to the sequential path.
+    """
+    import asyncio
+
+    # With the adaptive limiter the real cap is applied per API call
+    limiter = get_llm_limiter(config)
+    max_workers = limiter.max_limit if limiter else config.get("translation", {}).get("parallel_max_workers", 3)
+    verify_enabled = config.get("translation", {}).get("verify_translation", True)
+    semaphore = asyncio.Semaphore(max_workers)
+    memory = get_translation_memory(config)
+    prompt = system_prompt + doc_context
+    trans_cfg = config.get("translation", {})
+    pack_tokens = int(trans_cfg.get("pack_target_tokens", 1500)) if trans_cfg.get("pack_small_sections", True) else 0
+    pack_max = max(1, int(trans_cfg.get("pack_max_sections", 8)))
+
+    # Verified units are stored by _verify_and_repair_async / finish_single,
+    # so nothing unverified reaches translation memory or the segment sidecar
+    async def call(prompt_text, text, remember=not verify_enabled, escalate=False):
+        async with semaphore:
+            return await _call_translation_api_async(
+                client, model, prompt_text, text, config,
+                source_chars=len(text), max_tokens_override=max(int(estimate_tokens(text) * 1.8), 4096),
+                usage=usage, segments=segments, escalate=escalate, remember=remember
+            )
+
+    async def call_verified(text, label):
+        result = await call(prompt, text)
+        if result and verify_enabled:
+            result, _, _ = await _verify_and_repair_async(
+                client, model, prompt, text, result, config, usage=usage, segments=segments, label=label)
+        return result
+
+    async def run_section(key, section_text, chunks):
+        if len(chunks) > 1:
+            # Chunks are verified (and repaired) one by one
+            calls = [call_verified(c, f" in section {key} chunk {n}") for n, c in enumerate(chunks, 1)]
+        else:
+            calls = [call(prompt, chunks[0])]
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for r in results:
+            if isinstance(r, Exception) or not r:
+                if isinstance(r, Exception):
+                    print_warning(f"Parallel chunk translation error: {r}")
+                return [(key, None)]
+
+        if len(chunks) > 1:
+            combined = '\n\n'.join(results)
+            if verify_enabled:
+                is_ok, reason = _verify_translation(section_text, combined)
+                if not is_ok:
+                    print_warning(f"Section {key} verification: {reason} (proceeding with best result)")
+            return [(key, combined)]
+        return [await finish_single(key, section_text, results[0])]
+
+    async def run_pack(pack):
+        blocks = '\n\n'.join(f"[[S{n}]]\n{text}" for n, (_, text, _) in enumerate(pack, 1))
+        try:
+            answer = await call(prompt + _TRANSLATION_PACK_INSTRUCTION, blocks, remember=False)
+        except Exception as e:
+            print_warning(f"Packed translation error: {e}")
+            answer = None
+        parts = _PACK_MARKER_RE.split(answer or "")
+        translated = {}
+        for k in range(1, len(parts) - 1, 2):
+            text = parts[k + 1].strip()
+            if text:
+                translated[int(parts[k])] = text
+        if set(translated) != set(range(1, len(pack) + 1)):
+            keys = ", ".join(str(key) for key, _, _ in pack)
+            print_warning(f"Packed answer for sections {keys} did not split cleanly, sending them one by one")
+            results = await asyncio.gather(*(run_section(*s) for s in pack))
+            return [item for r in results for item in r]
+        out = []
+        for n, (key, section_text, _) in enumerate(pack, 1):
+            result = translated[n]
+            if not verify_enabled:
+                if memory:
+                    await asyncio.to_thread(memory.put, model, prompt, section_text, result)
+                if segments is not None:
+                    segments.put(section_text, result)
+            out.append(await finish_single(key, section_text, result))
+        return out
+
+    def _known(texts):
+        return {text for text in texts if (segments is not None and text in segments)
+                or (memory and memory.contains(model, prompt, text))}
+
+    # Greedily pack adjacent small single-chunk sections up to the token budget;
+    # the memory lookups for the candidates run in one batch off the event loop
+    candidates = [text for _, text, chunks in sections
+                  if pack_tokens and len(chunks) == 1 and not _is_non_prose(text)]
+    known = await asyncio.to_thread(_known, candidates) if candidates else set()
+    units = []
+    pack, pack_size = [], 0
+    for s in sections:
+        key, section_text, chunks = s
+        tokens = estimate_tokens(section_text) if len(chunks) == 1 else None
+        packable = (bool(pack_tokens) and tokens is not None and tokens < pack_tokens
+                    and not _is_non_prose(section_text) and section_text not in known)
+        if pack and (not packable or pack_size + tokens > pack_tokens or len(pack) >= pack_max
+                     or key != pack[-1][0] + 1):
+            units.append(pack)
+            pack, pack_size = [], 0
+        if packable:
+            pack.append(s)
+            pack_size += tokens
+        else:
+            units.append([s])
+    if pack:
+        units.append(pack)
+    n_packed = sum(len(u) for u in units if len(u) > 1)
+    if n_packed:
+        print_info(f"Packed {n_packed} small section(s) into {sum(1 for u in units if len(u) > 1)} request(s) "
+                   f"(~{pack_tokens} tokens each)")
+
+    async def finish_single(key, section_text, result):
+        if verify_enabled:
+            result, is_ok, reason = await _verify_and_repair_async(
+                client, model, prompt, section_text, result, config,
+                usage=usage, segments=segments, label=f" in section {key}")
+            if not is_ok:
+                print_warning(f"Verification failed ({reason}), retrying section {key}...")
+                result2 = await call(system_prompt + _TRANSLATION_RETRY_INSTRUCTION + doc_context, section_text,
+                                     remember=False, escalate=True)
+                if result2:
+                    _, reason2 = _verify_translation(section_text, result2)
+                    if reason2 == "ok" or len(result2) > len(result):
+                        result = result2
+                        if reason2 == "ok":
+                            if memory:
+                                await asyncio.to_thread(memory.put, model, prompt, section_text, result)
+                            if segments is not None:
+                                segments.put(section_text, result)
+                        print_success(f"Retry improved translation (section {key})")
+                    else:
+                        print_warning(f"Retry did not improve ({reason2}), using best result")
+        return key, result
+
+    done = {}
+    tasks = [run_pack(u) if len(u) > 1 else run_section(*u[0]) for u in units]
+    for next_done in asyncio.as_completed(tasks):
+        for key, translated in await next_done:
+            if translated is None:
+                print_warning(f"Section {key} incomplete in parallel pass, will retry sequentially")
+                continue
+            done[key] = translated
+            if on_section_done:
+                await asyncio.to_thread(on_section_done, key, translated)
+    return done
+
+
+def _translation_header():
+    """YAML header of every _ko.md (header.yaml, or a minimal default)."""
+    if os.path.exists("header.yaml"):
+        with open("header.yaml", 'r', encoding='utf-8') as f:
+            return f.read()
+    print_warning("header.yaml not found, using minimal header")
+    return '---\nlang: ko\nformat:\n  html:\n    toc: true\n    embed-resources: true\n    theme: cosmo\n---'
+
+
+def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, progress_callback=None, usage=None,
+                                  incremental=False):
+    """Translate English markdown to Korean using OpenAI-compatible API.
+
+    Pipeline: YAML分離 → OCR정리 → 코드보호 → 섹션분류 → 번역(수식OCR정리포함) → 복원/결합
+
+    usage: optional LLMUsage that receives token counts for this paper.
+    incremental: reuse translation_segments.json from the previous run so only
+        chunks whose English source changed are sent to the API.
+
+    Files of translation.streaming_threshold_mb or more go through
+    _translate_md_streaming instead, which keeps only a window of sections
+    in memory.
+
+    Returns:
         Path to Korean markdown file (*_ko.md) or None on failure
     """
-    from pathlib import Path
     from dotenv import load_dotenv
 
     try:
@@ -2188,15 +4892,23 @@ def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, pr
         print_info(f"Translation model: {model}")
         print_info(f"API endpoint: {api_base}")
 
-        # Initialize OpenAI clients (sync and async)
+        # Pooled client, shared with metadata extraction and other papers
         try:
-            from openai import OpenAI, AsyncOpenAI
-            import asyncio
-            client_sync = OpenAI(base_url=api_base, api_key=api_key)
-            client_async = AsyncOpenAI(base_url=api_base, api_key=api_key)
+            client = get_llm_client(config, api_base, api_key)
         except Exception as e:
             print_error(f"Failed to initialize OpenAI client: {e}")
             return None
+        if usage is None:
+            usage = LLMUsage()
+
+        # Very large documents are translated window by window from the file
+        threshold_mb = config.get("translation", {}).get("streaming_threshold_mb", 0)
+        if threshold_mb and os.path.getsize(md_path) >= threshold_mb * 1024 * 1024:
+            if incremental:
+                print_info("Incremental mode needs the whole segment sidecar, not streaming this document")
+            else:
+                return _translate_md_streaming(client, model, md_path, output_dir, config, system_prompt,
+                                               progress_callback=progress_callback, usage=usage)
 
         # Read source markdown
         with open(md_path, 'r', encoding='utf-8') as f:
@@ -2214,16 +4926,26 @@ def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, pr
         # Save body before protection for spurious heading detection later
         body_before_protection = body
 
-        # Step 3: Protect code blocks (math is left for LLM to fix OCR artifacts)
-        body, placeholders = protect_special_blocks(body)
-        if placeholders:
-            print_info(f"Protected {len(placeholders)} code block(s)")
+        # Step 3: Protect code, anchors, images, URLs, numeric tables and
+        # reference lists (math is left for LLM to fix OCR artifacts)
+        body, placeholders = protect_special_blocks(body, config)
 
         # Step 4: Classify sections
         sections = classify_sections(body)
         translatable = [(s, t) for s, t in sections if t]
         skipped = [(s, t) for s, t in sections if not t]
         print_info(f"Sections: {len(translatable)} to translate, {len(skipped)} to skip")
+        if placeholders:
+            kinds = {}
+            for key in placeholders:
+                kind = _PLACEHOLDER_RE.fullmatch(key).group(1)
+                kinds[kind] = kinds.get(kind, 0) + 1
+            usage.protected_tokens = sum(
+                estimate_tokens(restore_special_blocks(s, placeholders)) - estimate_tokens(s)
+                for s, _ in translatable)
+            print_info(f"Protected {len(placeholders)} span(s) "
+                       f"({', '.join(f'{n} {k.lower()}' for k, n in sorted(kinds.items()))}); "
+                       f"~{usage.protected_tokens:,} input tokens saved, about as many output tokens")
 
         # Step 5: Section-by-section translation (always, for quality)
         import time as _time
@@ -2234,31 +4956,127 @@ def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, pr
 
         # Parallel translation settings
         parallel_enabled = config.get("translation", {}).get("enable_parallel_translation", True)
+        document_parallel = parallel_enabled and config.get("translation", {}).get("document_parallel", True)
         parallel_min_chunks = config.get("translation", {}).get("parallel_min_chunks", 2)
         max_workers = config.get("translation", {}).get("parallel_max_workers", 3)
 
         print_info(f"Translating {translatable_count} sections ({total_chars:,} chars)")
-        if parallel_enabled:
+        limiter = get_llm_limiter(config)
+        if parallel_enabled and limiter:
+            print_info(f"Parallel translation enabled (adaptive limit {limiter.limit:.1f}, "
+                       f"range {limiter.min_limit}-{limiter.max_limit} concurrent API calls)")
+        elif parallel_enabled:
             print_info(f"Parallel translation enabled (max {max_workers} concurrent API calls)")
 
+        # Section results survive a crash; a rerun only translates missing sections
+        checkpoint = TranslationCheckpoint(output_dir, _text_sha256(model, system_prompt))
+        if checkpoint.sections:
+            print_info(f"Resuming translation: {len(checkpoint.sections)} section(s) in checkpoint")
+        segments = TranslationSegments(output_dir, _text_sha256(model, system_prompt), reuse=incremental)
+        if incremental:
+            if segments.previous:
+                print_info(f"Incremental mode: {len(segments.previous)} chunk translation(s) from the last run")
+            else:
+                print_warning("Incremental mode: no segment sidecar from a previous run, translating everything")
+
+        memory = get_translation_memory(config)
+        memory_hits = memory.hits if memory else 0
+        memory_misses = memory.misses if memory else 0
+
+        # Shared title/outline context keeps terminology consistent without
+        # chaining sections through the previous translation
+        base_prompt = system_prompt
+        doc_context = _build_document_context(sections)
+
+        # One glossary per paper pins key terms, so the sequential path no
+        # longer needs the previous translation's tail either
+        glossary_context = _format_glossary(build_paper_glossary(body, sections, output_dir, config, usage=usage))
+        doc_context += glossary_context
+        chain_context = not glossary_context
+        system_prompt = base_prompt + doc_context
+
+        header = _translation_header()
+
+        # Finished sections are readable in <base>_ko.partial.md while the rest translate
+        base_name = os.path.basename(md_path).replace('.md', '')
+        partial = PartialTranslation(output_dir, base_name, header, len(sections), placeholders)
+        for i, (section_text, should_translate) in enumerate(sections, 1):
+            ready = section_text if not should_translate else checkpoint.get(section_text)
+            if ready is not None:
+                partial.add(i, ready)
+
         translate_start = _time.time()
+
+        # Document-wide pass: every chunk of every pending section in one bounded pool
+        prefetched = {}
+        if document_parallel:
+            pending = []
+            for i, (section_text, should_translate) in enumerate(sections, 1):
+                if should_translate and checkpoint.get(section_text) is None:
+                    pending.append((i, section_text, _split_long_section(section_text, max_section_chars)))
+            if len(pending) > 1 or (pending and len(pending[0][2]) >= parallel_min_chunks):
+                n_chunks = sum(len(c) for _, _, c in pending)
+                print_info(f"[DOCUMENT PARALLEL MODE: {n_chunks} chunks across {len(pending)} sections, max {max_workers} concurrent]")
+                done_chars = [total_chars - sum(len(t) for _, t, _ in pending)]
+                section_chars = {key: len(text) for key, text, _ in pending}
+
+                def _section_done(key, translated):
+                    prefetched[key] = translated
+                    partial.add(key, translated)
+                    checkpoint.put(sections[key - 1][0], translated)
+                    done_chars[0] += section_chars[key]
+                    pct = done_chars[0] / total_chars * 100 if total_chars > 0 else 0
+                    print_info(f"  Section {key} translated ({len(prefetched)}/{len(pending)}, {pct:.0f}% overall)")
+                    if progress_callback:
+                        progress_callback(translatable_count - len(pending) + len(prefetched),
+                                          translatable_count, pct)
+
+                try:
+                    run_on_llm_loop(_translate_document_parallel(
+                        client, model, base_prompt, doc_context, pending, config,
+                        on_section_done=_section_done, usage=usage, segments=segments,
+                    ))
+                    print_success(f"Document parallel pass complete ({len(prefetched)}/{len(pending)} sections)")
+                except Exception as e:
+                    print_warning(f"Document parallel translation failed: {e}")
+                    print_info("Falling back to section-by-section mode...")
+
         prev_context = ""
         translated_parts = []
         chars_translated = 0
         section_idx = 0
 
+        def _emit(index, text):
+            translated_parts.append(text)
+            partial.add(index, text)
+
         for i, (section_text, should_translate) in enumerate(sections, 1):
             if not should_translate:
-                translated_parts.append(section_text)
+                _emit(i, section_text)
                 continue
 
             section_idx += 1
             overall_pct = chars_translated / total_chars * 100 if total_chars > 0 else 0
 
+            if i in prefetched:
+                _emit(i, prefetched[i])
+                chars_translated += len(section_text)
+                continue
+
             # Update progress callback for status tracking
             if progress_callback:
                 progress_callback(section_idx, translatable_count, overall_pct)
 
+            cached = checkpoint.get(section_text)
+            if cached is not None:
+                print_info(f"Section {section_idx}/{translatable_count}: reused from checkpoint")
+                if len(_split_long_section(section_text, max_section_chars)) == 1:
+                    segments.put(section_text, cached)
+                _emit(i, cached)
+                prev_context = cached[-200:] if len(cached) > 200 else cached
+                chars_translated += len(section_text)
+                continue
+
             # Split long sections into paragraph-level chunks
             chunks = _split_long_section(section_text, max_section_chars)
 
@@ -2267,41 +5085,52 @@ def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, pr
                 print_info(f"Section {section_idx}/{translatable_count} ({overall_pct:.0f}% overall, {len(section_text):,} chars)")
 
                 prompt_with_context = system_prompt
-                if prev_context:
+                if chain_context and prev_context:
                     prompt_with_context += f"\n\n[Previous context for terminology consistency: ...{prev_context}]"
 
                 # Dynamic max_tokens based on source length
                 dynamic_max = max(int(estimate_tokens(section_text) * 1.8), 4096)
 
                 result = _call_translation_api(
-                    client_sync, model, prompt_with_context, section_text, config,
-                    source_chars=len(section_text), max_tokens_override=dynamic_max
+                    client, model, prompt_with_context, section_text, config,
+                    source_chars=len(section_text), max_tokens_override=dynamic_max,
+                    usage=usage, segments=segments, remember=not verify_enabled
                 )
                 if not result:
                     print_error(f"Section {section_idx} translation failed")
                     return None
 
-                # Verify translation completeness
+                # Verify translation completeness; repair failing paragraphs
+                # first and re-send the whole section only if that is not enough
                 if verify_enabled:
-                    is_ok, reason = _verify_translation(section_text, result)
+                    result, is_ok, reason = run_on_llm_loop(_verify_and_repair_async(
+                        client, model, prompt_with_context, section_text, result, config,
+                        usage=usage, segments=segments
+                    ))
                     if not is_ok:
                         print_warning(f"Verification failed ({reason}), retrying section {section_idx}...")
-                        retry_prompt = system_prompt + "\n\nIMPORTANT: Your previous translation was incomplete or not translated to Korean. You MUST translate ALL text into Korean (한국어). Do NOT return the original English text. Translate EVERY sentence without any omission."
-                        if prev_context:
+                        retry_prompt = base_prompt + _TRANSLATION_RETRY_INSTRUCTION + doc_context
+                        if chain_context and prev_context:
                             retry_prompt += f"\n\n[Previous context for terminology consistency: ...{prev_context}]"
                         result2 = _call_translation_api(
-                            client_sync, model, retry_prompt, section_text, config,
-                            source_chars=len(section_text), max_tokens_override=dynamic_max
+                            client, model, retry_prompt, section_text, config,
+                            source_chars=len(section_text), max_tokens_override=dynamic_max,
+                            usage=usage, segments=segments, escalate=True, remember=False
                         )
                         if result2:
                             _, reason2 = _verify_translation(section_text, result2)
                             if reason2 == "ok" or len(result2) > len(result):
                                 result = result2
+                                if reason2 == "ok":
+                                    if memory:
+                                        memory.put(model, prompt_with_context, section_text, result)
+                                    segments.put(section_text, result)
                                 print_success("Retry improved translation")
                             else:
                                 print_warning(f"Retry did not improve ({reason2}), using best result")
 
-                translated_parts.append(result)
+                _emit(i, result)
+                checkpoint.put(section_text, result)
                 prev_context = result[-200:] if len(result) > 200 else result
                 chars_translated += len(section_text)
 
@@ -2314,10 +5143,10 @@ def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, pr
                 if parallel_enabled and len(chunks) >= parallel_min_chunks:
                     print_info(f"  [PARALLEL MODE: {len(chunks)} chunks with max {max_workers} workers]")
                     try:
-                        section_results = asyncio.run(
+                        section_results = run_on_llm_loop(
                             _translate_chunks_parallel(
-                                client_async, model, system_prompt, chunks,
-                                prev_context, config
+                                client, model, system_prompt, chunks,
+                                prev_context if chain_context else "", config, usage=usage, segments=segments
                             )
                         )
                         print_success(f"  Parallel translation complete")
@@ -2343,18 +5172,24 @@ def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, pr
                         print_info(f"  Chunk {ci}/{len(chunks)} ({chunk_pct:.0f}% overall, {len(chunk):,} chars)")
 
                         prompt_with_context = system_prompt
-                        if prev_context:
+                        if chain_context and prev_context:
                             prompt_with_context += f"\n\n[Previous context for terminology consistency: ...{prev_context}]"
 
                         dynamic_max = max(int(estimate_tokens(chunk) * 1.8), 4096)
 
                         result = _call_translation_api(
-                            client_sync, model, prompt_with_context, chunk, config,
-                            source_chars=len(chunk), max_tokens_override=dynamic_max
+                            client, model, prompt_with_context, chunk, config,
+                            source_chars=len(chunk), max_tokens_override=dynamic_max,
+                            usage=usage, segments=segments, remember=not verify_enabled
                         )
                         if not result:
                             print_error(f"Section {section_idx} chunk {ci} failed")
                             return None
+                        if verify_enabled:
+                            result, _, _ = run_on_llm_loop(_verify_and_repair_async(
+                                client, model, prompt_with_context, chunk, result, config,
+                                usage=usage, segments=segments, label=f" in chunk {ci}"
+                            ))
 
                         section_results.append(result)
                         prev_context = result[-200:] if len(result) > 200 else result
@@ -2367,39 +5202,43 @@ def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, pr
                     if not is_ok:
                         print_warning(f"Section {section_idx} verification: {reason} (proceeding with best result)")
 
-                translated_parts.append(combined)
+                _emit(i, combined)
+                checkpoint.put(section_text, combined)
                 chars_translated += len(section_text)
 
         elapsed_total = _time.time() - translate_start
         final_body = '\n\n'.join(translated_parts)
         print_success(f"All sections translated ({elapsed_total:.0f}s total)")
+        if memory:
+            print_info(f"Translation memory: {memory.hits - memory_hits} hit(s), "
+                       f"{memory.misses - memory_misses} miss(es)")
+        if usage.requests:
+            print_info(f"LLM usage: {usage.describe()}")
+        if incremental:
+            print_info(f"Incremental mode: {segments.reused} chunk(s) reused from the last run, "
+                       f"{usage.requests} API request(s)")
 
         # Step 6: Restore protected blocks
+        present = {m.group(0) for m in _PLACEHOLDER_RE.finditer(final_body)}
+        lost = [k for k in placeholders if k not in present]
+        usage.record_placeholders(lost=len(lost))
+        if usage.placeholders_fixed:
+            print_info(f"Placeholders: {usage.placeholders_fixed} mangled or dropped one(s) re-inserted")
+        if lost:
+            print_warning(f"{len(lost)} protected span(s) lost in translation and not restored: "
+                          f"{', '.join(lost[:5])}{', ...' if len(lost) > 5 else ''}")
         final_body = restore_special_blocks(final_body, placeholders)
 
         # Step 6.5: Strip spurious headings inserted by AI
         final_body = _strip_spurious_headings(body_before_protection, final_body)
 
-        # Step 7: Write output with header.yaml
-        base_name = os.path.basename(md_path).replace('.md', '')
+        # Step 7: Write output with header.yaml (atomically replaces the partial file)
         ko_md_path = os.path.join(output_dir, f"{base_name}_ko.md")
+        partial.finalize(ko_md_path, final_body)
+        save_markdown_index(ko_md_path)
 
-        header_path = Path("header.yaml")
-        header = ''
-        if header_path.exists():
-            with open(header_path, 'r', encoding='utf-8') as f:
-                header = f.read()
-        else:
-            print_warning("header.yaml not found, using minimal header")
-            header = '---\nlang: ko\nformat:\n  html:\n    toc: true\n    embed-resources: true\n    theme: cosmo\n---'
-
-        with open(ko_md_path, 'w', encoding='utf-8') as f:
-            f.write(header)
-            if not header.endswith('\n'):
-                f.write('\n')
-            f.write('\n')
-            f.write(final_body)
-
+        checkpoint.discard()
+        segments.save(_text_sha256(content))
         print_success(f"Translation saved: {ko_md_path}")
         return ko_md_path
 
@@ -2408,273 +5247,1039 @@ def translate_md_to_korean_openai(md_path, output_dir, config, system_prompt, pr
         import traceback
         print_error(traceback.format_exc())
         return None
+    finally:
+        memory = get_translation_memory(config)
+        if memory:
+            memory.flush()
+
+def _translate_md_streaming(client, model, md_path, output_dir, config, system_prompt,
+                            progress_callback=None, usage=None):
+    """translate_md_to_korean_openai for very large documents, in bounded memory.
+
+    Sections come from iter_markdown_sections and are cleaned, protected
+    (placeholders numbered per section) and translated a window of
+    translation.streaming_window_sections at a time through the
+    document-parallel pool. Each finished window is restored, stripped of
+    spurious headings and appended to <base>_ko.partial.md, so only the
+    window, the outline and a glossary sample stay resident. The partial
+    file and translation_partial.json double as the checkpoint: a rerun on
+    the same source and prompt continues after the last written section.
+    The segment sidecar and markdown index are not written in this mode.
+    """
+    trans_cfg = config.get("translation", {})
+    window = max(1, int(trans_cfg.get("streaming_window_sections", 8)))
+    max_section_chars = trans_cfg.get("max_section_chars", 5000)
+    sample_chars = int(trans_cfg.get("streaming_glossary_sample_chars", 200000))
+    print_info(f"Streaming translation ({os.path.getsize(md_path) / 1024 / 1024:.1f} MB, "
+               f"{window} section(s) per window)")
+
+    # Pass 1: outline (headings, abstract) and a bounded sample for the glossary
+    outline, sample = [], []
+    total_sections = total_chars = sampled = 0
+    for raw in iter_markdown_sections(md_path):
+        total_sections += 1
+        total_chars += len(raw)
+        first_line = raw.lstrip()[:300].split('\n', 1)[0]
+        if re.match(r'^#{1,4}\s+(\d+\.?\s*)?abstract\b', first_line, re.IGNORECASE):
+            outline.append((raw.strip()[:1500], True))
+        elif first_line.startswith('#'):
+            outline.append((first_line, True))
+        if sampled < sample_chars:
+            sample.append(raw[:sample_chars - sampled])
+            sampled += len(sample[-1])
+    print_info(f"Sections: {total_sections} ({total_chars:,} chars)")
+
+    base_prompt = system_prompt
+    doc_context = _build_document_context(outline)
+    glossary_context = _format_glossary(build_paper_glossary(''.join(sample), outline, output_dir, config, usage=usage))
+    doc_context += glossary_context
+    del sample
+
+    base_name = os.path.basename(md_path).replace('.md', '')
+    partial_path = os.path.join(output_dir, base_name + TRANSLATION_PARTIAL_SUFFIX)
+    progress_path = os.path.join(output_dir, TRANSLATION_PARTIAL_PROGRESS_FILE)
+    fingerprint = _text_sha256(model, base_prompt)
+    source_sha256 = _file_sha256(md_path)
+    resume = {}
+    try:
+        with open(progress_path, 'r', encoding='utf-8') as f:
+            resume = json.load(f)
+        if (resume.get("fingerprint") != fingerprint or resume.get("source_sha256") != source_sha256
+                or os.path.getsize(partial_path) < resume.get("bytes", 0)):
+            resume = {}
+    except (OSError, ValueError):
+        resume = {}
+
+    done = resume.get("sections_done", 0)
+    out = open(partial_path, 'r+b' if done else 'wb')
+    try:
+        if done:
+            out.truncate(resume["bytes"])
+            out.seek(resume["bytes"])
+            print_info(f"Resuming streaming translation after section {done}/{total_sections}")
+        else:
+            header = _translation_header()
+            out.write((header if header.endswith('\n') else header + '\n').encode('utf-8'))
+        wrote_any = done > 0 and resume.get("wrote_any", True)
+        fixed_before = usage.placeholders_fixed
+        lost_total = 0
+        chars_done = 0
+        translate_start = time.time()
+
+        def _save_progress(sections_done):
+            _write_json_atomic(progress_path, {
+                "partial": os.path.basename(partial_path),
+                "sections_done": sections_done,
+                "sections_total": total_sections,
+                "fingerprint": fingerprint,
+                "source_sha256": source_sha256,
+                "bytes": out.tell(),
+                "wrote_any": wrote_any,
+                "updated_at": datetime.now().isoformat(),
+            })
 
-def process_single_pdf(pdf_path, config, prompt):
-    """Process single PDF file with configurable pipeline"""
+        def _flush(items):
+            nonlocal wrote_any, lost_total
+            pending, keys = [], {}
+            for idx, _, _, parts in items:
+                for p, (text, should_translate) in enumerate(parts):
+                    if should_translate:
+                        keys[(idx, p)] = len(keys) + 1
+                        pending.append((keys[(idx, p)], text, _split_long_section(text, max_section_chars)))
+            results = {}
+            for _ in range(2):  # one more try for sections the pool could not finish
+                todo = [item for item in pending if item[0] not in results]
+                if not todo:
+                    break
+                results.update(run_on_llm_loop(_translate_document_parallel(
+                    client, model, base_prompt, doc_context, todo, config, usage=usage)) or {})
+            failed = [key for key, _, _ in pending if key not in results]
+            if failed:
+                raise RuntimeError(f"{len(failed)} section(s) of the window could not be translated")
+
+            for idx, cleaned, placeholders, parts in items:
+                texts = [results[keys[(idx, p)]] if should_translate else text
+                         for p, (text, should_translate) in enumerate(parts)]
+                section = '\n\n'.join(texts)
+                if section:
+                    present = {m.group(0) for m in _PLACEHOLDER_RE.finditer(section)}
+                    lost = [k for k in placeholders if k not in present]
+                    lost_total += len(lost)
+                    section = restore_special_blocks(section, placeholders)
+                    section = _strip_spurious_headings(cleaned, section)
+                    out.write((('\n\n' if wrote_any else '\n') + section).encode('utf-8'))
+                    wrote_any = True
+            out.flush()
+            _save_progress(items[-1][0])
+
+        items = []
+        for idx, raw in enumerate(iter_markdown_sections(md_path), 1):
+            chars_done += len(raw)
+            if idx <= done:
+                continue
+            cleaned = clean_ocr_math(clean_ocr_artifacts(raw))
+            protected, placeholders = protect_special_blocks(cleaned, config)
+            items.append((idx, cleaned, placeholders, classify_sections(protected)))
+            if len(items) >= window:
+                _flush(items)
+                items = []
+                pct = chars_done / total_chars * 100 if total_chars else 100
+                print_info(f"  Sections 1-{idx}/{total_sections} written ({pct:.0f}% overall)")
+                if progress_callback:
+                    progress_callback(idx, total_sections, pct)
+        if items:
+            _flush(items)
+    finally:
+        out.close()
+
+    usage.record_placeholders(lost=lost_total)
+    print_success(f"All sections translated ({time.time() - translate_start:.0f}s total)")
+    if usage.requests:
+        print_info(f"LLM usage: {usage.describe()}")
+    if usage.placeholders_fixed > fixed_before:
+        print_info(f"Placeholders: {usage.placeholders_fixed - fixed_before} mangled or dropped one(s) re-inserted")
+    if lost_total:
+        print_warning(f"{lost_total} protected span(s) lost in translation and not restored")
+
+    ko_md_path = os.path.join(output_dir, f"{base_name}_ko.md")
+    os.replace(partial_path, ko_md_path)
     try:
-        pdf_name = os.path.basename(pdf_path)
-        base_name = pdf_name.replace('.pdf', '').strip()  # Remove trailing/leading whitespace
+        os.remove(progress_path)
+    except FileNotFoundError:
+        pass
+    print_success(f"Translation saved: {ko_md_path}")
+    return ko_md_path
 
-        print_header(f"Processing: {pdf_name}")
-        print_info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-        # Get pipeline configuration
-        pipeline = config.get("processing_pipeline", {
-            "convert_to_markdown": True,
-        })
+##############################################################################
+# Pipeline State
+# Per-paper pipeline_state.json manifest so interrupted runs resume
+##############################################################################
 
-        # Display pipeline configuration
-        engine = os.environ.get("PDF_CONVERTER", "marker").lower()
-        print_info("Pipeline configuration:")
-        print_info(f"  • Converter: {engine}")
-        print_info(f"  • PDF → Markdown: {'Enabled' if pipeline['convert_to_markdown'] else 'Disabled'}")
-        print_info(f"  • Metadata Extraction: {'Enabled' if pipeline.get('extract_metadata', False) else 'Disabled'}")
-        print_info(f"  • Web Search Enrichment: {'Enabled' if pipeline.get('enrich_with_web_search', True) else 'Disabled'}")
-        print_info(f"  • Translation (Korean): {'Enabled' if pipeline.get('translate_to_korean', False) else 'Disabled'}")
-        print()
+PIPELINE_STATE_FILE = "pipeline_state.json"
+TRANSLATION_CHECKPOINT_FILE = "translation_checkpoint.jsonl"
+TRANSLATION_SEGMENTS_FILE = "translation_segments.json"
+TRANSLATION_PARTIAL_SUFFIX = "_ko.partial.md"
+TRANSLATION_PARTIAL_PROGRESS_FILE = "translation_partial.json"
+RESUME_INDEX_FILE = ".resume_index.json"
+
+def _file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file, read in chunks."""
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _text_sha256(*parts):
+    """SHA-256 hex digest over one or more strings (NUL-separated)."""
+    import hashlib
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or '').encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class PipelineState:
+    """pipeline_state.json manifest of one output directory.
+
+    For every stage it records status ("running" / "done" / "failed"), the
+    hash of the stage input, output paths relative to the output directory
+    and timings. A stage can be skipped on a later run when it is done, its
+    input hash still matches and all of its outputs still exist.
+    """
+
+    VERSION = 1
+
+    def __init__(self, output_dir, data=None):
+        self.output_dir = output_dir
+        self.data = data or {
+            "version": self.VERSION,
+            "pdf_name": None,
+            "pdf_sha256": None,
+            "complete": False,
+            "stages": {},
+        }
+        self._started = {}
 
-        # Initialize processing status tracking
-        total_stages = _count_active_stages(pipeline)
-        current_stage = 0
+    @classmethod
+    def load(cls, output_dir):
+        path = os.path.join(output_dir, PIPELINE_STATE_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == cls.VERSION:
+                return cls(output_dir, data)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print_warning(f"Ignoring unreadable {path}: {e}")
+        return cls(output_dir)
+
+    def save(self):
+        self.data["updated_at"] = datetime.now().isoformat()
+        try:
+            _write_json_atomic(os.path.join(self.output_dir, PIPELINE_STATE_FILE), self.data)
+        except Exception as e:
+            print_warning(f"Failed to save pipeline state: {e}")
+
+    def stage(self, name):
+        return self.data["stages"].get(name, {})
+
+    def output_path(self, name, index=0):
+        """Absolute path of a recorded stage output, or None."""
+        outputs = self.stage(name).get("outputs", [])
+        return os.path.join(self.output_dir, outputs[index]) if len(outputs) > index else None
 
-        # Create output directory
-        output_dir = os.path.join("outputs", base_name)
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            print_success(f"Created output directory: {output_dir}")
+    def reusable(self, name, input_hash):
+        st = self.stage(name)
+        if st.get("status") != "done" or st.get("input_hash") != input_hash:
+            return False
+        return all(os.path.exists(os.path.join(self.output_dir, p)) for p in st.get("outputs", []))
+
+    def begin(self, name, input_hash=None):
+        self._started[name] = time.time()
+        self.data["complete"] = False
+        self.data["stages"][name] = {
+            "status": "running",
+            "input_hash": input_hash,
+            "outputs": [],
+            "started_at": datetime.now().isoformat(),
+        }
+        self.save()
+
+    def _finish(self, name, status, **fields):
+        st = self.data["stages"].setdefault(name, {})
+        st.update(status=status, finished_at=datetime.now().isoformat(), **fields)
+        if name in self._started:
+            st["duration_seconds"] = round(time.time() - self._started.pop(name), 1)
+        self.save()
+
+    def done(self, name, outputs=(), **extra):
+        rel = [os.path.relpath(p, self.output_dir) for p in outputs if p]
+        self._finish(name, "done", outputs=rel, error=None, **extra)
+
+    def failed(self, name, error=None):
+        self._finish(name, "failed", error=error)
+
+    def relocate(self, new_output_dir, old_base, new_base):
+        """Follow rename_output_directory(): new directory, renamed output files."""
+        self.output_dir = new_output_dir
+        for st in self.data["stages"].values():
+            st["outputs"] = [
+                new_base + p[len(old_base):] if p.startswith(old_base) else p
+                for p in st.get("outputs", [])
+            ]
+        self.save()
+        if self.data.get("pdf_sha256") and not self.data.get("complete"):
+            _update_resume_index(
+                os.path.dirname(new_output_dir), self.data["pdf_sha256"],
+                os.path.basename(new_output_dir),
+            )
+
+
+_RESUME_INDEX_LOCK = threading.Lock()
+
+def _load_resume_index(parent):
+    try:
+        with open(os.path.join(parent, RESUME_INDEX_FILE), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except Exception:
+        return {}
+
+def _update_resume_index(parent, pdf_sha256, folder_name):
+    """Point pdf_sha256 at a renamed output folder, or drop it (folder_name=None).
+
+    Only unfinished runs whose folder no longer carries the PDF name need an
+    entry; everything else is found at the default location.
+    """
+    with _RESUME_INDEX_LOCK:
+        index = _load_resume_index(parent)
+        if folder_name is None:
+            if index.pop(pdf_sha256, None) is None:
+                return
+        elif index.get(pdf_sha256) == folder_name:
+            return
         else:
-            print_info(f"Output directory exists: {output_dir}")
+            index[pdf_sha256] = folder_name
+        try:
+            _write_json_atomic(os.path.join(parent, RESUME_INDEX_FILE), index)
+        except Exception as e:
+            print_warning(f"Failed to update resume index: {e}")
+
+def _unfinished_run_of(folder, pdf_sha256):
+    try:
+        with open(os.path.join(folder, PIPELINE_STATE_FILE), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return False
+    return data.get("pdf_sha256") == pdf_sha256 and not data.get("complete")
+
+def find_resumable_output_dir(pdf_sha256, default_dir):
+    """Return the output directory holding an unfinished run of this PDF.
+
+    The folder may have been renamed from the PDF name to the paper title
+    before the run died; renamed folders are found through the sha256 index
+    in outputs/.resume_index.json rather than by reading every folder.
+    Falls back to default_dir.
+    """
+    if _unfinished_run_of(default_dir, pdf_sha256):
+        return default_dir
+    parent = os.path.dirname(default_dir) or "."
+    renamed = _load_resume_index(parent).get(pdf_sha256)
+    if renamed:
+        folder = os.path.join(parent, renamed)
+        if _unfinished_run_of(folder, pdf_sha256):
+            return folder
+        _update_resume_index(parent, pdf_sha256, None)
+    return default_dir
+
+
+class TranslationCheckpoint:
+    """Section translations saved while a paper is being translated.
+
+    Entries are keyed by the hash of the section source and scoped to a
+    fingerprint of model + prompt, so a rerun only translates the sections
+    that have no stored result. Removed once the _ko.md is written.
+
+    The file is JSON lines: a {"fingerprint"} header, then one {"key", "text"}
+    record appended per finished section, so saving a section costs one short
+    append instead of rewriting every section stored so far.
+    """
+
+    def __init__(self, output_dir, fingerprint):
+        self.path = os.path.join(output_dir, TRANSLATION_CHECKPOINT_FILE)
+        self.fingerprint = fingerprint
+        self.sections = {}
+        self._fresh = True  # no usable file yet: the first put() writes the header
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                if json.loads(f.readline() or '{}').get("fingerprint") == fingerprint:
+                    self._fresh = False
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                            self.sections[record["key"]] = record["text"]
+                        except (ValueError, KeyError, TypeError):
+                            continue  # torn record of a crashed run
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print_warning(f"Ignoring unreadable translation checkpoint: {e}")
 
+    def get(self, source):
+        return self.sections.get(_text_sha256(source))
+
+    def put(self, source, translated):
+        key = _text_sha256(source)
+        record = json.dumps({"key": key, "text": translated}, ensure_ascii=False)
+        with self._lock:
+            self.sections[key] = translated
+            try:
+                if self._fresh:
+                    with open(self.path, 'w', encoding='utf-8') as f:
+                        f.write(json.dumps({"fingerprint": self.fingerprint}) + '\n')
+                    self._fresh = False
+                # The leading newline keeps a record torn by a crash on its own line
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write('\n' + record + '\n')
+            except Exception as e:
+                print_warning(f"Failed to save translation checkpoint: {e}")
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class TranslationSegments:
+    """translation_segments.json: source chunk → translated chunk of the last full translation.
+
+    Chunks are the classify_sections / _split_long_section units sent to the
+    API, keyed by the hash of their whitespace-normalized text and scoped to a
+    model + prompt fingerprint. Every successful translation rewrites the
+    sidecar with the chunks it produced; with reuse=True (incremental mode)
+    chunks unchanged since then are served from it, so only edited chunks
+    reach the API. Chunks that ever failed verification are kept in "hard"
+    for model routing.
+    """
+
+    def __init__(self, output_dir, fingerprint, reuse=False):
+        self.path = os.path.join(output_dir, TRANSLATION_SEGMENTS_FILE)
+        self.fingerprint = fingerprint
+        self.previous = {}
+        self.current = {}
+        self.hard = set()
+        self.reused = 0
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print_warning(f"Ignoring unreadable {self.path}: {e}")
+            return
+        self.hard = set(data.get("hard", []))
+        if not reuse:
+            return
+        if data.get("fingerprint") == fingerprint:
+            self.previous = data.get("segments", {})
+        else:
+            print_warning("Segment sidecar was written with another model/prompt, ignoring it")
+
+    @staticmethod
+    def _key(source):
+        return _text_sha256(re.sub(r'\s+', ' ', source).strip())
+
+    def get(self, source):
+        key = self._key(source)
+        with self._lock:
+            translated = self.previous.get(key)
+            if translated is not None:
+                self.current[key] = translated
+                self.reused += 1
+            return translated
+
+    def put(self, source, translated):
+        with self._lock:
+            self.current[self._key(source)] = translated
+
+    def discard(self, source):
+        """Drop a chunk whose translation failed verification from the next sidecar."""
+        with self._lock:
+            self.current.pop(self._key(source), None)
+
+    def __contains__(self, source):
+        return self._key(source) in self.previous
+
+    def mark_hard(self, source):
+        """Remember a chunk that failed verification (model routing escalates it)."""
+        with self._lock:
+            self.hard.add(self._key(source))
+
+    def is_hard(self, source):
+        return self._key(source) in self.hard
+
+    def save(self, source_sha256=None):
+        with self._lock:
+            data = {
+                "version": 1,
+                "fingerprint": self.fingerprint,
+                "source_sha256": source_sha256,
+                "segments": dict(self.current),
+                "hard": sorted(self.hard),
+                "updated_at": datetime.now().isoformat(),
+            }
+        try:
+            _write_json_atomic(self.path, data)
+        except Exception as e:
+            print_warning(f"Failed to save translation segments: {e}")
+
+
+class PartialTranslation:
+    """<base>_ko.partial.md, appended in section order while a paper is translated.
+
+    Sections may finish out of order (document-parallel pass); each is written
+    once every section before it is available, and translation_partial.json
+    records how far the file goes. finalize() writes the _ko.md atomically and
+    removes both files; after a crash the partial file stays readable.
+    """
+
+    def __init__(self, output_dir, base_name, header, total, placeholders=None):
+        self.path = os.path.join(output_dir, base_name + TRANSLATION_PARTIAL_SUFFIX)
+        self.progress_path = os.path.join(output_dir, TRANSLATION_PARTIAL_PROGRESS_FILE)
+        self.header = header if header.endswith('\n') else header + '\n'
+        self.total = total
+        self.placeholders = placeholders or {}
+        self.written = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(self.header)
+            self._save_progress()
+        except OSError as e:
+            print_warning(f"Partial translation output disabled: {e}")
+            self.path = None
+
+    def _save_progress(self):
+        _write_json_atomic(self.progress_path, {
+            "partial": os.path.basename(self.path),
+            "sections_done": self.written,
+            "sections_total": self.total,
+            "updated_at": datetime.now().isoformat(),
+        })
+
+    def add(self, index, text):
+        """Record section `index` (1-based) and append every section that is now in order."""
+        with self._lock:
+            if self.path is None or index <= self.written or index in self._pending:
+                return
+            self._pending[index] = text
+            ready = []
+            while self.written + 1 in self._pending:
+                self.written += 1
+                ready.append(self._pending.pop(self.written))
+            if not ready:
+                return
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    for part in ready:
+                        f.write('\n' + restore_special_blocks(part, self.placeholders) + '\n')
+                self._save_progress()
+            except OSError as e:
+                print_warning(f"Failed to append partial translation: {e}")
+
+    def finalize(self, ko_md_path, body):
+        """Write the finished translation to ko_md_path atomically and drop the partial files."""
+        tmp_path = f"{ko_md_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.header)
+            f.write('\n')
+            f.write(body)
+        os.replace(tmp_path, ko_md_path)
+        with self._lock:
+            for path in (self.path, self.progress_path):
+                if path:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            self.path = None
+
+
+def _start_pdf_job(pdf_path, config):
+    """Print the run header, create the output directory and return the per-PDF job state."""
+    pdf_name = os.path.basename(pdf_path)
+    base_name = pdf_name.replace('.pdf', '').strip()  # Remove trailing/leading whitespace
+
+    print_header(f"Processing: {pdf_name}")
+    print_info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    # Get pipeline configuration
+    pipeline = config.get("processing_pipeline", {
+        "convert_to_markdown": True,
+    })
+
+    # Display pipeline configuration
+    engine = os.environ.get("PDF_CONVERTER", "marker").lower()
+    print_info("Pipeline configuration:")
+    print_info(f"  • Converter: {engine}")
+    print_info(f"  • PDF → Markdown: {'Enabled' if pipeline['convert_to_markdown'] else 'Disabled'}")
+    print_info(f"  • Metadata Extraction: {'Enabled' if pipeline.get('extract_metadata', False) else 'Disabled'}")
+    print_info(f"  • Web Search Enrichment: {'Enabled' if pipeline.get('enrich_with_web_search', True) else 'Disabled'}")
+    print_info(f"  • Translation (Korean): {'Enabled' if pipeline.get('translate_to_korean', False) else 'Disabled'}")
+    print()
+
+    # Create output directory, or reuse the one of an interrupted run of this PDF
+    pdf_sha256 = _file_sha256(pdf_path)
+    output_dir = find_resumable_output_dir(pdf_sha256, os.path.join("outputs", base_name))
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print_success(f"Created output directory: {output_dir}")
+    else:
+        print_info(f"Output directory exists: {output_dir}")
+    base_name = os.path.basename(output_dir)
+
+    state = PipelineState.load(output_dir)
+    if state.data.get("pdf_sha256") == pdf_sha256 and not state.data.get("complete"):
+        done = [name for name, st in state.data["stages"].items() if st.get("status") == "done"]
+        print_info(f"Resuming interrupted run (completed stages: {', '.join(done) or 'none'})")
+    else:
+        state = PipelineState(output_dir)
+        state.data.update(pdf_name=pdf_name, pdf_sha256=pdf_sha256)
+        state.save()
+
+    return {
+        "pdf_path": pdf_path,
+        "pdf_name": pdf_name,
+        "base_name": base_name,
+        "output_dir": output_dir,
+        "pipeline": pipeline,
+        "state": state,
+        # Processing status tracking
+        "total_stages": _count_active_stages(pipeline),
+        "current_stage": 0,
         # Track processing results
-        results = {
+        "results": {
             "markdown": None,
             "metadata": None,
             "translation": None,
-        }
-        duplicate_found = False
+        },
+        "md_path": None,
+        "metadata": None,
+        "duplicate_found": False,
+        "skip_translation": False,
+        "ko_md_path": None,
+    }
 
-        # Step 1: PDF to MD (conditional)
-        md_path = None
-        if pipeline["convert_to_markdown"]:
-            current_stage += 1
-            write_processing_status(pdf_name, "converting", current_stage, total_stages, "PDF to Markdown")
-            print_info(f"Step 1: Converting PDF to Markdown...")
-            try:
-                status_info = {"pdf_name": pdf_name, "stage_num": current_stage, "total_stages": total_stages}
-                md_path = convert_pdf_to_md_dispatch(pdf_path, output_dir, config, status_info=status_info)
-                if md_path:
-                    print_success(f"Markdown conversion complete: {md_path}")
-                    results["markdown"] = "success"
-                else:
-                    print_error(f"Markdown conversion failed")
-                    results["markdown"] = "failed"
-            except Exception as e:
-                print_error(f"Markdown conversion error: {e}")
+def _stage_convert(job, config, worker=None):
+    """Stage 1 (GPU): PDF → Markdown, heading normalization and OCR math cleanup."""
+    pipeline = job["pipeline"]
+    pdf_name = job["pdf_name"]
+    results = job["results"]
+    output_dir = job["output_dir"]
+
+    state = job["state"]
+    engine = os.environ.get("PDF_CONVERTER", "marker").lower()
+    convert_hash = _text_sha256(state.data["pdf_sha256"], engine)
+
+    # Step 1: PDF to MD (conditional)
+    md_path = None
+    if pipeline["convert_to_markdown"] and state.reusable("convert", convert_hash):
+        job["current_stage"] += 1
+        md_path = state.output_path("convert")
+        print_success(f"Step 1: Reusing converted markdown: {md_path}")
+        results["markdown"] = "success"
+        job["md_path"] = md_path
+        return job
+    elif pipeline["convert_to_markdown"]:
+        job["current_stage"] += 1
+        write_processing_status(pdf_name, "converting", job["current_stage"], job["total_stages"], "PDF to Markdown")
+        print_info(f"Step 1: Converting PDF to Markdown...")
+        state.begin("convert", convert_hash)
+        try:
+            status_info = {"pdf_name": pdf_name, "stage_num": job["current_stage"], "total_stages": job["total_stages"]}
+            md_path = convert_pdf_to_md_dispatch(
+                job["pdf_path"], output_dir, config, status_info=status_info,
+                worker=worker, pdf_sha256=state.data["pdf_sha256"],
+            )
+            if md_path:
+                print_success(f"Markdown conversion complete: {md_path}")
+                results["markdown"] = "success"
+            else:
+                print_error(f"Markdown conversion failed")
                 results["markdown"] = "failed"
+        except Exception as e:
+            print_error(f"Markdown conversion error: {e}")
+            results["markdown"] = "failed"
+    else:
+        # Check if markdown already exists
+        expected_md = os.path.join(output_dir, job["base_name"] + ".md")
+        if os.path.exists(expected_md):
+            md_path = expected_md
+            print_info(f"Using existing markdown: {md_path}")
+            results["markdown"] = "skipped"
         else:
-            # Check if markdown already exists
-            expected_md = os.path.join(output_dir, base_name + ".md")
-            if os.path.exists(expected_md):
-                md_path = expected_md
-                print_info(f"Using existing markdown: {md_path}")
-                results["markdown"] = "skipped"
+            print_warning(f"Markdown conversion disabled and no existing file found")
+            results["markdown"] = "skipped"
+
+    # Step 1.1: Normalize heading levels (fix OCR inconsistencies)
+    if pipeline.get("normalize_headings", True) and md_path and os.path.exists(md_path):
+        try:
+            with open(md_path, 'r', encoding='utf-8') as f:
+                md_content = f.read()
+            normalized = normalize_heading_levels(md_content)
+            if normalized != md_content:
+                with open(md_path, 'w', encoding='utf-8') as f:
+                    f.write(normalized)
+                # Count changed headings
+                orig = _re.findall(r'^#{1,6}', md_content, _re.MULTILINE)
+                norm = _re.findall(r'^#{1,6}', normalized, _re.MULTILINE)
+                changed = sum(1 for a, b in zip(orig, norm) if a != b)
+                print_success(f"Heading levels normalized ({changed} heading(s) adjusted)")
             else:
-                print_warning(f"Markdown conversion disabled and no existing file found")
-                results["markdown"] = "skipped"
+                print_info("Headings already consistent")
+        except Exception as e:
+            print_warning(f"Heading normalization skipped: {e}")
 
-        # Step 1.1: Normalize heading levels (fix OCR inconsistencies)
-        if pipeline.get("normalize_headings", True) and md_path and os.path.exists(md_path):
-            try:
-                with open(md_path, 'r', encoding='utf-8') as f:
-                    md_content = f.read()
-                normalized = normalize_heading_levels(md_content)
-                if normalized != md_content:
-                    with open(md_path, 'w', encoding='utf-8') as f:
-                        f.write(normalized)
-                    # Count changed headings
-                    orig = _re.findall(r'^#{1,6}', md_content, _re.MULTILINE)
-                    norm = _re.findall(r'^#{1,6}', normalized, _re.MULTILINE)
-                    changed = sum(1 for a, b in zip(orig, norm) if a != b)
-                    print_success(f"Heading levels normalized ({changed} heading(s) adjusted)")
-                else:
-                    print_info("Headings already consistent")
-            except Exception as e:
-                print_warning(f"Heading normalization skipped: {e}")
+    # Step 1.2: Clean OCR math artifacts in English markdown
+    if md_path and os.path.exists(md_path):
+        try:
+            with open(md_path, 'r', encoding='utf-8') as f:
+                md_content = f.read()
+            cleaned = clean_ocr_math(md_content)
+            if cleaned != md_content:
+                with open(md_path, 'w', encoding='utf-8') as f:
+                    f.write(cleaned)
+                print_success("OCR math artifacts cleaned in English markdown")
+            else:
+                print_info("No OCR math artifacts found")
+        except Exception as e:
+            print_warning(f"OCR math cleanup skipped: {e}")
+        save_markdown_index(md_path)
 
-        # Step 1.2: Clean OCR math artifacts in English markdown
+    if state.stage("convert").get("status") == "running":
         if md_path and os.path.exists(md_path):
-            try:
-                with open(md_path, 'r', encoding='utf-8') as f:
-                    md_content = f.read()
-                cleaned = clean_ocr_math(md_content)
-                if cleaned != md_content:
-                    with open(md_path, 'w', encoding='utf-8') as f:
-                        f.write(cleaned)
-                    print_success("OCR math artifacts cleaned in English markdown")
-                else:
-                    print_info("No OCR math artifacts found")
-            except Exception as e:
-                print_warning(f"OCR math cleanup skipped: {e}")
-
-        # Step 1.5: Extract metadata and optionally rename folder
-        if pipeline.get("extract_metadata", False) and md_path and os.path.exists(md_path):
-            current_stage += 1
-            write_processing_status(pdf_name, "metadata", current_stage, total_stages, "Extracting Metadata")
-            print_info("Step 1.5: Extracting paper metadata with AI...")
-            try:
-                metadata = extract_paper_metadata(md_path, output_dir, config)
-                if metadata:
-                    title_preview = (metadata.get('title') or 'N/A')[:60]
-                    print_success(f"Metadata extracted - Title: {title_preview}")
-                    results["metadata"] = "success"
-
-                    # Enrich metadata with web search (venue, DOI, year, URL)
-                    if pipeline.get("enrich_with_web_search", True):
-                        metadata = enrich_metadata_with_web_search(metadata, output_dir, config)
-
-                    # Smart rename if enabled
-                    meta_config = config.get("metadata_extraction", {})
-                    if meta_config.get("smart_rename", True) and metadata.get("title"):
-                        max_len = meta_config.get("max_folder_name_length", 80)
-                        new_name = sanitize_folder_name(metadata["title"], max_len)
-                        if new_name and new_name != base_name:
-                            print_info(f"Renaming: {base_name} -> {new_name}")
-                            rename_result = rename_output_directory(output_dir, new_name, base_name)
-                            if rename_result:
-                                output_dir, base_name = rename_result
-                                # Find actual .md file (suffix may include extra spaces from original name)
-                                md_path = None
-                                for f in os.listdir(output_dir):
-                                    if f.endswith(".md") and not f.endswith("_ko.md") and not f.endswith("_explained.md") and not "_backup_" in f:
-                                        md_path = os.path.join(output_dir, f)
-                                        break
-                                print_success(f"Folder renamed to: {base_name}")
-                            else:
-                                print_warning("Folder rename failed, keeping original name")
-                else:
-                    print_warning("Metadata extraction failed (continuing without metadata)")
-                    results["metadata"] = "failed"
-            except Exception as e:
-                print_error(f"Metadata extraction error: {e}")
+            state.done("convert", [md_path])
+        else:
+            state.failed("convert", "conversion produced no markdown")
+
+    job["md_path"] = md_path
+    return job
+
+def _stage_metadata(job, config):
+    """Stage 2 (network): metadata extraction, web enrichment, smart rename and duplicate check."""
+    pipeline = job["pipeline"]
+    pdf_name = job["pdf_name"]
+    results = job["results"]
+    md_path = job["md_path"]
+    output_dir = job["output_dir"]
+    base_name = job["base_name"]
+    state = job["state"]
+    metadata = None
+    md_hash = _file_sha256(md_path) if md_path and os.path.exists(md_path) else None
+
+    # Step 1.5: Extract metadata and optionally rename folder
+    if pipeline.get("extract_metadata", False) and md_hash and state.reusable("metadata", md_hash):
+        job["current_stage"] += 1
+        try:
+            with open(state.output_path("metadata"), 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            title_preview = (metadata.get('title') or 'N/A')[:60]
+            print_success(f"Step 1.5: Reusing extracted metadata - Title: {title_preview}")
+            results["metadata"] = "success"
+        except Exception as e:
+            print_error(f"Failed to reload metadata: {e}")
+            results["metadata"] = "failed"
+    elif pipeline.get("extract_metadata", False) and md_hash:
+        job["current_stage"] += 1
+        write_processing_status(pdf_name, "metadata", job["current_stage"], job["total_stages"], "Extracting Metadata")
+        print_info("Step 1.5: Extracting paper metadata with AI...")
+        state.begin("metadata", md_hash)
+        usage = LLMUsage()
+        try:
+            metadata = extract_paper_metadata(md_path, output_dir, config, usage=usage)
+            if metadata:
+                title_preview = (metadata.get('title') or 'N/A')[:60]
+                print_success(f"Metadata extracted - Title: {title_preview}")
+                results["metadata"] = "success"
+
+                # Enrich metadata with web search (venue, DOI, year, URL)
+                if pipeline.get("enrich_with_web_search", True):
+                    metadata = enrich_metadata_with_web_search(metadata, output_dir, config)
+
+                # Smart rename if enabled
+                meta_config = config.get("metadata_extraction", {})
+                if meta_config.get("smart_rename", True) and metadata.get("title"):
+                    max_len = meta_config.get("max_folder_name_length", 80)
+                    new_name = sanitize_folder_name(metadata["title"], max_len)
+                    if new_name and new_name != base_name:
+                        print_info(f"Renaming: {base_name} -> {new_name}")
+                        rename_result = rename_output_directory(output_dir, new_name, base_name)
+                        if rename_result:
+                            state.relocate(rename_result[0], base_name, rename_result[1])
+                            output_dir, base_name = rename_result
+                            # Find actual .md file (suffix may include extra spaces from original name)
+                            md_path = None
+                            for f in os.listdir(output_dir):
+                                if f.endswith(".md") and not f.endswith(("_ko.md", "_explained.md", ".partial.md")) and not "_backup_" in f:
+                                    md_path = os.path.join(output_dir, f)
+                                    break
+                            print_success(f"Folder renamed to: {base_name}")
+                        else:
+                            print_warning("Folder rename failed, keeping original name")
+            else:
+                print_warning("Metadata extraction failed (continuing without metadata)")
                 results["metadata"] = "failed"
+        except Exception as e:
+            print_error(f"Metadata extraction error: {e}")
+            results["metadata"] = "failed"
+
+        record_paper_usage(output_dir, "metadata", usage)
+        if results["metadata"] == "success":
+            state.done("metadata", [os.path.join(output_dir, "paper_meta.json")], usage=usage.summary())
         else:
-            results["metadata"] = "skipped"
-
-        # Handle Korean source: rename .md → _ko.md, skip translation
-        skip_translation = False
-        if results.get("metadata") == "success" and metadata:
-            source_lang = metadata.get("source_language", "en")
-            if source_lang == "ko" and md_path and os.path.exists(md_path):
-                ko_md_dest = md_path.replace('.md', '_ko.md')
-                if not os.path.exists(ko_md_dest):
-                    try:
-                        os.rename(md_path, ko_md_dest)
-                        print_success(f"Korean source detected → {os.path.basename(ko_md_dest)}")
-                        md_path = None
-                        skip_translation = True
-                        results["translation"] = "skipped_korean_source"
-                    except Exception as e:
-                        print_warning(f"Korean source rename failed: {e}")
+            state.failed("metadata", "metadata extraction failed")
+    else:
+        results["metadata"] = "skipped"
+
+    # Handle Korean source: rename .md → _ko.md, skip translation
+    if results.get("metadata") == "success" and metadata:
+        source_lang = metadata.get("source_language", "en")
+        if source_lang == "ko" and md_path and os.path.exists(md_path):
+            ko_md_dest = md_path.replace('.md', '_ko.md')
+            if not os.path.exists(ko_md_dest):
+                try:
+                    os.rename(md_path, ko_md_dest)
+                    print_success(f"Korean source detected → {os.path.basename(ko_md_dest)}")
+                    md_path = None
+                    job["skip_translation"] = True
+                    results["translation"] = "skipped_korean_source"
+                except Exception as e:
+                    print_warning(f"Korean source rename failed: {e}")
 
-        # Step 1.7: Duplicate check (optional, requires metadata)
-        if pipeline.get("check_duplicate", True) and metadata:
-            current_stage += 1
-            write_processing_status(pdf_name, "checking_duplicate", current_stage, total_stages, "Checking for Duplicates")
-            print_info("Step 1.7: Checking for duplicate papers...")
+    # Step 1.7: Duplicate check (optional, requires metadata)
+    if pipeline.get("check_duplicate", True) and metadata:
+        job["current_stage"] += 1
+        write_processing_status(pdf_name, "checking_duplicate", job["current_stage"], job["total_stages"], "Checking for Duplicates")
+        print_info("Step 1.7: Checking for duplicate papers...")
+        try:
+            duplicates = check_duplicate_batch(metadata, output_dir)
+            if duplicates:
+                job["duplicate_found"] = True
+                for d in duplicates:
+                    print_warning(f"Duplicate detected! Same title found in: {d['location']}/{d['folder']}")
+                print_warning("Skipping translation to save resources.")
+                results["duplicate_check"] = "duplicate_found"
+                job["skip_translation"] = True
+            else:
+                print_success("No duplicates found")
+                results["duplicate_check"] = "clear"
+        except Exception as e:
+            print_warning(f"Duplicate check error (continuing): {e}")
+            results["duplicate_check"] = "error"
+
+    job.update(md_path=md_path, output_dir=output_dir, base_name=base_name, metadata=metadata)
+    return job
+
+def _stage_translate(job, config, prompt):
+    """Stage 3 (network): Korean translation unless skipped as duplicate / Korean source."""
+    pipeline = job["pipeline"]
+    pdf_name = job["pdf_name"]
+    results = job["results"]
+    md_path = job["md_path"]
+    state = job["state"]
+
+    # Step 2: Translation (optional, skip if duplicate found)
+    translate_hash = None
+    if pipeline.get("translate_to_korean", False) and not job["skip_translation"] and md_path and os.path.exists(md_path):
+        model = os.getenv("TRANSLATION_MODEL", "gemini-claude-sonnet-4-5")
+        translate_hash = _text_sha256(_file_sha256(md_path), model, prompt)
+
+    if job["skip_translation"]:
+        if "translation" not in results or results["translation"] is None:
+            results["translation"] = "skipped_duplicate"
+    elif pipeline.get("translate_to_korean", False):
+        if translate_hash and state.reusable("translate", translate_hash):
+            job["current_stage"] += 1
+            job["ko_md_path"] = state.output_path("translate")
+            print_success(f"Step 2: Reusing translation: {job['ko_md_path']}")
+            results["translation"] = "success"
+        elif translate_hash:
+            job["current_stage"] += 1
+            write_processing_status(pdf_name, "translating", job["current_stage"], job["total_stages"], "Translating to Korean")
+            print_info(f"Step 2: Translating to Korean...")
+            state.begin("translate", translate_hash)
+
+            _trans_stage = job["current_stage"]
+            _trans_total = job["total_stages"]
+            def _translation_progress(sec_idx, sec_total, pct):
+                write_processing_status(
+                    pdf_name, "translating", _trans_stage, _trans_total,
+                    f"Translating to Korean ({sec_idx}/{sec_total}, {pct:.0f}%)",
+                    sub_progress=pct / 100.0
+                )
+
+            usage = LLMUsage()
             try:
-                duplicates = check_duplicate_batch(metadata, output_dir)
-                if duplicates:
-                    duplicate_found = True
-                    for d in duplicates:
-                        print_warning(f"Duplicate detected! Same title found in: {d['location']}/{d['folder']}")
-                    print_warning("Skipping translation to save resources.")
-                    results["duplicate_check"] = "duplicate_found"
-                    skip_translation = True
+                job["ko_md_path"] = translate_md_to_korean_openai(
+                    md_path, job["output_dir"], config, prompt,
+                    progress_callback=_translation_progress, usage=usage
+                )
+                if job["ko_md_path"]:
+                    print_success(f"Translation complete: {job['ko_md_path']}")
+                    results["translation"] = "success"
                 else:
-                    print_success("No duplicates found")
-                    results["duplicate_check"] = "clear"
+                    print_warning(f"Translation failed (English files remain available)")
+                    results["translation"] = "failed"
             except Exception as e:
-                print_warning(f"Duplicate check error (continuing): {e}")
-                results["duplicate_check"] = "error"
-
-        # Step 2: Translation (optional, skip if duplicate found)
-        ko_md_path = None
-        if skip_translation:
-            if "translation" not in results:
-                results["translation"] = "skipped_duplicate"
-        elif pipeline.get("translate_to_korean", False):
-            if md_path and os.path.exists(md_path):
-                current_stage += 1
-                write_processing_status(pdf_name, "translating", current_stage, total_stages, "Translating to Korean")
-                print_info(f"Step 2: Translating to Korean...")
-
-                _trans_stage = current_stage
-                _trans_total = total_stages
-                def _translation_progress(sec_idx, sec_total, pct):
-                    write_processing_status(
-                        pdf_name, "translating", _trans_stage, _trans_total,
-                        f"Translating to Korean ({sec_idx}/{sec_total}, {pct:.0f}%)",
-                        sub_progress=pct / 100.0
-                    )
+                print_error(f"Translation error: {e}")
+                results["translation"] = "failed"
 
-                try:
-                    ko_md_path = translate_md_to_korean_openai(
-                        md_path, output_dir, config, prompt,
-                        progress_callback=_translation_progress
-                    )
-                    if ko_md_path:
-                        print_success(f"Translation complete: {ko_md_path}")
-                        results["translation"] = "success"
-                    else:
-                        print_warning(f"Translation failed (English files remain available)")
-                        results["translation"] = "failed"
-                except Exception as e:
-                    print_error(f"Translation error: {e}")
-                    results["translation"] = "failed"
+            record_paper_usage(job["output_dir"], "translate", usage)
+            if results["translation"] == "success":
+                state.done("translate", [job["ko_md_path"]], usage=usage.summary())
             else:
-                print_warning(f"Translation skipped: no markdown available")
-                results["translation"] = "skipped"
+                state.failed("translate", "translation failed")
         else:
+            print_warning(f"Translation skipped: no markdown available")
             results["translation"] = "skipped"
+    else:
+        results["translation"] = "skipped"
+    return job
+
+def _finish_pdf_job(job):
+    """Move the source PDF, clean up duplicates, print the summary and write final status."""
+    pdf_name = job["pdf_name"]
+    output_dir = job["output_dir"]
+    results = job["results"]
+
+    # Step 3: Move processed PDF to output directory
+    print_info(f"Moving source PDF to output directory...")
+    dest_pdf = os.path.join(output_dir, pdf_name)
+    try:
+        import shutil
+        shutil.move(job["pdf_path"], dest_pdf)
+        print_success(f"Moved: {pdf_name} → {output_dir}/")
+    except Exception as e:
+        print_warning(f"Failed to move PDF: {e}")
+
+    # A run with a failed stage stays resumable: dropping the PDF into
+    # newones/ again continues from the first incomplete stage
+    state = job["state"]
+    state.output_dir = output_dir
+    state.data["complete"] = not any(
+        st.get("status") == "failed" for st in state.data["stages"].values()
+    )
+    state.save()
+    if state.data["complete"] and state.data.get("pdf_sha256"):
+        _update_resume_index(os.path.dirname(output_dir) or ".", state.data["pdf_sha256"], None)
 
-        # Step 3: Move processed PDF to output directory
-        print_info(f"Moving source PDF to output directory...")
-        dest_pdf = os.path.join(output_dir, pdf_name)
+    # If this run was identified as duplicate, remove intermediate output folder
+    # to prevent accumulating untranslated duplicate entries in PaperFlow list.
+    if job["duplicate_found"]:
         try:
-            import shutil
-            shutil.move(pdf_path, dest_pdf)
-            print_success(f"Moved: {pdf_name} → {output_dir}/")
+            import shutil as _shutil
+            _shutil.rmtree(output_dir, ignore_errors=True)
+            print_info(f"Duplicate intermediate output removed: {output_dir}")
         except Exception as e:
-            print_warning(f"Failed to move PDF: {e}")
+            print_warning(f"Failed to cleanup duplicate output dir: {e}")
 
-        # If this run was identified as duplicate, remove intermediate output folder
-        # to prevent accumulating untranslated duplicate entries in PaperFlow list.
-        if duplicate_found:
-            try:
-                import shutil as _shutil
-                _shutil.rmtree(output_dir, ignore_errors=True)
-                print_info(f"Duplicate intermediate output removed: {output_dir}")
-            except Exception as e:
-                print_warning(f"Failed to cleanup duplicate output dir: {e}")
+    # Print processing summary
+    print()
+    print_header(f"Processing Summary: {pdf_name}")
+    for step, status in results.items():
+        if status == "success":
+            print_success(f"{step.capitalize()}: Success")
+        elif status == "failed":
+            print_error(f"{step.capitalize()}: Failed")
+        elif isinstance(status, str) and status.startswith("skipped"):
+            print_warning(f"{step.capitalize()}: Skipped")
+
+    # Return True if at least one step succeeded
+    success_count = sum(1 for s in results.values() if s == "success")
+    if success_count > 0:
+        write_processing_status(pdf_name, "complete", job["total_stages"], job["total_stages"], "Complete")
+    else:
+        write_processing_status(pdf_name, "error", job["current_stage"], job["total_stages"], "Error", error="No steps succeeded")
+    return success_count > 0
+
+def _find_source_markdown(paper_dir):
+    """English markdown of an output directory (not the _ko / _explained / partial variants)."""
+    for name in sorted(os.listdir(paper_dir)):
+        if name.endswith(".md") and not name.endswith(("_ko.md", "_explained.md", ".partial.md")):
+            return os.path.join(paper_dir, name)
+    return None
 
-        # Print processing summary
-        print()
-        print_header("Processing Summary")
-        for step, status in results.items():
-            if status == "success":
-                print_success(f"{step.capitalize()}: Success")
-            elif status == "failed":
-                print_error(f"{step.capitalize()}: Failed")
-            elif isinstance(status, str) and status.startswith("skipped"):
-                print_warning(f"{step.capitalize()}: Skipped")
-
-        # Return True if at least one step succeeded
-        success_count = sum(1 for s in results.values() if s == "success")
-        if success_count > 0:
-            write_processing_status(pdf_name, "complete", total_stages, total_stages, "Complete")
-        else:
-            write_processing_status(pdf_name, "error", current_stage, total_stages, "Error", error="No steps succeeded")
-        return success_count > 0
+def retranslate_paper(paper_dir, config, prompt, progress_callback=None):
+    """Re-translate a paper in place after its English markdown was edited.
+
+    Only chunks whose source changed since the last translation are sent to
+    the API (see TranslationSegments); everything else is spliced back from
+    the previous run. The existing _ko.md is kept as a timestamped .bak, the
+    same way the viewer's editor backs up files.
+
+    Returns:
+        Path to the new *_ko.md or None on failure
+    """
+    if not os.path.isdir(paper_dir):
+        print_error(f"Output folder not found: {paper_dir}")
+        return None
+    md_path = _find_source_markdown(paper_dir)
+    if not md_path:
+        print_error(f"No English markdown found in {paper_dir}")
+        return None
+
+    ko_path = md_path[:-3] + "_ko.md"
+    if os.path.exists(ko_path):
+        import shutil
+        backup_path = f"{ko_path[:-3]}.{datetime.now().strftime('%Y%m%d_%H%M%S')}.bak"
+        shutil.copy2(ko_path, backup_path)
+        print_info(f"Backed up previous translation: {os.path.basename(backup_path)}")
+
+    state = PipelineState.load(paper_dir)
+    was_complete = state.data.get("complete", False)
+    model = os.getenv("TRANSLATION_MODEL", "gemini-claude-sonnet-4-5")
+    state.begin("translate", _text_sha256(_file_sha256(md_path), model, prompt))
+
+    usage = LLMUsage()
+    result = translate_md_to_korean_openai(
+        md_path, paper_dir, config, prompt,
+        progress_callback=progress_callback, usage=usage, incremental=True,
+    )
+    record_paper_usage(paper_dir, "retranslate", usage)
+    if result:
+        state.data["complete"] = was_complete
+        state.done("translate", [result], usage=usage.summary(), incremental=True)
+    else:
+        state.failed("translate", "incremental re-translation failed")
+    return result
+
+def process_single_pdf(pdf_path, config, prompt, worker=None):
+    """Process single PDF file with configurable pipeline
+
+    worker: optional ConversionWorker with resident converter models.
+    """
+    pdf_name = os.path.basename(pdf_path)
+    try:
+        job = _start_pdf_job(pdf_path, config)
+        _stage_convert(job, config, worker=worker)
+        _stage_metadata(job, config)
+        _stage_translate(job, config, prompt)
+        return _finish_pdf_job(job)
 
     except Exception as e:
         print_error(f"Processing error: {e}")
@@ -2683,6 +6288,567 @@ def process_single_pdf(pdf_path, config, prompt):
         write_processing_status(pdf_name, "error", 0, 0, "Error", error=str(e))
         return False
 
+##############################################################################
+# Pipeline Scheduler
+# Overlap GPU conversion of one PDF with metadata/translation of the previous
+##############################################################################
+
+_SCHEDULER_STOP = object()
+
+class PipelineScheduler:
+    """Run the per-PDF stages as a pipeline across many PDFs.
+
+    convert → metadata → translate each get their own pool of threads, joined
+    by bounded queues. A full queue blocks the stage feeding it, so the GPU
+    never races more than ``queue_size`` PDFs ahead of the network-bound
+    stages, and backlog throughput approaches the slowest stage instead of the
+    sum of all stages. Every conversion thread owns one ConversionWorker.
+    Because stages of different PDFs share one log, every line printed while
+    a stage runs is prefixed with "[<pdf name>] ".
+
+    on_done(pdf_path, ok) is called from a scheduler thread once a PDF leaves
+    the pipeline (finished, failed, or crashed in a stage).
+    """
+
+    def __init__(self, config, prompt, on_done=None):
+        sched_cfg = config.get("scheduler", {})
+        self.config = config
+        self.prompt = prompt
+        self.on_done = on_done
+        queue_size = max(1, int(sched_cfg.get("queue_size", 2)))
+
+        self._active = 0
+        self._cond = threading.Condition()
+        self.succeeded = 0
+        self.failed = 0
+
+        self._inbox = queue.Queue(maxsize=queue_size)
+        to_metadata = queue.Queue(maxsize=queue_size)
+        to_translate = queue.Queue(maxsize=queue_size)
+        self._stages = [
+            ("convert", max(1, int(sched_cfg.get("convert_workers", 1))), self._inbox, to_metadata, self._run_convert),
+            ("metadata", max(1, int(sched_cfg.get("metadata_workers", 2))), to_metadata, to_translate, self._run_metadata),
+            ("translate", max(1, int(sched_cfg.get("translate_workers", 2))), to_translate, None, self._run_translate),
+        ]
+        self._workers = []
+        self._threads = []
+        for stage, count, inbox, outbox, run in self._stages:
+            threads = []
+            for i in range(count):
+                t = threading.Thread(
+                    target=self._stage_loop, args=(inbox, outbox, run),
+                    name=f"paperflow-{stage}-{i + 1}", daemon=True,
+                )
+                t.start()
+                threads.append(t)
+            self._threads.append(threads)
+        print_info("Pipeline scheduler: " + ", ".join(
+            f"{stage} x{count}" for stage, count, *_ in self._stages) + f" (queue size {queue_size})")
+
+    @property
+    def active(self):
+        """Number of PDFs submitted but not yet finished."""
+        with self._cond:
+            return self._active
+
+    def submit(self, pdf_path):
+        """Queue a PDF; blocks while the conversion stage is saturated."""
+        with self._cond:
+            self._active += 1
+        self._inbox.put({"pdf_path": str(pdf_path)})
+
+    def wait_idle(self, timeout=None):
+        """Block until every submitted PDF has left the pipeline."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._active == 0, timeout)
+
+    def release_workers(self):
+        """Stop resident converter processes while idle; they restart on the next PDF."""
+        released = 0
+        with self._cond:
+            if self._active:
+                return 0
+            for worker in self._workers:
+                if worker.is_running:
+                    worker.close()
+                    released += 1
+        return released
+
+    def close(self):
+        """Drain everything already submitted, then stop all stage threads."""
+        for (_stage, count, inbox, _outbox, _run), threads in zip(self._stages, self._threads):
+            for _ in range(count):
+                inbox.put(_SCHEDULER_STOP)
+            for t in threads:
+                t.join()
+        for worker in self._workers:
+            worker.close()
+        recycled = sum(w.recycle_count for w in self._workers)
+        if recycled:
+            print_info(f"Conversion worker recycled {recycled} time(s)")
+
+    def _stage_loop(self, inbox, outbox, run):
+        local = {}
+        while True:
+            job = inbox.get()
+            if job is _SCHEDULER_STOP:
+                return
+            # Stages of different PDFs share one log; prefix every line with the paper
+            token = _LOG_TAG.set(Path(job["pdf_path"]).stem)
+            try:
+                try:
+                    ok = run(job, local)
+                except Exception as e:
+                    print_error(f"Processing error ({job.get('pdf_name') or job['pdf_path']}): {e}")
+                    import traceback
+                    print_error(traceback.format_exc())
+                    write_processing_status(os.path.basename(job["pdf_path"]), "error", 0, 0, "Error", error=str(e))
+                    self._finish(job, False)
+                    continue
+                if outbox is None:
+                    self._finish(job, ok)
+                else:
+                    outbox.put(job)
+            finally:
+                sys.stdout.flush()
+                _LOG_TAG.reset(token)
+
+    def _finish(self, job, ok):
+        with self._cond:
+            self._active -= 1
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self._cond.notify_all()
+        if self.on_done:
+            try:
+                self.on_done(job["pdf_path"], ok)
+            except Exception as e:
+                print_warning(f"Scheduler on_done callback failed: {e}")
+
+    def _run_convert(self, job, local):
+        worker = local.get("worker")
+        if worker is None:
+            worker = local["worker"] = ConversionWorker(self.config)
+            with self._cond:
+                self._workers.append(worker)
+        job.update(_start_pdf_job(job["pdf_path"], self.config))
+        _stage_convert(job, self.config, worker=worker)
+        return True
+
+    def _run_metadata(self, job, local):
+        _stage_metadata(job, self.config)
+        return True
+
+    def _run_translate(self, job, local):
+        _stage_translate(job, self.config, self.prompt)
+        return _finish_pdf_job(job)
+
+
+def run_pipelined_batch(pdf_paths, config, prompt):
+    """Process a list of PDFs through the PipelineScheduler. Returns (succeeded, failed)."""
+    scheduler = PipelineScheduler(config, prompt)
+    try:
+        for pdf_path in pdf_paths:
+            scheduler.submit(pdf_path)
+    finally:
+        scheduler.close()
+    return scheduler.succeeded, scheduler.failed
+
+##############################################################################
+# Ingest Daemon
+# Watch newones/ with inotify (polling fallback) and process PDFs on arrival
+##############################################################################
+
+class _Inotify:
+    """Minimal ctypes binding for Linux inotify on a single directory."""
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+
+    def __init__(self, path):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        # IN_NONBLOCK / IN_CLOEXEC share their values with O_NONBLOCK / O_CLOEXEC
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {path}")
+        self.fd = fd
+
+    def read_events(self, timeout):
+        """Wait up to timeout seconds; return a list of (mask, name) events."""
+        import select
+        import struct
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        header = struct.calcsize("iIII")
+        while offset + header <= len(data):
+            _wd, mask, _cookie, length = struct.unpack_from("iIII", data, offset)
+            raw_name = data[offset + header:offset + header + length]
+            events.append((mask, os.fsdecode(raw_name.rstrip(b"\0"))))
+            offset += header + length
+        return events
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except Exception:
+            pass
+
+
+class IngestWatcher:
+    """In-memory queue of PDFs in the watch directory that are fully written.
+
+    A file is ready when inotify reports close-write / moved-to, or, with the
+    polling fallback, when its size and mtime stay unchanged for
+    stable_seconds. A periodic rescan also catches events inotify cannot see
+    (e.g. some bind mounts).
+    """
+
+    def __init__(self, watch_dir, stable_seconds=2.0, poll_interval=5.0,
+                 rescan_interval=30.0, use_inotify=True):
+        from collections import deque
+        self.watch_dir = str(watch_dir)
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self._ready = deque()
+        self._queued = set()
+        self._pending = {}    # name -> (signature, first_seen_at)
+        self._attempted = {}  # name -> signature when processing finished
+        self._last_scan = 0.0
+        self._inotify = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(self.watch_dir)
+            except Exception as e:
+                print_warning(f"inotify unavailable, using polling every {poll_interval:.0f}s: {e}")
+        self._scan()
+
+    @property
+    def mode(self):
+        return "inotify" if self._inotify else "polling"
+
+    def _signature(self, name):
+        try:
+            st = os.stat(os.path.join(self.watch_dir, name))
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+    def _enqueue(self, name):
+        if name in self._queued:
+            return
+        sig = self._signature(name)
+        if sig is None or self._attempted.get(name) == sig:
+            return  # gone, or unchanged since a finished attempt
+        self._pending.pop(name, None)
+        self._queued.add(name)
+        self._ready.append(name)
+
+    def _scan(self):
+        """Track every PDF in the directory and promote size-stable ones."""
+        now = time.time()
+        self._last_scan = now
+        try:
+            names = [n for n in os.listdir(self.watch_dir) if n.lower().endswith(".pdf")]
+        except OSError:
+            return
+        present = set(names)
+        for name in list(self._attempted):
+            if name not in present:
+                del self._attempted[name]
+        for name in sorted(names, key=lambda n: (self._signature(n) or (0, 0))[1]):
+            if name in self._queued:
+                continue
+            sig = self._signature(name)
+            if sig is None or self._attempted.get(name) == sig:
+                continue
+            prev = self._pending.get(name)
+            if prev is None or prev[0] != sig:
+                self._pending[name] = (sig, now)
+            elif now - prev[1] >= self.stable_seconds:
+                self._enqueue(name)
+
+    def next_ready(self, timeout=1.0):
+        """Return the next ready PDF name, or None if nothing became ready."""
+        if self._ready:
+            return self._ready.popleft()
+
+        if self._inotify:
+            wait = timeout
+            if self._pending:
+                wait = min(wait, self.stable_seconds)
+            for mask, name in self._inotify.read_events(wait):
+                if mask & _Inotify.IN_Q_OVERFLOW:
+                    self._scan()
+                elif name.lower().endswith(".pdf"):
+                    if mask & (_Inotify.IN_CLOSE_WRITE | _Inotify.IN_MOVED_TO):
+                        self._enqueue(name)
+                    else:
+                        self._pending.setdefault(name, (self._signature(name), time.time()))
+            due = self.rescan_interval
+        else:
+            time.sleep(timeout)
+            due = self.poll_interval
+
+        if self._pending or time.time() - self._last_scan >= due:
+            self._scan()
+        return self._ready.popleft() if self._ready else None
+
+    def mark_done(self, name):
+        """Forget a processed file; a leftover copy is retried only if it changes."""
+        self._queued.discard(name)
+        sig = self._signature(name)
+        if sig is not None:
+            self._attempted[name] = sig
+
+    def has_pending(self):
+        return bool(self._ready or self._pending)
+
+    def close(self):
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+
+##############################################################################
+# Background Jobs
+# Viewer-triggered work (e.g. incremental re-translation) run by the daemon
+##############################################################################
+
+JOBS_DIR_NAME = ".jobs"
+
+class JobRunner:
+    """Background thread running the job files the viewer drops into <watch_dir>/.jobs/.
+
+    A job is a JSON file {"id", "type", "paper", "status": "queued", ...}.
+    The runner rewrites it in place with status "running" / "done" / "failed",
+    progress and a message, so the viewer can poll it. Finished jobs are
+    removed after keep_days. Supported types: "retranslate".
+    """
+
+    def __init__(self, jobs_dir, config, prompt, poll_interval=3.0, keep_days=7):
+        self.jobs_dir = str(jobs_dir)
+        self.config = config
+        self.prompt = prompt
+        self.poll_interval = poll_interval
+        self.keep_seconds = keep_days * 86400
+        self._stop = threading.Event()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._loop, name="paperflow-jobs", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop polling; a job already running is finished first."""
+        self._stop.set()
+        self._thread.join()
+
+    def _jobs(self):
+        jobs = []
+        for name in sorted(os.listdir(self.jobs_dir)):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.jobs_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    jobs.append((path, json.load(f)))
+            except Exception:
+                continue  # partially written or removed meanwhile
+        return jobs
+
+    def _update(self, path, job, **fields):
+        job.update(fields, updated_at=datetime.now().isoformat())
+        try:
+            _write_json_atomic(path, job)
+        except Exception as e:
+            print_warning(f"Failed to update job {job.get('id')}: {e}")
+
+    def _loop(self):
+        # Jobs interrupted by a restart are queued again
+        for path, job in self._jobs():
+            if job.get("status") == "running":
+                self._update(path, job, status="queued", message="Requeued after restart")
+        while not self._stop.wait(self.poll_interval):
+            for path, job in self._jobs():
+                if self._stop.is_set():
+                    break
+                if job.get("status") == "queued":
+                    self._run(path, job)
+                elif job.get("status") in ("done", "failed") and self.keep_seconds:
+                    try:
+                        if time.time() - os.path.getmtime(path) > self.keep_seconds:
+                            os.remove(path)
+                    except OSError:
+                        pass
+
+    def _run(self, path, job):
+        job_type = job.get("type")
+        paper = job.get("paper") or ""
+        paper_dir = os.path.join("outputs", paper)
+        if job_type != "retranslate":
+            self._update(path, job, status="failed", message=f"Unknown job type: {job_type}")
+            return
+        # Only a direct child of outputs/ ("..", "a/../.." or a symlink out are refused)
+        if (paper in ("", ".", "..")
+                or os.path.dirname(os.path.realpath(paper_dir)) != os.path.realpath("outputs")
+                or not os.path.isdir(paper_dir)):
+            self._update(path, job, status="failed", message=f"Paper not found: {paper}")
+            return
+
+        print_header(f"Job {job.get('id')}: re-translate {paper}")
+        self._update(path, job, status="running", progress=0.0, message="Translating changed chunks",
+                     started_at=datetime.now().isoformat())
+
+        def _progress(sec_idx, sec_total, pct):
+            self._update(path, job, progress=round(pct / 100.0, 3),
+                         message=f"Translating ({sec_idx}/{sec_total}, {pct:.0f}%)")
+
+        try:
+            result = retranslate_paper(paper_dir, self.config, self.prompt, progress_callback=_progress)
+        except Exception as e:
+            print_error(f"Job {job.get('id')} failed: {e}")
+            result = None
+            error = str(e)
+        else:
+            error = None if result else "Translation failed, see the converter log"
+
+        if result:
+            state = PipelineState.load(paper_dir)
+            usage = state.stage("translate").get("usage", {})
+            self._update(path, job, status="done", progress=1.0,
+                         message=f"Re-translated ({usage.get('requests', 0)} API request(s))",
+                         finished_at=datetime.now().isoformat(), usage=usage)
+            print_success(f"Job {job.get('id')} done")
+        else:
+            self._update(path, job, status="failed", message=error,
+                         finished_at=datetime.now().isoformat())
+
+
+def run_ingest_daemon(config, prompt, log_dir="logs"):
+    """Long-running ingest loop: one process owns watching, queueing and conversion.
+
+    With the pipeline scheduler enabled, PDFs are submitted as soon as they
+    are ready and overlap across stages; a new paperflow_*.log is started
+    whenever work resumes after the pipeline was idle, and its lines carry a
+    "[<pdf name>] " prefix so each paper can be followed. Sequential mode gives
+    each PDF its own log so the viewer's "latest log" keeps showing the file
+    currently being processed. Viewer jobs in <watch_dir>/.jobs/ run on a
+    separate JobRunner thread.
+    """
+    import signal
+
+    ingest_cfg = config.get("ingest", {})
+    watch_dir = ingest_cfg.get("watch_dir", "newones")
+    os.makedirs(watch_dir, exist_ok=True)
+    watcher = IngestWatcher(
+        watch_dir,
+        stable_seconds=float(ingest_cfg.get("stable_seconds", 2.0)),
+        poll_interval=float(ingest_cfg.get("poll_interval_seconds", 5.0)),
+        rescan_interval=float(ingest_cfg.get("rescan_interval_seconds", 30.0)),
+        use_inotify=ingest_cfg.get("use_inotify", True),
+    )
+    idle_release = float(config.get("converter", {}).get("worker", {}).get("idle_release_seconds", 300))
+    jobs = JobRunner(os.path.join(watch_dir, JOBS_DIR_NAME), config, prompt)
+
+    # (pdf_path, ok) from finished PDFs; the watcher is only touched from this thread
+    finished = queue.SimpleQueue()
+    scheduler = None
+    worker = None
+    if config.get("scheduler", {}).get("enabled", True):
+        scheduler = PipelineScheduler(config, prompt, on_done=lambda path, ok: finished.put((path, ok)))
+    else:
+        worker = ConversionWorker(config)
+
+    stop = {"requested": False}
+
+    def _request_stop(signum, _frame):
+        if not stop["requested"]:
+            print_info(f"Signal {signum} received, stopping after the PDFs in progress...")
+        stop["requested"] = True
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+
+    print_success(f"Ingest daemon watching '{watch_dir}' ({watcher.mode})")
+    write_processing_status(None, "idle", 0, 0, "Idle")
+
+    processed = 0
+    last_activity = time.time()
+    try:
+        while not stop["requested"]:
+            drained = False
+            while not finished.empty():
+                path, ok = finished.get()
+                name = os.path.basename(path)
+                processed += 1
+                drained = True
+                watcher.mark_done(name)
+                print_info(f"{name}: {'done' if ok else 'failed'} ({processed} processed this session)")
+            if drained:
+                last_activity = time.time()
+                if (scheduler is None or scheduler.active == 0) and not watcher.has_pending():
+                    write_processing_status(None, "idle", 0, 0, "Idle")
+                    print_info(f"Queue empty, watching '{watch_dir}'...")
+
+            name = watcher.next_ready(timeout=1.0)
+            if name is None:
+                if time.time() - last_activity > idle_release:
+                    if scheduler is not None:
+                        released = scheduler.release_workers()
+                    else:
+                        released = worker.is_running
+                        worker.close()
+                    if released:
+                        print_info(f"Idle for {idle_release:.0f}s, releasing conversion worker")
+                continue
+
+            pdf_path = os.path.join(watch_dir, name)
+            if not os.path.isfile(pdf_path):
+                watcher.mark_done(name)
+                continue
+
+            last_activity = time.time()
+            if scheduler is None or scheduler.active == 0:
+                _attach_log_file(Path(log_dir) / f"paperflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+                print_header("PaperFlow - Ingest Daemon")
+            if scheduler is not None:
+                scheduler.submit(pdf_path)
+                continue
+            try:
+                ok = process_single_pdf(pdf_path, config, prompt, worker=worker)
+            except Exception as e:
+                print_error(f"Unhandled processing error for {name}: {e}")
+                ok = False
+            finished.put((pdf_path, ok))
+    finally:
+        if scheduler is not None:
+            scheduler.close()
+            processed = scheduler.succeeded + scheduler.failed
+        else:
+            worker.close()
+        jobs.close()
+        watcher.close()
+        write_processing_status(None, "idle", 0, 0, "Idle")
+        print_success(f"Ingest daemon stopped ({processed} PDF(s) processed)")
+    return 0
+
+
 def check_services(config):
     """Check if external services are reachable"""
     print_info("Checking dependencies...")
@@ -2707,27 +6873,31 @@ def check_services(config):
 
 def main():
     """Main function"""
+    import argparse
+    parser = argparse.ArgumentParser(description="PaperFlow - PDF to Markdown/Korean pipeline")
+    parser.add_argument(
+        "--worker", action="store_true",
+        help="Process every queued PDF with resident converter models (pipelined when scheduler.enabled)"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Run as a daemon: watch newones/ and process PDFs as soon as they are fully written"
+    )
+    parser.add_argument(
+        "--retranslate", metavar="PAPER_DIR",
+        help="Incrementally re-translate an output folder after its English markdown was edited"
+    )
+    args = parser.parse_args()
+
     # Setup logging to file
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     log_file = log_dir / f"paperflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 
     # Redirect stdout to both console and file
-    import sys
-    class TeeOutput:
-        def __init__(self, *files):
-            self.files = files
-        def write(self, data):
-            for f in self.files:
-                f.write(data)
-                f.flush()
-        def flush(self):
-            for f in self.files:
-                f.flush()
-
     log_handle = open(log_file, 'w', encoding='utf-8')
     original_stdout = sys.stdout
-    sys.stdout = TeeOutput(original_stdout, log_handle)
+    sys.stdout = TeeOutput(original_stdout, log_handle, log_path=str(log_file))
 
     print_header("PaperFlow - PDF to Markdown/HTML Converter")
     print_info(f"Log file: {log_file}")
@@ -2745,6 +6915,24 @@ def main():
 
     print()
 
+    if args.retranslate:
+        try:
+            paper_dir = args.retranslate
+            if not os.path.isdir(paper_dir) and os.path.isdir(os.path.join("outputs", paper_dir)):
+                paper_dir = os.path.join("outputs", paper_dir)
+            ok = retranslate_paper(paper_dir, config, prompt) is not None
+            return 0 if ok else 1
+        finally:
+            sys.stdout.flush()
+            sys.stdout = original_stdout
+
+    if args.watch:
+        try:
+            return run_ingest_daemon(config, prompt, log_dir=str(log_dir))
+        finally:
+            sys.stdout.flush()
+            sys.stdout = original_stdout
+
     # Check for PDF files in newones directory
     newones_dir = Path("newones")
     if not newones_dir.exists():
@@ -2760,13 +6948,40 @@ def main():
 
     print_info(f"Found {len(pdf_files)} PDF file(s) to process")
 
-    # Process only the first PDF to avoid CUDA context pollution
-    # Watch mode script will call this program multiple times for multiple PDFs
     success_count = 0
     fail_count = 0
 
-    # Process first PDF only
-    if pdf_files:
+    if args.worker and config.get("scheduler", {}).get("enabled", True):
+        # Pipelined worker mode: the next PDF converts while earlier ones are
+        # in metadata extraction / translation
+        pending = sorted(newones_dir.glob("*.pdf"), key=lambda p: p.stat().st_mtime)
+        success_count, fail_count = run_pipelined_batch([str(p) for p in pending], config, prompt)
+    elif args.worker:
+        # Resident worker mode: models are loaded once in a child process that
+        # is recycled per converter.worker policy, so the queue is drained here
+        worker = ConversionWorker(config)
+        attempted = set()
+        try:
+            while True:
+                pending = sorted(
+                    (p for p in newones_dir.glob("*.pdf") if p.name not in attempted),
+                    key=lambda p: p.stat().st_mtime,
+                )
+                if not pending:
+                    break
+                pdf_path = pending[0]
+                attempted.add(pdf_path.name)
+                if process_single_pdf(str(pdf_path), config, prompt, worker=worker):
+                    success_count += 1
+                else:
+                    fail_count += 1
+        finally:
+            worker.close()
+        if worker.recycle_count:
+            print_info(f"Conversion worker recycled {worker.recycle_count} time(s)")
+    elif pdf_files:
+        # Process only the first PDF to avoid CUDA context pollution
+        # Watch mode script will call this program multiple times for multiple PDFs
         pdf_path = pdf_files[0]
         if process_single_pdf(str(pdf_path), config, prompt):
             success_count += 1
@@ -2,8 +2,16 @@
 
 # PaperFlow Watch Mode - Continuous PDF Processing
 # This script continuously monitors the newones directory and processes PDFs as they arrive
-
-WATCH_INTERVAL=5  # Check every 5 seconds
+#
+# By default it hands over to the Python ingest daemon (main_terminal.py --watch),
+# which watches newones/ with inotify and keeps converter models resident.
+# Set PAPERFLOW_LEGACY_WATCH=1 to use the bash polling loop below instead.
+
+LEGACY_WATCH=${PAPERFLOW_LEGACY_WATCH:-0}
+WATCH_INTERVAL=5  # Legacy loop: check every 5 seconds
+# 1 = drain the queue in one Python process with resident converter models
+#     (recycled per converter.worker in config.json); 0 = one process per PDF
+WORKER_MODE=${PAPERFLOW_WORKER_MODE:-1}
 NEWONES_DIR="newones"
 OUTPUTS_DIR="outputs"
 LOGS_DIR="logs"
@@ -68,6 +76,12 @@ mkdir -p "$NEWONES_DIR"
 mkdir -p "$OUTPUTS_DIR"
 mkdir -p "$LOGS_DIR"
 
+if [ "$LEGACY_WATCH" != "1" ]; then
+    log_info "Starting ingest daemon (settings: \"ingest\" in config.json)"
+    # exec: the daemon receives SIGTERM/SIGINT directly and stops after the current PDF
+    exec .venv/bin/python main_terminal.py --watch
+fi
+
 log_info "Watching directory: $NEWONES_DIR"
 log_info "Check interval: ${WATCH_INTERVAL}s"
 log_info "Press Ctrl+C to stop"
@@ -91,6 +105,20 @@ while true; do
         log_success "Found $pdf_count PDF file(s) - starting processing"
         echo ""
 
+        if [ "$WORKER_MODE" = "1" ]; then
+            log_info "Processing queue with resident conversion worker"
+            .venv/bin/python main_terminal.py --worker &
+            processing_pid=$!
+            wait $processing_pid
+            processing_status=$?
+            processing_pid=""
+            if [ $processing_status -eq 0 ]; then
+                log_success "Queue drained"
+            else
+                log_error "Worker run failed (exit code: $processing_status)"
+            fi
+            echo ""
+        else
         # Process each PDF in a separate Python process to avoid CUDA context pollution
         echo "$pdf_files" | while read -r pdf_file; do
             if [ -n "$pdf_file" ] && [ -f "$pdf_file" ]; then
@@ -109,6 +137,7 @@ while true; do
                 echo ""
             fi
         done
+        fi
 
         echo ""
         log_success "All PDFs processed"
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """Backfill doc_type metadata for existing papers.
 
-Uses a manually curated mapping (no AI calls) for accuracy.
+Uses a manually curated mapping (no AI calls) for accuracy. Runs as the
+backfill-doc-type task of scripts/maint.py, which reads DOC_TYPE_MAP from
+this file; editing the map makes the next run revisit every paper.
 
 Usage:
     python scripts/backfill_doc_type.py          # dry-run (show classifications)
@@ -9,8 +11,6 @@ Usage:
 """
 import sys
 import os
-import json
-import argparse
 
 VALID_DOC_TYPES = {"paper", "report", "blog", "news", "essay", "other"}
 
@@ -69,59 +69,7 @@ DOC_TYPE_MAP = {
 }
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Backfill doc_type for existing papers")
-    parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry-run)")
-    args = parser.parse_args()
-
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-    updated = 0
-    skipped = 0
-    missing = 0
-    unmapped = 0
-
-    for search_dir_name in ("outputs", "archives"):
-        search_dir = os.path.join(base_dir, search_dir_name)
-        if not os.path.isdir(search_dir):
-            continue
-        for folder_name in sorted(os.listdir(search_dir)):
-            folder_path = os.path.join(search_dir, folder_name)
-            if not os.path.isdir(folder_path):
-                continue
-            meta_path = os.path.join(folder_path, "paper_meta.json")
-            if not os.path.isfile(meta_path):
-                missing += 1
-                continue
-            try:
-                with open(meta_path, "r", encoding="utf-8") as f:
-                    meta = json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"  [ERROR ] {search_dir_name}/{folder_name} — {e}")
-                continue
-
-            if meta.get("doc_type"):
-                skipped += 1
-                continue
-
-            doc_type = DOC_TYPE_MAP.get(folder_name)
-            if not doc_type:
-                unmapped += 1
-                print(f"  [NOMAP ] {search_dir_name}/{folder_name}")
-                continue
-
-            print(f"  [{doc_type:6s}] {search_dir_name}/{folder_name}")
-            updated += 1
-
-            if args.apply:
-                meta["doc_type"] = doc_type
-                with open(meta_path, "w", encoding="utf-8") as f:
-                    json.dump(meta, f, ensure_ascii=False, indent=2)
-
-    print(f"\nDone: {updated} updated, {skipped} already set, {unmapped} unmapped, {missing} no meta.")
-    if not args.apply and updated > 0:
-        print("Run with --apply to save changes.")
-
-
 if __name__ == "__main__":
-    main()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from maint import main
+    raise SystemExit(main(["backfill-doc-type"] + sys.argv[1:]))
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Benchmark and golden check for the OCR cleanup passes.
+
+Compares clean_ocr_artifacts / clean_ocr_math from main_terminal.py with the
+original per-line / per-rule implementations kept below as the reference.
+The output of both must be byte-identical; any difference is printed and the
+script exits with status 1.
+
+Inputs are a synthetic report (default 500 pages of prose, page furniture,
+hyphenation and marker-style spaced LaTeX) plus any markdown files given with
+--input, e.g. the converted papers in outputs/.
+
+Usage:
+    python scripts/bench_ocr_cleanup.py                       # 500 pages, 5 repeats
+    python scripts/bench_ocr_cleanup.py --pages 2000 --repeat 3
+    python scripts/bench_ocr_cleanup.py --input outputs/*/*.md
+    python scripts/bench_ocr_cleanup.py --check-only          # golden check, no timing
+"""
+import sys
+import os
+import re
+import glob
+import random
+import argparse
+import time
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+from main_terminal import clean_ocr_artifacts, clean_ocr_math
+
+
+# ── Reference implementations (before the fused passes) ─────────────────────
+
+def reference_clean_ocr_artifacts(text):
+    """Clean common OCR artifacts from marker-pdf output."""
+    lines = text.split('\n')
+    cleaned = []
+
+    for line in lines:
+        stripped = line.strip()
+        # Skip standalone page numbers
+        if re.match(r'^[-–—]?\s*\d{1,4}\s*[-–—]?$', stripped):
+            continue
+        # Skip "Page N" / "Page N of M"
+        if re.match(r'^Page\s+\d+(\s+of\s+\d+)?$', stripped, re.IGNORECASE):
+            continue
+        # Skip copyright lines
+        if re.match(r'^[©®]\s*\d{4}', stripped):
+            continue
+        # Skip standalone DOI
+        if re.match(r'^(DOI|doi)\s*:\s*10\.', stripped):
+            continue
+        cleaned.append(line)
+
+    text = '\n'.join(cleaned)
+
+    # Fix hyphenation across lines: "compu-\nter" → "computer"
+    text = re.sub(r'(\w)-\n(\w)', r'\1\2', text)
+
+    # Fix marker-pdf author code block bug: ``` wrapping <sup> tags
+    # Use [^\n]* instead of .*? with DOTALL to prevent catastrophic backtracking
+    text = re.sub(
+        r'```\n((?:[^\n]*<sup>[^\n]*</sup>[^\n]*\n)+)```',
+        r'\1',
+        text
+    )
+
+    return text
+
+
+def reference_clean_ocr_math(text):
+    """Clean common OCR math formula artifacts from marker-pdf output.
+
+    Fixes excessive spacing in LaTeX commands that marker-pdf introduces:
+    - \\mathrm { A P I } → \\mathrm{API}
+    - \\begin{array} { c } → \\begin{array}{c}
+    - a _ { c } → a_{c}
+    - \\mathrm { m i n } → \\min
+    """
+
+    # 1. Fix spaced-out single characters in text-mode commands:
+    #    \mathrm { A P I } → \mathrm{API}
+    #    \mathbf { e } → \mathbf{e}
+    #    \mathtt { A P I } → \mathtt{API}
+    #    \text { s o m e } → \text{some}
+    def _collapse_spaced_chars(m):
+        cmd = m.group(1)  # e.g., "mathrm", "mathbf"
+        inner = m.group(2)  # e.g., "A P I" or "e"
+        collapsed = inner.replace(' ', '')
+        return f'\\{cmd}{{{collapsed}}}'
+
+    text = re.sub(
+        r'\\(mathrm|mathbf|mathtt|mathcal|mathbb|mathfrak|text|textbf|textit|tt|bf|it)\s*\{\s*'
+        r'((?:[A-Za-z0-9]\s+)*[A-Za-z0-9])\s*\}',
+        _collapse_spaced_chars,
+        text
+    )
+
+    # 2. Fix known math operators misrendered as \mathrm{...}:
+    #    \mathrm{min} → \min, \mathrm{max} → \max, etc.
+    _MATH_OPS = {
+        'min': '\\min', 'max': '\\max', 'log': '\\log', 'exp': '\\exp',
+        'sin': '\\sin', 'cos': '\\cos', 'tan': '\\tan',
+        'lim': '\\lim', 'sup': '\\sup', 'inf': '\\inf',
+        'arg': '\\arg', 'det': '\\det', 'dim': '\\dim',
+        'gcd': '\\gcd', 'deg': '\\deg', 'ker': '\\ker',
+    }
+    for word, replacement in _MATH_OPS.items():
+        text = re.sub(
+            rf'\\mathrm\{{{word}\}}',
+            lambda _, r=replacement: r,
+            text
+        )
+
+    # 3. Fix spaced subscript/superscript braces:
+    #    a _ { c } → a_{c}
+    #    x ^ { 2 } → x^{2}
+    text = re.sub(
+        r'([A-Za-z0-9\}\\])\s*([_^])\s*\{\s*([^}]*?)\s*\}',
+        lambda m: f'{m.group(1)}{m.group(2)}{{{m.group(3).strip()}}}',
+        text
+    )
+
+    # 4. Fix \begin{env} { args } → \begin{env}{args}
+    text = re.sub(
+        r'(\\begin\{[^}]+\})\s*\{\s*([^}]*?)\s*\}',
+        lambda m: f'{m.group(1)}{{{m.group(2).strip()}}}',
+        text
+    )
+
+    # 5. Fix \end{env} } → \end{env}  (trailing stray braces)
+    text = re.sub(
+        r'(\\end\{[^}]+\})\s*\}',
+        r'\1',
+        text
+    )
+
+    return text
+
+
+# ── Inputs ──────────────────────────────────────────────────────────────────
+
+_WORDS = ("the model attention layer token sequence training loss gradient batch "
+          "representation encoder decoder benchmark evaluation dataset performance "
+          "parameter inference latency throughput memory distributed").split()
+
+_MATH = [
+    r"$\mathrm { A P I }$", r"$\mathbf { x } _ { i } ^ { 2 }$", r"$\mathrm{max} _ { j } \mathrm{log} p$",
+    r"$$\begin{array} { c c } a & b \end{array} }$$", r"$\text { s o f t m a x } ( z )$",
+    r"$x_{i}^{2} + \min_{k} y_{k}$", r"$\mathcal { L } = \sum _ { t } \ell _ { t }$",
+    r"$\mathrm{exp} ( x ) / \mathrm{ker} A$",
+]
+
+
+def _sentence(rng):
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 20))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), rng.choice(_MATH))
+    return " ".join(words).capitalize() + "."
+
+
+def synthetic_report(pages, seed=0):
+    """Markdown resembling a long converted report, with the artifacts the passes remove."""
+    rng = random.Random(seed)
+    out = ["# Technical Report", ""]
+    for page in range(1, pages + 1):
+        if page % 12 == 1:
+            out += [f"## {page // 12 + 1}. {rng.choice(_WORDS).capitalize()} Analysis", ""]
+        for _ in range(rng.randint(3, 5)):
+            para = " ".join(_sentence(rng) for _ in range(rng.randint(3, 6)))
+            if rng.random() < 0.2:
+                cut = para.rfind(" ", 0, len(para) // 2)
+                para = para[:cut] + " compu-\nter" + para[cut:]
+            out += [para, ""]
+        if page % 7 == 0:
+            out += ["| Metric | Value |", "| --- | --- |", "| acc | 0.91 |", ""]
+        if page % 50 == 0:
+            out += ["```", "A. Author<sup>1</sup>, B. Author<sup>2</sup>", "```", ""]
+        out.append(rng.choice([f"{page}", f" - {page} - ", f"Page {page} of {pages}",
+                               f"PAGE {page}", f" {page} "]))
+        if page % 25 == 0:
+            out += ["© 2024 The Authors", "DOI: 10.1000/xyz.123"]
+        out.append("")
+    return "\n".join(out)
+
+
+# Edge cases around line boundaries and whitespace that the single-regex line
+# filter has to reproduce exactly.
+EDGE_CASES = [
+    "", "\n", "5", "5\n", "\n5", "a\n5", "5\na", "a\n5\n6", "a\n\n5\n\nb", "12345\n1234",
+    "Page 3", "page 3 of 10", "Page3", "  Page  3  OF  4 \r", "– 12 –", "—12", "-\n1",
+    "　 7 　\nx", "7\x85\ny", "x\n\t 42\t", "©2024 Foo", "® 1999", "© 99",
+    "DOI: 10.1/x", "doi:10.2", "Doi: 10.3", " DOI :10.4 rest", "co-\nop", "a-\n b",
+    "```\nX<sup>1</sup>\n```", "```\nplain\n```", r"\mathrm { m i n }", r"a _ { b _ { c } }",
+    r"\begin{array} { c } x \end{array} }", r"\end{x}}", r"\mathrm{sup}\mathrm{inf}",
+    r"x ^{2}", r"x^ {2}", r"x^{ 2}", r"x^{2 }", r"x^{a b}", r"\it {a}", r"\tt{ a }", r"\bf{a b}",
+]
+
+
+def fuzz_cases(count, seed=1):
+    """Short random strings over the characters the patterns care about."""
+    rng = random.Random(seed)
+    alphabet = ["a", "Z", "7", "_", "^", "{", "}", " ", "\n", "\t", "-", "\\", "\u3000",
+                "\\mathrm", "\\it", "\\begin{x}", "\\end{y}", "min", "Page", "of",
+                "©", "DOI:", "10.", "–", "<sup>", "</sup>", "```"]
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 40))) for _ in range(count)]
+
+
+# ── Runner ──────────────────────────────────────────────────────────────────
+
+def _reference(text):
+    return reference_clean_ocr_math(reference_clean_ocr_artifacts(text))
+
+
+def _fused(text):
+    return clean_ocr_math(clean_ocr_artifacts(text))
+
+
+def _best_of(func, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def golden_check(inputs):
+    """Return the labels of inputs where the fused passes differ from the reference."""
+    failures = []
+    for label, text in inputs:
+        for name, ref, new in [("artifacts", reference_clean_ocr_artifacts, clean_ocr_artifacts),
+                               ("math", reference_clean_ocr_math, clean_ocr_math),
+                               ("pipeline", _reference, _fused)]:
+            expected, actual = ref(text), new(text)
+            if expected != actual:
+                failures.append(f"{label} [{name}]")
+                break
+        else:
+            # The translation step cleans the converted file a second time
+            once = _reference(text)
+            if reference_clean_ocr_math(once) != clean_ocr_math(once):
+                failures.append(f"{label} [second pass]")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and golden check for the OCR cleanup passes")
+    parser.add_argument("--pages", type=int, default=500, help="Pages in the synthetic report (default: 500)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats, best run is reported (default: 5)")
+    parser.add_argument("--input", nargs="*", default=[], help="Markdown files or globs to include")
+    parser.add_argument("--fuzz", type=int, default=5000, help="Random strings in the golden check (default: 5000)")
+    parser.add_argument("--check-only", action="store_true", help="Only run the golden check")
+    args = parser.parse_args()
+
+    report = synthetic_report(args.pages)
+    inputs = [(f"synthetic ({args.pages} pages)", report)]
+    inputs += [(f"edge case {i}: {case!r}", case) for i, case in enumerate(EDGE_CASES)]
+    inputs += [(f"fuzz case {i}: {case!r}", case) for i, case in enumerate(fuzz_cases(args.fuzz))]
+    for pattern in args.input:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            with open(path, "r", encoding="utf-8") as f:
+                inputs.append((path, f.read()))
+
+    failures = golden_check(inputs)
+    if failures:
+        print(f"Golden check FAILED for {len(failures)} input(s):")
+        for label in failures:
+            print(f"  {label}")
+        return 1
+    print(f"Golden check passed: {len(inputs)} inputs byte-identical")
+    if args.check_only:
+        return 0
+
+    corpus = [(label, text) for label, text in inputs if len(text) > 1000]
+    print(f"\n{'input':<40} {'size':>9} {'reference':>11} {'fused':>9} {'speedup':>8}")
+    for label, text in corpus:
+        cleaned = _reference(text)
+        rows = [
+            ("first pass", _best_of(_reference, text, args.repeat), _best_of(_fused, text, args.repeat)),
+            ("second clean_ocr_math", _best_of(reference_clean_ocr_math, cleaned, args.repeat),
+             _best_of(clean_ocr_math, cleaned, args.repeat)),
+        ]
+        for stage, ref_t, new_t in rows:
+            name = f"{os.path.basename(label)[:24]} {stage}"
+            print(f"{name:<40} {len(text) / 1024:>7.0f}KB {ref_t * 1000:>9.1f}ms "
+                  f"{new_t * 1000:>7.1f}ms {ref_t / max(new_t, 1e-9):>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Inspect and prune the PDF conversion cache.
+
+The cache location and size limit come from the "conversion_cache" section
+of config.json (default ~/.cache/paperflow/conversions, 20 GB).
+
+Usage:
+    python scripts/conversion_cache.py stats
+    python scripts/conversion_cache.py list
+    python scripts/conversion_cache.py prune                      # dry-run, enforce max_size_gb
+    python scripts/conversion_cache.py prune --max-size-gb 5 --apply
+    python scripts/conversion_cache.py prune --older-than-days 90 --apply
+    python scripts/conversion_cache.py clear --apply
+"""
+import sys
+import os
+import argparse
+from datetime import datetime
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+os.chdir(BASE)  # load_config() reads config.json from the working directory
+from main_terminal import ConversionCache, load_config
+
+
+def _fmt_size(num_bytes):
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    for unit in ("KB", "MB", "GB"):
+        num_bytes /= 1024
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}"
+
+
+def _fmt_time(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M") if ts else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and prune the PDF conversion cache")
+    parser.add_argument("command", choices=["stats", "list", "prune", "clear"])
+    parser.add_argument("--dir", help="Cache directory (default: from config.json)")
+    parser.add_argument("--max-size-gb", type=float, help="Size limit for prune (default: config max_size_gb)")
+    parser.add_argument("--older-than-days", type=float, help="prune: also evict entries unused for this many days")
+    parser.add_argument("--apply", action="store_true", help="prune/clear: actually delete (default is dry-run)")
+    args = parser.parse_args()
+
+    cache_cfg = load_config().get("conversion_cache", {})
+    cache = ConversionCache(args.dir or cache_cfg.get("dir"), cache_cfg.get("max_size_gb", 20.0))
+    entries = sorted(cache.entries(), key=lambda e: e[1].get("last_used", 0), reverse=True)
+
+    if args.command == "stats":
+        total = sum(m.get("size_bytes", 0) for _, m in entries)
+        hits = sum(m.get("hits", 0) for _, m in entries)
+        print(f"Cache dir:  {cache.root}")
+        print(f"Entries:    {len(entries)}")
+        print(f"Size:       {_fmt_size(total)} / {_fmt_size(cache.max_bytes)}")
+        print(f"Total hits: {hits}")
+        engines = {}
+        for _, m in entries:
+            label = f"{m.get('engine', '?')} {m.get('engine_version') or ''}".strip()
+            engines[label] = engines.get(label, 0) + 1
+        for label, count in sorted(engines.items()):
+            print(f"  {label}: {count}")
+        return 0
+
+    if args.command == "list":
+        for _, m in entries:
+            print(f"{m.get('key', '')[:12]}  {_fmt_size(m.get('size_bytes', 0)):>9}  "
+                  f"hits={m.get('hits', 0):<3} last={_fmt_time(m.get('last_used'))}  "
+                  f"{m.get('engine', '?')}  {m.get('pdf_name', '')}")
+        print(f"\n{len(entries)} entr{'y' if len(entries) == 1 else 'ies'}")
+        return 0
+
+    if args.command == "prune":
+        max_bytes = int(args.max_size_gb * 1024 ** 3) if args.max_size_gb is not None else None
+        older = args.older_than_days * 86400 if args.older_than_days is not None else None
+        evicted = cache.prune(max_bytes=max_bytes, older_than_seconds=older, dry_run=not args.apply)
+    else:
+        evicted = cache.prune(max_bytes=0, dry_run=not args.apply)
+
+    freed = sum(m.get("size_bytes", 0) for m in evicted)
+    for m in evicted:
+        print(f"  {'Evicted' if args.apply else 'Would evict'}: {m.get('key', '')[:12]}  {m.get('pdf_name', '')}")
+    mode = "Evicted" if args.apply else "Would evict"
+    print(f"\n{mode} {len(evicted)} entr{'y' if len(evicted) == 1 else 'ies'} ({_fmt_size(freed)}).")
+    if not args.apply and evicted:
+        print("Run with --apply to delete.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""Run a maintenance task over every paper folder with a process pool.
+
+A task maps one paper folder (outputs/<name>, archives/<name>) to a status
+and, with --apply, rewrites files in it. A per-task ledger in .maint/<task>.json
+records the inputs each paper had when the task last found nothing left to do
+there (mtime, size and SHA-256 per file), so a rerun only visits papers whose
+inputs changed since. The ledger is saved every few seconds: an interrupted
+run continues where it stopped. Changing a task's code or data (its version)
+invalidates its ledger; --force ignores it.
+
+Tasks:
+    fix-ocr-math        apply clean_ocr_math() to the markdown files
+    backfill-doc-type   set doc_type in paper_meta.json from DOC_TYPE_MAP
+                        (scripts/backfill_doc_type.py)
+    markdown-index      write markdown_index.json for papers converted before it
+
+Usage:
+    python scripts/maint.py fix-ocr-math                  # dry-run (show what would change)
+    python scripts/maint.py fix-ocr-math --apply          # actually apply fixes
+    python scripts/maint.py backfill-doc-type --apply --jobs 4
+    python scripts/maint.py markdown-index --apply --force
+"""
+import sys
+import os
+import json
+import time
+import signal
+import hashlib
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+LEDGER_DIR = os.path.join(BASE, ".maint")
+SEARCH_DIRS = ("outputs", "archives")
+CHECKPOINT_INTERVAL = 5.0
+PROGRESS_INTERVAL = 2.0
+
+
+def _markdown_files(paper_dir, recursive=True):
+    """Markdown files of a paper folder, without backups and partial translations."""
+    found = []
+    for root, dirs, files in os.walk(paper_dir):
+        dirs.sort()
+        for f in sorted(files):
+            if f.endswith(".md") and "_backup_" not in f and not f.endswith(".partial.md"):
+                found.append(os.path.join(root, f))
+        if not recursive:
+            break
+    return found
+
+
+# ── Tasks ────────────────────────────────────────────────────────────────────
+# inputs(paper_dir) -> paths the result depends on (cheap: listing only)
+# run(paper_dir, rel, apply) -> (status, [message lines]); "changed" means
+# files were (or, without --apply, would be) rewritten
+
+def _fix_ocr_math_inputs(paper_dir):
+    return _markdown_files(paper_dir)
+
+
+def _fix_ocr_math_run(paper_dir, rel, apply):
+    from main_terminal import clean_ocr_math
+
+    messages = []
+    for path in _fix_ocr_math_inputs(paper_dir):
+        with open(path, "r", encoding="utf-8") as fh:
+            content = fh.read()
+        cleaned = clean_ocr_math(content)
+        if cleaned == content:
+            continue
+        name = os.path.join(rel, os.path.relpath(path, paper_dir))
+        if apply:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(cleaned)
+            messages.append(f"  Fixed: {name}")
+        else:
+            diff_chars = sum(1 for a, b in zip(content, cleaned) if a != b)
+            len_diff = len(content) - len(cleaned)
+            messages.append(f"  Would fix: {name} ({diff_chars} chars changed, {len_diff:+d} length)")
+    return ("changed" if messages else "unchanged"), messages
+
+
+def _fix_ocr_math_version():
+    # The ledger stays valid until clean_ocr_math or its _OCR_* tables change
+    import inspect
+    import main_terminal
+    parts = [inspect.getsource(main_terminal.clean_ocr_math), inspect.getsource(main_terminal._fix_script_braces)]
+    for name in sorted(dir(main_terminal)):
+        if name.startswith("_OCR_"):
+            value = getattr(main_terminal, name)
+            if isinstance(value, (set, frozenset)):
+                value = sorted(value)
+            parts.append(f"{name}={getattr(value, 'pattern', value)!r}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _doc_type_inputs(paper_dir):
+    meta_path = os.path.join(paper_dir, "paper_meta.json")
+    return [meta_path] if os.path.isfile(meta_path) else []
+
+
+def _doc_type_run(paper_dir, rel, apply):
+    from backfill_doc_type import DOC_TYPE_MAP
+
+    meta_path = os.path.join(paper_dir, "paper_meta.json")
+    if not os.path.isfile(meta_path):
+        return "no meta", []
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        return "error", [f"  [ERROR ] {rel} — {e}"]
+    if meta.get("doc_type"):
+        return "already set", []
+    doc_type = DOC_TYPE_MAP.get(os.path.basename(paper_dir))
+    if not doc_type:
+        return "unmapped", [f"  [NOMAP ] {rel}"]
+    if apply:
+        meta["doc_type"] = doc_type
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+    return "changed", [f"  [{doc_type:6s}] {rel}"]
+
+
+def _doc_type_version():
+    from backfill_doc_type import DOC_TYPE_MAP
+    return hashlib.sha256(json.dumps(DOC_TYPE_MAP, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _markdown_index_inputs(paper_dir):
+    from_files = _markdown_files(paper_dir, recursive=False)
+    index_path = os.path.join(paper_dir, "markdown_index.json")
+    return from_files + ([index_path] if os.path.isfile(index_path) else [])
+
+
+def _markdown_index_run(paper_dir, rel, apply):
+    from main_terminal import MARKDOWN_INDEX_FILE, MarkdownIndex, _markdown_sha256, save_markdown_index
+
+    try:
+        with open(os.path.join(paper_dir, MARKDOWN_INDEX_FILE), "r", encoding="utf-8") as f:
+            indexed = json.load(f).get("files", {})
+    except (FileNotFoundError, ValueError):
+        indexed = {}
+    messages = []
+    for path in _markdown_files(paper_dir, recursive=False):
+        name = os.path.basename(path)
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            sha = _markdown_sha256(f.read())
+        entry = indexed.get(name) or {}
+        if entry.get("sha256") == sha and entry.get("version") == MarkdownIndex.VERSION:
+            continue
+        if apply:
+            save_markdown_index(path)
+        messages.append(f"  {'Indexed' if apply else 'Would index'}: {os.path.join(rel, name)}")
+    return ("changed" if messages else "unchanged"), messages
+
+
+def _markdown_index_version():
+    from main_terminal import MarkdownIndex
+    return str(MarkdownIndex.VERSION)
+
+
+# name -> (inputs, run, version)
+TASKS = {
+    "fix-ocr-math": (_fix_ocr_math_inputs, _fix_ocr_math_run, _fix_ocr_math_version),
+    "backfill-doc-type": (_doc_type_inputs, _doc_type_run, _doc_type_version),
+    "markdown-index": (_markdown_index_inputs, _markdown_index_run, _markdown_index_version),
+}
+
+
+# ── Ledger ───────────────────────────────────────────────────────────────────
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_ledger(path, version):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        print(f"Ignoring unreadable ledger {path}: {e}")
+        return {}
+    return data.get("papers", {}) if data.get("version") == version else {}
+
+
+def _save_ledger(path, task, version, papers):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"task": task, "version": version, "updated_at": datetime.now().isoformat(),
+                   "papers": papers}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _unchanged(paper_dir, inputs, entry):
+    """True when every input still has the mtime and size recorded in the ledger entry."""
+    files = entry.get("files", {})
+    if sorted(files) != sorted(os.path.relpath(p, paper_dir) for p in inputs):
+        return False
+    try:
+        return all(_stat_key(p) == files[os.path.relpath(p, paper_dir)][:2] for p in inputs)
+    except OSError:
+        return False
+
+
+def _process_paper(task, paper_dir, rel, apply, entry):
+    """Worker: run one task on one paper, unless its inputs only got a new mtime.
+
+    Returns (rel, status, messages, ledger entry or None, bytes read).
+    """
+    inputs_fn, run_fn, _ = TASKS[task]
+    inputs = inputs_fn(paper_dir)
+    files = (entry or {}).get("files", {})
+    if files and sorted(files) == sorted(os.path.relpath(p, paper_dir) for p in inputs):
+        current = {os.path.relpath(p, paper_dir): _stat_key(p) + [_sha256(p)] for p in inputs}
+        if all(current[name][2] == files[name][2] for name in current):
+            # Same content as when the task last ran: nothing to do, whatever it did then
+            return rel, "skipped", [], dict(entry, files=current), sum(v[1] for v in current.values())
+
+    try:
+        status, messages = run_fn(paper_dir, rel, apply)
+    except Exception as e:
+        return rel, "error", [f"  [ERROR ] {rel} — {e}"], None, 0
+    # Only a state that needs nothing more is recorded; a dry-run "changed" is not
+    if status == "error" or (status == "changed" and not apply):
+        return rel, status, messages, None, 0
+    inputs = inputs_fn(paper_dir)
+    current = {os.path.relpath(p, paper_dir): _stat_key(p) + [_sha256(p)] for p in inputs}
+    return rel, status, messages, {"files": current, "status": status}, sum(v[1] for v in current.values())
+
+
+def _worker_init():
+    # Ctrl-C reaches the whole process group; the parent alone stops the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _paper_dirs(dirs):
+    for search_dir_name in dirs:
+        search_dir = os.path.join(BASE, search_dir_name)
+        if not os.path.isdir(search_dir):
+            continue
+        for folder_name in sorted(os.listdir(search_dir)):
+            folder_path = os.path.join(search_dir, folder_name)
+            if not folder_name.startswith(".") and os.path.isdir(folder_path):
+                yield folder_path, f"{search_dir_name}/{folder_name}"
+
+
+def run_task(task, apply=False, jobs=None, force=False, dirs=SEARCH_DIRS):
+    """Map `task` over every paper folder; returns the Counter of paper statuses."""
+    inputs_fn, _, version_fn = TASKS[task]
+    version = version_fn()
+    ledger_path = os.path.join(LEDGER_DIR, f"{task}.json")
+    ledger = {} if force else _load_ledger(ledger_path, version)
+
+    counts = Counter()
+    pending = []
+    for paper_dir, rel in _paper_dirs(dirs):
+        entry = ledger.get(rel)
+        if entry and _unchanged(paper_dir, inputs_fn(paper_dir), entry):
+            counts["skipped"] += 1
+        else:
+            pending.append((paper_dir, rel, entry))
+    total = len(pending)
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    print(f"{task}: {total} paper(s) to check, {counts['skipped']} unchanged since the last run"
+          f"{' (dry-run)' if not apply else ''}, {min(jobs, max(total, 1))} worker(s)")
+
+    start = last_save = last_progress = time.time()
+    done = read_bytes = 0
+
+    def _collect(result):
+        nonlocal done, read_bytes, last_save, last_progress
+        rel, status, messages, entry, nbytes = result
+        done += 1
+        read_bytes += nbytes
+        counts[status] += 1
+        for line in messages:
+            print(line)
+        if entry is not None:
+            ledger[rel] = entry
+        now = time.time()
+        if now - last_save >= CHECKPOINT_INTERVAL:
+            _save_ledger(ledger_path, task, version, ledger)
+            last_save = now
+        if now - last_progress >= PROGRESS_INTERVAL and done < total:
+            print(f"  {done}/{total} papers ({done / (now - start):.1f}/s)")
+            last_progress = now
+
+    try:
+        if jobs == 1 or total <= 1:
+            for paper_dir, rel, entry in pending:
+                _collect(_process_paper(task, paper_dir, rel, apply, entry))
+        else:
+            with ProcessPoolExecutor(max_workers=min(jobs, total), initializer=_worker_init) as pool:
+                futures = [pool.submit(_process_paper, task, paper_dir, rel, apply, entry)
+                           for paper_dir, rel, entry in pending]
+                try:
+                    for future in as_completed(futures):
+                        _collect(future.result())
+                except KeyboardInterrupt:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+    finally:
+        _save_ledger(ledger_path, task, version, ledger)
+        elapsed = max(time.time() - start, 1e-9)
+        if total:
+            print(f"\n{done}/{total} paper(s) in {elapsed:.1f}s "
+                  f"({done / elapsed:.1f} papers/s, {read_bytes / elapsed / 1024 / 1024:.1f} MB/s hashed)")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a maintenance task over all papers")
+    parser.add_argument("task", choices=sorted(TASKS), help="Task to run")
+    parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry-run)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Ignore the ledger and visit every paper")
+    parser.add_argument("--dirs", nargs="+", default=list(SEARCH_DIRS), help="Folders holding the papers")
+    args = parser.parse_args(argv)
+
+    try:
+        counts = run_task(args.task, apply=args.apply, jobs=args.jobs, force=args.force, dirs=args.dirs)
+    except KeyboardInterrupt:
+        print("Interrupted; progress is saved in the ledger, rerun to continue.")
+        return 130
+
+    print("Done: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) + ".")
+    if not args.apply and counts["changed"]:
+        print("Run with --apply to apply changes.")
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""Local OpenAI-compatible mock server for offline benchmarking.
+
+Serves POST /v1/chat/completions (streaming and non-streaming) from recorded
+cassettes (config.json "llm_cassette": {"record": true} in the pipeline,
+LLM_CASSETTE_DIR in the viewer) or, for requests that were not recorded,
+with synthesized answers shaped like the real ones: Korean filler that keeps
+headings, placeholders and [[S<n>]] / [[P<n>]] markers, metadata JSON,
+a doc_type word or an empty glossary.
+
+Latency is replayed from the cassette or drawn from a lognormal time to
+first token plus a token rate, and 429 / 5xx / hung requests can be injected
+at given rates, so scheduler and concurrency changes can be measured without
+network access. GET /stats returns request, hit/miss and error counters.
+
+Usage:
+    python scripts/mock_llm_server.py --cassettes logs/cassettes
+    python scripts/mock_llm_server.py --timing synth --ttft-ms 800 --tokens-per-sec 40
+    python scripts/mock_llm_server.py --rate-429 0.05 --rate-5xx 0.02 --rate-timeout 0.01 --max-concurrency 8
+
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=mock python main_terminal.py --batch
+"""
+import os
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_FILLER = "번역된 문장입니다. 모형과 데이터에 대한 설명이 이어집니다. "
+
+
+def cassette_key(model, messages):
+    """Same digest as main_terminal.cassette_key()."""
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_cassettes(paths):
+    """key -> list of recorded responses (repeated requests cycle through them)."""
+    index = {}
+    count = 0
+    for path in paths:
+        files = [path] if os.path.isfile(path) else [
+            os.path.join(root, f) for root, _, names in os.walk(path) for f in sorted(names) if f.endswith(".jsonl")
+        ]
+        for file_path in files:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    response = entry.get("response") or {}
+                    if entry.get("error") or not response.get("complete"):
+                        continue
+                    index.setdefault(entry["key"], []).append(entry)
+                    count += 1
+    return index, count
+
+
+def _korean_like(text):
+    if not text.strip():
+        return text
+    n = max(4, int(len(text) * 0.85))
+    return (_FILLER * (n // len(_FILLER) + 1))[:n].rstrip()
+
+
+def synthesize(messages):
+    """Plausible answer for a request that is not in the cassettes."""
+    system = messages[0].get("content", "") if messages else ""
+    user = messages[-1].get("content", "") if messages else ""
+    if system.startswith("You are an academic paper metadata extractor"):
+        first = next((l.lstrip("# ").strip() for l in user.split("\n") if l.strip()), "Untitled")
+        return json.dumps({
+            "title": first[:200], "title_ko": _korean_like(first[:60]), "authors": ["Mock Author"],
+            "abstract": "Mock abstract.", "abstract_ko": _korean_like("Mock abstract."),
+            "categories": ["Machine Learning"], "source_language": "en",
+            "publication_year": 2025, "doc_type": "paper",
+        }, ensure_ascii=False)
+    if system.startswith("Classify this document"):
+        return "paper"
+    if system.startswith("You build a terminology glossary"):
+        return "{}"
+    if system.startswith("You are a metadata extraction assistant"):
+        return json.dumps({"extracted_title": "", "extracted_authors": [], "matches": []})
+
+    out = []
+    for line in user.split("\n"):
+        stripped = line.strip()
+        if not stripped or (stripped.startswith("[[") and stripped.endswith("]]")) or (
+                stripped.startswith("<<") and stripped.endswith(">>")) or stripped.startswith(("|", "$$", "```")):
+            out.append(line)
+        elif stripped.startswith("#"):
+            hashes = stripped.split(" ", 1)[0]
+            out.append(f"{hashes} {_korean_like(stripped[len(hashes):])}")
+        else:
+            out.append(_korean_like(line))
+    return "\n".join(out)
+
+
+class MockState:
+    def __init__(self, args, cassettes):
+        self.args = args
+        self.cassettes = cassettes
+        self.rng = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.counts = {"requests": 0, "hits": 0, "misses": 0, "rate_limit": 0, "server_error": 0,
+                       "timeout": 0, "concurrency_429": 0, "completed": 0}
+        self._cursor = {}
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def draw(self):
+        with self.lock:
+            return self.rng.random()
+
+    def lookup(self, key):
+        with self.lock:
+            entries = self.cassettes.get(key)
+            if not entries:
+                return None
+            n = self._cursor.get(key, 0)
+            self._cursor[key] = n + 1
+            return entries[n % len(entries)]
+
+    def ttft(self):
+        with self.lock:
+            return self.args.ttft_ms / 1000.0 * self.rng.lognormvariate(0, self.args.ttft_jitter)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: MockState = None
+
+    def log_message(self, fmt, *args):
+        if self.state.args.verbose:
+            super().log_message(fmt, *args)
+
+    def _json(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message, headers=None):
+        self._json(status, {"error": {"message": message, "type": "mock_error", "code": status}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            st = self.state
+            with st.lock:
+                body = dict(st.counts, in_flight=st.in_flight, peak_in_flight=st.peak_in_flight,
+                            cassette_keys=len(st.cassettes))
+            return self._json(200, body)
+        if self.path.rstrip("/").endswith("/models"):
+            return self._json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        self._error(404, "not found")
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._error(404, "not found")
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._error(400, "invalid JSON body")
+
+        st, args = self.state, self.state.args
+        st.count("requests")
+        with st.lock:
+            st.in_flight += 1
+            st.peak_in_flight = max(st.peak_in_flight, st.in_flight)
+            over_limit = args.max_concurrency and st.in_flight > args.max_concurrency
+        try:
+            if over_limit:
+                st.count("concurrency_429")
+                return self._error(429, "mock concurrency limit", {"Retry-After": str(args.retry_after)})
+            roll = st.draw()
+            if roll < args.rate_429:
+                st.count("rate_limit")
+                return self._error(429, "mock rate limit", {"Retry-After": str(args.retry_after)})
+            if roll < args.rate_429 + args.rate_5xx:
+                st.count("server_error")
+                return self._error(st.rng.choice([500, 502, 503]), "mock server error")
+            if roll < args.rate_429 + args.rate_5xx + args.rate_timeout:
+                st.count("timeout")
+                time.sleep(args.hang_seconds)
+                self.close_connection = True
+                return
+            self._answer(req)
+            st.count("completed")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gave up (timeout or lost hedge race)
+            self.close_connection = True
+        finally:
+            with st.lock:
+                st.in_flight -= 1
+
+    def _answer(self, req):
+        st, args = self.state, self.state.args
+        messages = req.get("messages", [])
+        model = req.get("model", "mock")
+        recorded = st.lookup(cassette_key(model, messages))
+        if recorded is None:
+            st.count("misses")
+            if args.on_miss == "error":
+                return self._error(404, "request not in cassettes")
+            content, deltas, usage = synthesize(messages), None, None
+        else:
+            st.count("hits")
+            response = recorded["response"]
+            content, deltas, usage = response["content"], response.get("deltas"), response.get("usage")
+
+        prompt_chars = sum(len(m.get("content") or "") for m in messages)
+        usage = dict(usage or {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": max(1, len(content) // 2),
+        })
+        usage.setdefault("cached_tokens", 0)
+        usage_body = {
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"],
+            "prompt_tokens_details": {"cached_tokens": usage["cached_tokens"]},
+        }
+        timeline = self._timeline(content, deltas if args.timing == "recorded" else None)
+
+        if not req.get("stream"):
+            if timeline:
+                time.sleep(timeline[-1][0])
+            return self._json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion",
+                "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": usage_body,
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        def send(payload):
+            data = f"data: {payload}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def event(delta, finish=None):
+            return json.dumps({
+                "id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }, ensure_ascii=False)
+
+        start = time.time()
+        send(event({"role": "assistant", "content": ""}))
+        for offset, text in timeline:
+            wait = offset - (time.time() - start)
+            if wait > 0:
+                time.sleep(wait)
+            send(event({"content": text}))
+        send(event({}, "stop"))
+        if (req.get("stream_options") or {}).get("include_usage"):
+            send(json.dumps({"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": model, "choices": [], "usage": usage_body}))
+        send("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _timeline(self, content, deltas):
+        """[(seconds from request start, text)] for the answer."""
+        args = self.state.args
+        if args.timing == "none":
+            return [(0.0, content)] if content else []
+        if deltas:
+            return [(float(t), text) for t, text in deltas]
+        t = self.state.ttft()
+        step = max(1, args.chunk_chars)
+        per_chunk = step / args.chars_per_token / max(args.tokens_per_sec, 0.001)
+        timeline = []
+        for i in range(0, len(content), step):
+            timeline.append((t, content[i:i + step]))
+            t += per_chunk
+        return timeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock server (cassette replay / synthetic)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--cassettes", nargs="*", default=[], help="Cassette files or directories (*.jsonl)")
+    parser.add_argument("--on-miss", choices=["synth", "error"], default="synth",
+                        help="Request not in the cassettes: synthesize an answer or return 404")
+    parser.add_argument("--timing", choices=["recorded", "synth", "none"], default="recorded",
+                        help="recorded: replay cassette delta timings (synth for misses); none: answer at once")
+    parser.add_argument("--ttft-ms", type=float, default=400.0, help="Median synthesized time to first token")
+    parser.add_argument("--ttft-jitter", type=float, default=0.5, help="Lognormal sigma of the TTFT")
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0, help="Synthesized output token rate")
+    parser.add_argument("--chars-per-token", type=float, default=1.5, help="Output chars per token (Korean ~1.5)")
+    parser.add_argument("--chunk-chars", type=int, default=24, help="Characters per streamed delta")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Share of requests answered with 500/502/503")
+    parser.add_argument("--rate-timeout", type=float, default=0.0, help="Share of requests that hang")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+    parser.add_argument("--hang-seconds", type=float, default=600.0, help="How long a hung request sleeps")
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="Answer 429 above this many in-flight requests (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    cassettes, count = load_cassettes(args.cassettes)
+    Handler.state = MockState(args, cassettes)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    print(f"Mock LLM server on http://{args.host}:{args.port}/v1 "
+          f"({count} recorded response(s), {len(cassettes)} key(s), on miss: {args.on_miss})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
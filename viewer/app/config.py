@@ -18,6 +18,18 @@ class Settings(BaseSettings):
     # Brave Search API
     BRAVE_SEARCH_API_KEY: str = ""
 
+    # Adaptive (AIMD) concurrency limit for LLM calls
+    LLM_LIMITER_ENABLED: bool = True
+    LLM_LIMITER_INITIAL: int = 3
+    LLM_LIMITER_MAX: int = 8
+
+    # Ask the gateway for token usage on streamed chat answers (usage ledger)
+    LLM_STREAM_USAGE: bool = True
+
+    # Append chat / duplicate-check LLM calls to JSONL cassettes in this
+    # directory (empty = off); replay with scripts/mock_llm_server.py
+    LLM_CASSETTE_DIR: str = ""
+
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
@@ -43,6 +55,10 @@ class Settings(BaseSettings):
     def newones_meta_dir(self) -> Path:
         return self.newones_dir / ".meta"
 
+    @property
+    def newones_jobs_dir(self) -> Path:
+        return self.newones_dir / ".jobs"
+
     @property
     def logs_dir(self) -> Path:
         return Path(self.BASE_DIR) / "logs"
@@ -9,7 +9,9 @@ from pydantic import BaseModel
 from ..auth import create_token, set_auth_cookie, clear_auth_cookie
 from ..config import settings
 from ..dependencies import get_current_user_api
+from ..services import llm as llm_svc
 from ..services import papers as paper_svc
+from ..services import usage as usage_svc
 
 router = APIRouter(prefix="/api", tags=["api"])
 
@@ -257,13 +259,15 @@ async def chat_with_paper(
 
             # 6. Stream LLM response
             assistant_content = ""
+            usage = {}
             async for event in rag_svc.generate_response_stream(
                 context=context,
                 query=request.message,
                 model=os.getenv("TRANSLATION_MODEL", "gemini-claude-sonnet-4-5"),
                 base_url=os.getenv("OPENAI_BASE_URL", ""),
                 api_key=os.getenv("OPENAI_API_KEY", ""),
-                has_web_context=web_search_used
+                has_web_context=web_search_used,
+                usage=usage
             ):
                 if event["type"] == "token":
                     assistant_content += event["content"]
@@ -273,6 +277,9 @@ async def chat_with_paper(
                     # Don't save on error
                     return
 
+            if usage:
+                usage_svc.record_usage(paper_svc._resolve_paper_dir(name), "chat", usage)
+
             # 7. Send sources
             sources = [
                 {
@@ -464,6 +471,16 @@ async def serve_md_en(name: str, _user: str = Depends(get_current_user_api)):
     return FileResponse(path, media_type="text/markdown; charset=utf-8")
 
 
+@router.get("/papers/{name:path}/md-ko-partial")
+async def serve_md_ko_partial(name: str, _user: str = Depends(get_current_user_api)):
+    """Korean markdown translated so far, with "sections_done of sections_total"."""
+    name = unquote(name)
+    partial = paper_svc.get_partial_translation(name)
+    if not partial:
+        raise HTTPException(status_code=404, detail="Korean markdown file not found")
+    return partial
+
+
 @router.get("/papers/{name:path}/md-ko-explained")
 async def serve_md_ko_explained(name: str, _user: str = Depends(get_current_user_api)):
     name = unquote(name)
@@ -504,6 +521,24 @@ async def update_markdown(
     return {"ok": True, "message": msg}
 
 
+@router.post("/papers/{name:path}/retranslate")
+async def retranslate_paper(name: str, _user: str = Depends(get_current_user_api)):
+    """Queue an incremental Korean re-translation after the English markdown was edited."""
+    name = unquote(name)
+    ok, msg, job = paper_svc.queue_retranslation(name)
+    if not ok:
+        raise HTTPException(status_code=400, detail=msg)
+    return {"ok": True, "message": msg, "job": job}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, _user: str = Depends(get_current_user_api)):
+    job = paper_svc.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
 @router.get("/papers/{name:path}/assets/{filename:path}")
 async def serve_asset(name: str, filename: str, _user: str = Depends(get_current_user_api)):
     name = unquote(name)
@@ -579,6 +614,33 @@ async def processing_status(_user: str = Depends(get_current_user_api)):
     return paper_svc.get_processing_status()
 
 
+@router.get("/llm/limiter")
+async def llm_limiter_status(_user: str = Depends(get_current_user_api)):
+    return llm_svc.get_limiter_status()
+
+
+@router.get("/usage")
+async def usage_report(
+    limit: int = 20,
+    sort: str = "tokens",
+    _user: str = Depends(get_current_user_api),
+):
+    """LLM usage per stage and the papers with the highest spend (sort: tokens | wall)."""
+    return usage_svc.get_usage_report(limit=limit, sort=sort)
+
+
+@router.get("/papers/{name:path}/usage")
+async def paper_usage(name: str, _user: str = Depends(get_current_user_api)):
+    name = unquote(name)
+    paper_dir = paper_svc._resolve_paper_dir(name)
+    if not paper_dir:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    path = paper_dir / usage_svc.USAGE_FILE
+    if not path.is_file():
+        return {"stages": {}, "totals": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
 @router.delete("/processing/queue/{filename}")
 async def delete_queued_file(filename: str, _user: str = Depends(get_current_user_api)):
     filename = unquote(filename)
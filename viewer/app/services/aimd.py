@@ -0,0 +1,172 @@
+"""AIMD concurrency limit shared by the pipeline and the viewer.
+
+AIMDLimiter holds the limit, the outcome/latency window and the
+increase/decrease rules; subclasses add the waiting and locking for where
+they run (AdaptiveConcurrencyLimiter in main_terminal.py for threads and the
+pipeline's event loop, AdaptiveLimiter in app/services/llm.py for the
+viewer's). Every ``*_locked`` method expects the subclass's lock to be held.
+
+Standard library only: main_terminal.py imports this file from the viewer
+tree, because the viewer image ships nothing outside viewer/.
+"""
+
+import random
+import time
+from collections import deque
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+
+def classify_llm_error(exc: BaseException) -> tuple[str, float | None]:
+    """Map an LLM client exception to (kind, retry_after_seconds).
+
+    kind is "rate_limit" (429), "server" (5xx), "timeout" or "other".
+    """
+    status = getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+
+    retry_after = None
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value:
+            try:
+                retry_after = max(0.0, float(value))
+            except ValueError:
+                try:
+                    retry_after = max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except Exception:
+                    retry_after = None
+
+    if status == 429:
+        return "rate_limit", retry_after
+    if isinstance(status, int) and status >= 500:
+        return "server", retry_after
+    # asyncio.TimeoutError and the httpx/openai timeout classes match by name
+    if "timeout" in type(exc).__name__.lower() or isinstance(exc, TimeoutError):
+        return "timeout", retry_after
+    return "other", retry_after
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease limit on concurrent LLM calls.
+
+    The limit grows by 1/limit per successful call (about +1 per round of
+    calls) while calls actually use the limit, the window error rate stays
+    below error_threshold and p95 latency stays within latency_tolerance x
+    the best p50 seen so far. A 429, 5xx or timeout multiplies it by
+    decrease_factor (at most once per decrease_cooldown_seconds) and a
+    Retry-After header pauses new calls. Latencies are normalized per 1000
+    output characters when a size is reported, so short and long chunks are
+    comparable.
+    """
+
+    def __init__(self, name: str = "llm", initial: int = 3, min_limit: int = 1, max_limit: int = 16,
+                 window: int = 50, latency_tolerance: float = 2.0, error_threshold: float = 0.1,
+                 decrease_factor: float = 0.5, decrease_cooldown_seconds: float = 5.0):
+        self.name = name
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.latency_tolerance = float(latency_tolerance)
+        self.error_threshold = float(error_threshold)
+        self.decrease_factor = float(decrease_factor)
+        self.decrease_cooldown = float(decrease_cooldown_seconds)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.counts = {"ok": 0, "rate_limit": 0, "server": 0, "timeout": 0, "other": 0}
+        self._latencies: deque = deque(maxlen=window)
+        self._outcomes: deque = deque(maxlen=window)
+        self._baseline: float | None = None
+        self._last_decrease = 0.0
+        self._peak_in_flight = 0
+
+    def _try_acquire_locked(self) -> bool:
+        if time.time() < self.blocked_until or self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self.in_flight)
+        return True
+
+    def _release_locked(self, latency: float | None = None, size: int | None = None,
+                        error: BaseException | None = None, record: bool = True) -> None:
+        """Free a slot and record the outcome (error: exception or None).
+
+        record=False only frees the slot: a cancelled call (a hedge that lost
+        its race, a client that went away) says nothing about the endpoint, so
+        it adds no outcome or latency and does not raise the limit.
+        """
+        now = time.time()
+        self.in_flight -= 1
+        if not record:
+            return
+        if error is None:
+            self.counts["ok"] += 1
+            self._outcomes.append(0)
+            if latency is not None:
+                self._latencies.append(latency / max(size, 1) * 1000 if size else latency)
+            self._maybe_increase()
+            return
+        kind, retry_after = classify_llm_error(error)
+        self.counts[kind] += 1
+        self._outcomes.append(1 if kind != "other" else 0)
+        if kind != "other":
+            self._decrease(now)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def _p(self, q: float) -> float | None:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def _maybe_increase(self) -> None:
+        if len(self._latencies) >= 5:
+            p50 = self._p(0.5)
+            self._baseline = p50 if self._baseline is None else min(self._baseline, p50)
+        # Only grow when the current limit is actually the bottleneck
+        if self._peak_in_flight < int(self.limit):
+            return
+        if self._outcomes and sum(self._outcomes) / len(self._outcomes) > self.error_threshold:
+            return
+        p95 = self._p(0.95)
+        if self._baseline and p95 and p95 > self._baseline * self.latency_tolerance:
+            return
+        self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._peak_in_flight = self.in_flight
+
+    def _decrease(self, now: float) -> None:
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self._peak_in_flight = self.in_flight
+
+    def backoff_seconds(self, error: BaseException, attempt: int, base_delay: float = 1.0) -> float:
+        """Delay before retry attempt+1: Retry-After if given, else exponential with jitter."""
+        _, retry_after = classify_llm_error(error)
+        if retry_after:
+            return retry_after
+        return base_delay * (2 ** attempt) * (0.5 + random.random())
+
+    def _snapshot_locked(self) -> dict:
+        total = len(self._outcomes)
+        return {
+            "name": self.name,
+            "limit": round(self.limit, 2),
+            "effective_limit": int(self.limit),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "p50_seconds": self._p(0.5),
+            "p95_seconds": self._p(0.95),
+            "baseline_p50_seconds": self._baseline,
+            "latency_unit": "seconds per 1000 output chars (when size reported)",
+            "window_error_rate": (sum(self._outcomes) / total) if total else 0.0,
+            "blocked_for_seconds": max(0.0, round(self.blocked_until - time.time(), 1)),
+            "counts": dict(self.counts),
+            "updated_at": datetime.now().isoformat(),
+        }
@@ -155,7 +155,7 @@ def get_or_create_chunks(paper_name: str) -> List[ChatChunk]:
     md_en_file = None
 
     for f in paper_dir.iterdir():
-        if f.suffix == ".md":
+        if f.suffix == ".md" and not f.name.endswith(".partial.md"):
             if f.name.endswith("_ko.md"):
                 md_ko_file = f
             else:
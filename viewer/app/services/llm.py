@@ -0,0 +1,151 @@
+"""Adaptive concurrency control for the viewer's LLM calls.
+
+Chat and duplicate-check requests go to the same OpenAI-compatible gateway
+as the processing pipeline. This limiter and AdaptiveConcurrencyLimiter in
+main_terminal.py (which runs in the converter container and publishes its
+state to logs/llm_limiter.json) share the AIMD rules of aimd.AIMDLimiter:
+
+- the limit grows by 1/limit per successful call while the limit is in use,
+  the window error rate is low and p95 latency stays near the best p50;
+- a 429, 5xx or timeout halves it (once per cooldown) and Retry-After
+  pauses new calls.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from ..config import settings
+from .aimd import AIMDLimiter
+
+
+class AdaptiveLimiter(AIMDLimiter):
+    """AIMDLimiter for coroutines on the server's event loop."""
+
+    def __init__(self, initial: int = 3, min_limit: int = 1, max_limit: int = 8, **kwargs):
+        super().__init__("viewer", initial, min_limit, max_limit, **kwargs)
+        self._cond: asyncio.Condition | None = None
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running loop
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self) -> None:
+        cond = self._condition()
+        async with cond:
+            while not self._try_acquire_locked():
+                wait = self.blocked_until - time.time()
+                try:
+                    await asyncio.wait_for(cond.wait(), timeout=max(wait, 0) or 1.0)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, latency: float | None = None, size: int | None = None,
+                      error: Exception | None = None, record: bool = True) -> None:
+        """Return a slot and record the outcome; record=False only frees the slot."""
+        cond = self._condition()
+        async with cond:
+            self._release_locked(latency=latency, size=size, error=error, record=record)
+            cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, size_hint: int | None = None):
+        """Hold one slot; the body may set ``ctx["size"]`` to normalize latency.
+
+        A streaming body adds the time it spends suspended at ``yield`` to
+        ``ctx["paused"]``, so consumer back-pressure is not counted as latency.
+        Cancellation or a closed generator (client gone) frees the slot
+        without recording an outcome.
+        """
+        await self.acquire()
+        ctx = {"size": size_hint, "paused": 0.0}
+        start = time.time()
+        try:
+            yield ctx
+        except Exception as e:
+            await self.release(error=e)
+            raise
+        except BaseException:
+            await self.release(record=False)
+            raise
+        await self.release(latency=time.time() - start - ctx.get("paused", 0.0), size=ctx.get("size"))
+
+    def snapshot(self) -> dict:
+        return self._snapshot_locked()
+
+
+limiter = AdaptiveLimiter(
+    initial=settings.LLM_LIMITER_INITIAL,
+    max_limit=settings.LLM_LIMITER_MAX,
+)
+
+
+@asynccontextmanager
+async def llm_slot(size_hint: int | None = None):
+    """Concurrency slot for one LLM call (no-op when LLM_LIMITER_ENABLED is off)."""
+    if not settings.LLM_LIMITER_ENABLED:
+        yield {"size": size_hint, "paused": 0.0}
+        return
+    async with limiter.slot(size_hint) as ctx:
+        yield ctx
+
+
+def record_cassette(kind: str, request: dict, content: str, usage=None,
+                    deltas: list | None = None, elapsed: float | None = None) -> None:
+    """Append one LLM call to the viewer's cassette (LLM_CASSETTE_DIR).
+
+    Same line format and replay key as the pipeline's recorder
+    (main_terminal.cassette_key), so scripts/mock_llm_server.py can replay
+    chat and duplicate checks as well.
+    """
+    if not settings.LLM_CASSETTE_DIR:
+        return
+    payload = json.dumps({"model": request.get("model"), "messages": request.get("messages")},
+                         sort_keys=True, ensure_ascii=False)
+    entry = {
+        "key": hashlib.sha256(payload.encode("utf-8")).hexdigest(),
+        "kind": kind,
+        "model": request.get("model"),
+        "stream": deltas is not None,
+        "request": {k: v for k, v in request.items() if k in ("messages", "temperature", "max_tokens")},
+        "recorded_at": datetime.now().isoformat(),
+        "response": {
+            "content": content,
+            "deltas": deltas,
+            "usage": {
+                "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+                "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+            } if usage is not None else None,
+            "complete": True,
+        },
+        "elapsed": round(elapsed, 3) if elapsed is not None else None,
+    }
+    try:
+        os.makedirs(settings.LLM_CASSETTE_DIR, exist_ok=True)
+        path = os.path.join(settings.LLM_CASSETTE_DIR, f"viewer_{datetime.now():%Y%m%d}.jsonl")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except Exception:
+        pass
+
+
+def get_limiter_status() -> dict:
+    """Viewer limiter state plus the pipeline's last published snapshot."""
+    pipeline = None
+    path = settings.logs_dir / "llm_limiter.json"
+    if path.is_file():
+        try:
+            pipeline = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            pipeline = None
+    return {
+        "enabled": settings.LLM_LIMITER_ENABLED,
+        "viewer": limiter.snapshot(),
+        "pipeline": pipeline,
+    }
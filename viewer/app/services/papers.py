@@ -228,6 +228,8 @@ def _paper_info(paper_dir: Path, location: str) -> dict:
             files["md_en_explained"] = True
         elif f.name.endswith("_ko.md"):
             files["md_ko"] = True
+        elif f.name.endswith(".partial.md"):
+            files["md_ko_partial"] = True
         elif f.name.endswith(".md"):
             files["md_en"] = True
 
@@ -419,6 +421,8 @@ def _resolve_result(paper_dir: Path, location: str) -> dict:
             formats["md_en_explained"] = True
         elif f.name.endswith("_ko.md"):
             formats["md_ko"] = True
+        elif f.name.endswith(".partial.md"):
+            formats["md_ko_partial"] = True
         elif f.name.endswith(".md"):
             formats["md_en"] = True
     return {
@@ -458,13 +462,52 @@ def get_md_ko_path(name: str) -> Path | None:
     return None
 
 
+def get_partial_translation(name: str) -> dict | None:
+    """Korean translation as far as it has been written.
+
+    While the converter translates a paper it appends finished sections, in
+    order, to <base>_ko.partial.md and records the count in
+    translation_partial.json. Once the paper is done this returns the final
+    _ko.md with complete=True.
+    """
+    paper_dir = _resolve_paper_dir(name)
+    if not paper_dir:
+        return None
+    partial = next((f for f in paper_dir.iterdir() if f.name.endswith("_ko.partial.md")), None)
+    if partial is None:
+        final = get_md_ko_path(name)
+        if not final:
+            return None
+        return {"content": final.read_text(encoding="utf-8"), "complete": True,
+                "sections_done": None, "sections_total": None}
+
+    progress = {}
+    progress_file = paper_dir / "translation_partial.json"
+    if progress_file.is_file():
+        try:
+            progress = _json.loads(progress_file.read_text(encoding="utf-8"))
+        except Exception:
+            progress = {}
+    try:
+        content = partial.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        # Finalized between listing and reading
+        return get_partial_translation(name)
+    return {
+        "content": content,
+        "complete": False,
+        "sections_done": progress.get("sections_done"),
+        "sections_total": progress.get("sections_total"),
+    }
+
+
 def get_md_en_path(name: str) -> Path | None:
     """Get English markdown file path."""
     paper_dir = _resolve_paper_dir(name)
     if not paper_dir:
         return None
     for f in paper_dir.iterdir():
-        if f.name.endswith(".md") and not f.name.endswith("_ko.md") and not f.name.endswith("_explained.md"):
+        if f.name.endswith(".md") and not f.name.endswith(("_ko.md", "_explained.md", ".partial.md")):
             return f
     return None
 
@@ -512,7 +555,7 @@ def save_markdown(name: str, md_type: str, content: str) -> tuple[bool, str]:
                 break
     else:
         for f in paper_dir.iterdir():
-            if f.name.endswith(".md") and not f.name.endswith("_ko.md") and not f.name.endswith("_explained.md"):
+            if f.name.endswith(".md") and not f.name.endswith(("_ko.md", "_explained.md", ".partial.md")):
                 target = f
                 break
 
@@ -545,6 +588,69 @@ def save_markdown(name: str, md_type: str, content: str) -> tuple[bool, str]:
     return True, f"Saved. Backup: {backup_path.name}"
 
 
+_JOB_ID_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _read_job(path: Path) -> dict | None:
+    try:
+        return _json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def get_job(job_id: str) -> dict | None:
+    """Read a background job file written by queue_retranslation / the converter."""
+    if not _JOB_ID_RE.match(job_id or ""):
+        return None
+    path = settings.newones_jobs_dir / f"{job_id}.json"
+    return _read_job(path) if path.is_file() else None
+
+
+def queue_retranslation(name: str) -> tuple[bool, str, dict | None]:
+    """Queue an incremental re-translation of a paper for the converter daemon.
+
+    The job file goes to newones/.jobs/; the converter's JobRunner
+    re-translates only the chunks whose English source changed and updates
+    the file with status and progress.
+    """
+    paper_dir = settings.outputs_dir / name
+    if (name in ("", ".", "..") or paper_dir.resolve().parent != settings.outputs_dir.resolve()
+            or not paper_dir.is_dir()):
+        return False, "Only papers in outputs/ can be re-translated.", None
+    has_en = any(
+        f.name.endswith(".md") and not f.name.endswith(("_ko.md", "_explained.md", ".partial.md"))
+        for f in paper_dir.iterdir()
+    )
+    if not has_en:
+        return False, "English markdown file not found.", None
+
+    jobs_dir = settings.newones_jobs_dir
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+    for path in jobs_dir.glob("*.json"):
+        job = _read_job(path)
+        if job and job.get("paper") == name and job.get("status") in ("queued", "running"):
+            return True, "Re-translation already queued.", job
+
+    now = _dt.datetime.now()
+    job_id = f"{now.strftime('%Y%m%d_%H%M%S')}-retranslate-{_slugify_name(name, 40)}"
+    job = {
+        "id": job_id,
+        "type": "retranslate",
+        "paper": name,
+        "status": "queued",
+        "progress": 0.0,
+        "message": "Waiting for the converter",
+        "created_at": now.isoformat(),
+    }
+    tmp_path = jobs_dir / f"{job_id}.json.tmp"
+    try:
+        tmp_path.write_text(_json.dumps(job, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, jobs_dir / f"{job_id}.json")
+    except Exception as e:
+        return False, f"Failed to queue job: {e}", None
+    return True, "Re-translation queued.", job
+
+
 def get_asset_path(name: str, filename: str) -> Path | None:
     """Get path to an asset (image) in a paper directory."""
     paper_dir = _resolve_paper_dir(name)
@@ -729,15 +835,26 @@ Rules:
             api_key=os.getenv("OPENAI_API_KEY", "")
         )
 
-        response = await client.chat.completions.create(
-            model=os.getenv("TRANSLATION_MODEL", "gemini-2.5-flash"),
-            messages=[
+        from .llm import llm_slot, record_cassette
+        from .usage import record_usage, usage_summary
+
+        request = {
+            "model": os.getenv("TRANSLATION_MODEL", "gemini-2.5-flash"),
+            "messages": [
                 {"role": "system", "content": "You are a metadata extraction assistant. Respond only in valid JSON."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.0,
-            max_tokens=512,
-        )
+            "temperature": 0.0,
+            "max_tokens": 512,
+        }
+        async with llm_slot() as slot:
+            start = _dt.datetime.now()
+            response = await client.chat.completions.create(**request)
+            slot["size"] = len(response.choices[0].message.content or "")
+        elapsed = (_dt.datetime.now() - start).total_seconds()
+        record_usage(None, "duplicate_check", usage_summary(getattr(response, "usage", None), elapsed))
+        record_cassette("duplicate_check", request, response.choices[0].message.content or "",
+                        getattr(response, "usage", None), elapsed=elapsed)
 
         result_text = response.choices[0].message.content.strip()
         if result_text.startswith("```"):
@@ -818,23 +935,33 @@ def get_processing_status() -> dict:
             [f for f in newones.iterdir() if f.is_file() and f.name.lower().endswith(".pdf")],
             key=lambda f: f.stat().st_mtime,
         )
+        # Pipelined runs report every PDF inside the pipeline in "in_flight";
+        # older status files only carry the single current_file
+        in_flight = {
+            item["filename"]: item
+            for item in processing.get("in_flight") or []
+            if item.get("filename")
+        }
         current_file = processing.get("current_file")
+        if current_file and "in_flight" not in processing:
+            in_flight[current_file] = processing
         queue_pos = 0
         for pdf in pdf_files:
             size_mb = round(pdf.stat().st_size / (1024 * 1024), 1)
             entry = {"filename": pdf.name, "size_mb": size_mb}
 
-            if current_file and pdf.name == current_file:
+            if pdf.name in in_flight:
+                item = in_flight[pdf.name]
                 entry["status"] = "stale" if stale else "processing"
-                entry["stage"] = processing.get("stage", "")
-                entry["stage_num"] = processing.get("stage_num", 0)
-                entry["total_stages"] = processing.get("total_stages", 0)
-                entry["stage_label"] = processing.get("stage_label", "")
-                entry["sub_progress"] = processing.get("sub_progress") or 0
-                if processing.get("detail"):
-                    entry["detail"] = processing["detail"]
-                if processing.get("error"):
-                    entry["error"] = processing["error"]
+                entry["stage"] = item.get("stage", "")
+                entry["stage_num"] = item.get("stage_num", 0)
+                entry["total_stages"] = item.get("total_stages", 0)
+                entry["stage_label"] = item.get("stage_label", "")
+                entry["sub_progress"] = item.get("sub_progress") or 0
+                if item.get("detail"):
+                    entry["detail"] = item["detail"]
+                if item.get("error"):
+                    entry["error"] = item["error"]
             else:
                 queue_pos += 1
                 entry["status"] = "queued"
@@ -865,7 +992,8 @@ def delete_queued_file(filename: str) -> tuple[bool, str]:
                 processing = _json.load(f)
             current = processing.get("current_file")
             stage = processing.get("stage", "idle")
-            if current == filename and stage not in ("idle", "complete", "error"):
+            in_flight = {item.get("filename") for item in processing.get("in_flight") or []}
+            if filename in in_flight or (current == filename and stage not in ("idle", "complete", "error")):
                 return False, f"'{filename}' is currently being processed. Cannot delete."
         except Exception:
             pass
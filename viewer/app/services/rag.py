@@ -7,12 +7,18 @@ This module implements the RAG pipeline:
 4. Generation: Stream LLM response
 """
 
+import bisect
+import hashlib
+import json
 import re
+import time
 from pathlib import Path
 from typing import List, AsyncGenerator
 import os
 
 from ..models.chat import ChatChunk, ChatMessage
+from .llm import llm_slot, record_cassette
+from ..config import settings
 
 
 def estimate_tokens(text: str) -> int:
@@ -27,6 +33,30 @@ def estimate_tokens(text: str) -> int:
     return len(text) // 4
 
 
+MARKDOWN_INDEX_FILE = "markdown_index.json"
+# Block kinds of MarkdownIndex in main_terminal.py
+_INDEX_HEADING, _INDEX_CODE = 1, 2
+
+
+def load_markdown_index(md_path: Path, content: str) -> dict | None:
+    """Block index of md_path from its folder's markdown_index.json.
+
+    The pipeline writes it for the final .md/_ko.md files
+    (main_terminal.save_markdown_index); it is only used while its hash
+    still matches the content, e.g. not after an edit in the viewer.
+    """
+    try:
+        data = json.loads((md_path.parent / MARKDOWN_INDEX_FILE).read_text(encoding="utf-8"))
+        entry = data["files"][md_path.name]
+    except Exception:
+        return None
+    if entry.get("version") != 1:
+        return None
+    if entry.get("sha256") != hashlib.sha256(content.encode("utf-8")).hexdigest():
+        return None
+    return entry
+
+
 def chunk_markdown(
     md_path: Path,
     chunk_size: int = 500,
@@ -51,6 +81,23 @@ def chunk_markdown(
     content = md_path.read_text(encoding="utf-8")
     lines = content.split('\n')
 
+    # With the pipeline's index, headings and code blocks come from its
+    # block boundaries ("## " lines inside code are not headings)
+    heading_lines = code_lines = None
+    index = load_markdown_index(md_path, content)
+    if index is not None:
+        line_starts = [0]
+        for line in lines[:-1]:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+        heading_lines, code_lines = set(), set()
+        for start, end, kind in zip(index["starts"], index["ends"], index["kinds"]):
+            first = bisect.bisect_right(line_starts, start) - 1
+            if kind == _INDEX_HEADING:
+                heading_lines.add(first)
+            elif kind == _INDEX_CODE:
+                # Opening fence up to (not including) the closing fence
+                code_lines.update(range(first, bisect.bisect_right(line_starts, end) - 1))
+
     chunks = []
     current_chunk_lines = []
     current_heading = None
@@ -75,11 +122,14 @@ def chunk_markdown(
 
     for i, line in enumerate(lines):
         # Track code blocks to avoid splitting them
-        if line.strip().startswith('```'):
+        if code_lines is not None:
+            in_code_block = i in code_lines
+        elif line.strip().startswith('```'):
             in_code_block = not in_code_block
 
         # Detect heading (new section)
-        if line.startswith('## ') or line.startswith('### '):
+        if (line.startswith('## ') or line.startswith('### ')) and (
+                heading_lines is None or i in heading_lines):
             # Save previous chunk if it's getting large
             if current_tokens > chunk_size:
                 save_chunk()
@@ -307,7 +357,8 @@ async def generate_response_stream(
     model: str,
     base_url: str,
     api_key: str,
-    has_web_context: bool = False
+    has_web_context: bool = False,
+    usage: dict | None = None
 ) -> AsyncGenerator[dict, None]:
     """Stream LLM response using OpenAI-compatible API.
 
@@ -318,6 +369,7 @@ async def generate_response_stream(
         base_url: API base URL
         api_key: API key
         has_web_context: Whether web search results are included in context
+        usage: Optional dict, filled with the call's usage ledger summary
 
     Yields:
         Event dicts:
@@ -379,21 +431,45 @@ Guidelines:
             {"role": "user", "content": context}
         ]
 
-        # Stream response
-        stream = await client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=0.3,  # Low temperature for factual responses
-            max_tokens=900,
-            stream=True
-        )
-
-        async for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield {
-                    "type": "token",
-                    "content": chunk.choices[0].delta.content
-                }
+        extra = {"stream_options": {"include_usage": True}} if settings.LLM_STREAM_USAGE else {}
+        async with llm_slot() as slot:
+            start = time.time()
+            # Stream response
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.3,  # Low temperature for factual responses
+                max_tokens=900,
+                stream=True,
+                **extra
+            )
+
+            received = 0
+            first_token = None
+            reported_usage = None
+            deltas = []
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    reported_usage = chunk.usage
+                # The usage chunk has no choices
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first_token is None:
+                        first_token = time.time() - start
+                    deltas.append([round(time.time() - start, 3), chunk.choices[0].delta.content])
+                    received += len(chunk.choices[0].delta.content)
+                    paused = time.time()
+                    yield {
+                        "type": "token",
+                        "content": chunk.choices[0].delta.content
+                    }
+                    slot["paused"] += time.time() - paused
+            slot["size"] = received
+
+        if usage is not None:
+            from .usage import usage_summary
+            usage.update(usage_summary(reported_usage, time.time() - start, first_token))
+        record_cassette("chat", {"model": model, "messages": messages, "temperature": 0.3, "max_tokens": 900},
+                        "".join(d[1] for d in deltas), reported_usage, deltas, time.time() - start)
 
         yield {"type": "done"}
 
@@ -0,0 +1,132 @@
+"""LLM usage ledger: per-paper usage.json files and their aggregation.
+
+The processing pipeline (record_paper_usage in main_terminal.py) writes one
+usage.json per paper folder with per-stage counters (metadata, translate,
+retranslate). The viewer adds its own calls: chat goes into the paper's
+ledger, the upload duplicate check (no paper folder yet) into
+logs/viewer_usage.json. Both use the same layout:
+
+    {"stages": {"<stage>": {"runs": n, "requests": ..., "last_run": {...}}},
+     "totals": {...}, "updated_at": "..."}
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from ..config import settings
+
+USAGE_FILE = "usage.json"
+VIEWER_USAGE_FILE = "viewer_usage.json"
+SUM_FIELDS = ("requests", "retries", "usage_reported", "prompt_tokens", "cached_tokens",
+              "completion_tokens", "hedged_requests", "skipped_chunks", "protected_tokens",
+              "placeholders_fixed", "placeholders_lost", "wall_seconds")
+
+_lock = threading.Lock()
+
+
+def usage_summary(usage, wall_seconds: float | None = None, ttft: float | None = None) -> dict:
+    """Ledger summary for one LLM call from the API's usage object (may be None)."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    return {
+        "requests": 1,
+        "usage_reported": 1 if usage is not None else 0,
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "cached_tokens": int(cached or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+        "wall_seconds": round(wall_seconds, 2) if wall_seconds is not None else 0,
+        "ttft_seconds": round(ttft, 3) if ttft is not None else None,
+    }
+
+
+def _read(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def record_usage(paper_dir: Path | None, stage: str, summary: dict) -> None:
+    """Add one call's summary to a paper's usage.json (or the viewer ledger)."""
+    if paper_dir is not None and paper_dir.is_dir():
+        path = paper_dir / USAGE_FILE
+    else:
+        settings.logs_dir.mkdir(parents=True, exist_ok=True)
+        path = settings.logs_dir / VIEWER_USAGE_FILE
+    with _lock:
+        ledger = _read(path)
+        stages = ledger.setdefault("stages", {})
+        entry = stages.setdefault(stage, {"runs": 0})
+        entry["runs"] = entry.get("runs", 0) + 1
+        for field in SUM_FIELDS:
+            entry[field] = round(entry.get(field, 0) + (summary.get(field) or 0), 2)
+        entry["last_run"] = dict(summary, recorded_at=datetime.now().isoformat())
+        ledger["totals"] = {
+            field: round(sum(e.get(field, 0) for e in stages.values()), 2) for field in SUM_FIELDS
+        }
+        ledger["updated_at"] = datetime.now().isoformat()
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(ledger, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, path)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+
+
+def get_usage_report(limit: int = 20, sort: str = "tokens") -> dict:
+    """Aggregate all ledgers: totals per stage and the top papers by tokens or wall time."""
+    per_stage: dict[str, dict] = {}
+    papers = []
+
+    def _add(stages: dict) -> None:
+        for stage, entry in stages.items():
+            agg = per_stage.setdefault(stage, {"runs": 0, **{f: 0 for f in SUM_FIELDS}})
+            agg["runs"] += entry.get("runs", 0)
+            for field in SUM_FIELDS:
+                agg[field] = round(agg[field] + (entry.get(field) or 0), 2)
+
+    for base, location in [(settings.outputs_dir, "outputs"), (settings.archives_dir, "archives")]:
+        if not base.exists():
+            continue
+        for paper_dir in base.iterdir():
+            if not paper_dir.is_dir() or paper_dir.name.startswith("."):
+                continue
+            ledger = _read(paper_dir / USAGE_FILE)
+            if not ledger.get("stages"):
+                continue
+            _add(ledger["stages"])
+            totals = ledger.get("totals", {})
+            papers.append({
+                "name": paper_dir.name,
+                "location": location,
+                "tokens": totals.get("prompt_tokens", 0) + totals.get("completion_tokens", 0),
+                "totals": totals,
+                "stages": {k: {f: v.get(f, 0) for f in ("runs", "requests", "prompt_tokens",
+                                                         "completion_tokens", "wall_seconds")}
+                           for k, v in ledger["stages"].items()},
+                "updated_at": ledger.get("updated_at"),
+            })
+
+    viewer = _read(settings.logs_dir / VIEWER_USAGE_FILE)
+    _add(viewer.get("stages", {}))
+
+    if sort == "wall":
+        papers.sort(key=lambda p: p["totals"].get("wall_seconds", 0), reverse=True)
+    else:
+        papers.sort(key=lambda p: p["tokens"], reverse=True)
+    totals = {f: round(sum(s[f] for s in per_stage.values()), 2) for f in SUM_FIELDS}
+    for agg in per_stage.values():
+        agg["cached_ratio"] = round(agg["cached_tokens"] / agg["prompt_tokens"], 3) if agg["prompt_tokens"] else 0.0
+        agg["avg_wall_seconds"] = round(agg["wall_seconds"] / agg["runs"], 2) if agg["runs"] else None
+    return {
+        "papers_with_usage": len(papers),
+        "totals": totals,
+        "stages": per_stage,
+        "top_papers": papers[:limit],
+        "viewer": viewer.get("stages", {}),
+    }